@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare per-request overhead of the soco-cli transports.
+
+Starts soco-cli workers over TCP and then over Unix domain sockets, sends the
+same sequence of requests through SocoCliService's shared client, and prints
+latency percentiles for each transport.
+
+By default the request is soco-cli's root endpoint, which doesn't touch any
+speaker, so the numbers are pure bridge overhead (HTTP parsing, connection
+handling and the soco-cli server itself). Pass --speaker and --action to time
+a real command as well.
+
+Usage (from api-python/):
+    python scripts/benchmark_soco_cli_transport.py --requests 500
+    python scripts/benchmark_soco_cli_transport.py --speaker Kitchen --action volume
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sndctl.config import Settings  # noqa: E402
+from sndctl.services.soco_cli_service import SocoCliService  # noqa: E402
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Get a percentile of sorted samples (nearest rank)."""
+    index = min(len(samples) - 1, max(0, round(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+async def benchmark(transport: str, args: argparse.Namespace) -> list[float]:
+    """Time requests to one soco-cli worker over a transport.
+
+    Returns:
+        Request latencies in milliseconds, sorted.
+    """
+    with tempfile.TemporaryDirectory() as data_directory:
+        settings = Settings(
+            data_directory=data_directory,
+            soco_cli_executable_path=args.executable,
+            soco_cli_port=args.port,
+            soco_cli_workers=1,
+            soco_cli_transport=transport,
+            soco_cli_share_speaker_list=False,
+        )
+        service = SocoCliService(settings)
+        if not await service.start_server():
+            raise SystemExit(f"Could not start soco-cli over {transport}")
+
+        try:
+            path = "/"
+            if args.speaker:
+                path = f"/{quote(args.speaker)}/{quote(args.action)}"
+            url = f"{service.server_url}{path}"
+            client = service.client
+
+            for _ in range(args.warmup):
+                (await client.get(url)).raise_for_status()
+
+            latencies = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            return sorted(latencies)
+        finally:
+            await service.stop_server()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--executable", help="Path to sonos-http-api-server (default: auto-detect)")
+    parser.add_argument("--port", type=int, default=18001, help="Port for the TCP run (default: 18001)")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per transport")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per transport")
+    parser.add_argument("--speaker", help="Time a command on this speaker instead of the root endpoint")
+    parser.add_argument("--action", default="volume", help="Action used with --speaker (default: volume)")
+    args = parser.parse_args()
+
+    print(f"{'transport':<10} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms, {args.requests} requests)")
+    for transport in ("tcp", "uds"):
+        latencies = await benchmark(transport, args)
+        print(
+            f"{transport:<10} {statistics.fmean(latencies):>8.2f} {percentile(latencies, 0.5):>8.2f} "
+            f"{percentile(latencies, 0.95):>8.2f} {percentile(latencies, 0.99):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -22,6 +22,81 @@ class Settings(BaseSettings):
     soco_cli_port: int = 8001
     soco_cli_executable_path: str | None = None
     soco_cli_use_local_cache: bool = False
+    # Write discovered speakers to soco-cli's local speaker list and start
+    # soco-cli with it, so it skips its own discovery
+    soco_cli_share_speaker_list: bool = True
+    # Number of soco-cli server processes (on consecutive ports from soco_cli_port).
+    # Each process handles one request at a time, so more workers let commands to
+    # different speakers run in parallel
+    soco_cli_workers: int = 2
+    # How long to wait for a started soco-cli worker to answer
+    soco_cli_startup_timeout_seconds: float = 15.0
+    # Crashed soco-cli workers are restarted after this delay, doubling on each
+    # crash up to the maximum. A worker that ran for soco_cli_stable_seconds
+    # before crashing starts again from the base delay.
+    soco_cli_restart_backoff_seconds: float = 1.0
+    soco_cli_restart_backoff_max_seconds: float = 60.0
+    soco_cli_stable_seconds: float = 60.0
+    # How sndctl talks to soco-cli: "tcp" (a localhost port per worker) or "uds"
+    # (a Unix domain socket per worker, with no open port). Sockets are created
+    # in soco_cli_socket_directory, or the data directory if that isn't set
+    soco_cli_transport: str = "tcp"
+    soco_cli_socket_directory: str | None = None
+    # Read-only soco-cli commands (volume, track, ...) are cached this long, so
+    # repeated reads within a refresh don't go back to the speaker (0 disables)
+    soco_cli_read_cache_ttl_seconds: float = 1.5
+    
+    # Macro settings
+    # Run macros in-process on SoCoService; soco-cli is only used for actions
+    # without a native implementation
+    macro_native_engine: bool = True
+    # Macro changes made within this window are sent to soco-cli as one reload
+    macro_reload_debounce_seconds: float = 0.5
+    # Number of recent macro runs (with step timelines) kept for profiling
+    macro_run_history_size: int = 200
+    # Steps joined with '&' run concurrently, at most this many at a time
+    macro_parallel_limit: int = 4
+    # Time limit for each macro step (wait steps are exempt)
+    macro_step_timeout_seconds: float = 30.0
+    
+    # Macro scheduler settings
+    # Run macro schedules (cron and sunrise/sunset rules) inside the app
+    macro_scheduler_enabled: bool = True
+    # Speakers used by a scheduled macro are warmed up this long before it fires
+    macro_schedule_prewarm_seconds: float = 5.0
+    # Fires missed by more than this (e.g. after a suspend) are skipped
+    macro_schedule_grace_seconds: float = 60.0
+    # Location used for sunrise/sunset schedules (decimal degrees, east/north positive)
+    latitude: float | None = None
+    longitude: float | None = None
+    
+    # Playback state cache settings
+    # How long (seconds) cached transport states and group coordinators are trusted
+    # before a SOAP read is needed to reconcile them
+    transport_state_ttl_seconds: float = 15.0
+    coordinator_cache_ttl_seconds: float = 30.0
+    
+    # Background state poller settings
+    # The server polls speakers so every client shares one stream of updates:
+    # fast while playing or recently used, slow when idle, and not at all when
+    # no client has asked for speaker state recently
+    state_poller_enabled: bool = True
+    state_poll_fast_seconds: float = 3.0
+    state_poll_slow_seconds: float = 20.0
+    state_poll_recent_seconds: float = 60.0
+    state_poll_client_timeout_seconds: float = 30.0
+    
+    # SoCo worker thread settings
+    # Total threads for blocking SoCo calls, and how many of them polling and
+    # background work (library crawls, discovery) may occupy at once
+    soco_worker_threads: int = 8
+    soco_polling_workers: int = 2
+    soco_background_workers: int = 3
+    
+    # Group orchestration settings
+    # Maximum concurrent join/unjoin calls and the timeout (seconds) for each call
+    group_operation_concurrency: int = 4
+    group_operation_timeout_seconds: float = 5.0
     
     # OpenAI settings for voice control (standalone mode)
     openai_api_key: str | None = None
@@ -37,6 +112,16 @@ class Settings(BaseSettings):
     # Cache refresh interval in hours (0 to disable server-side caching)
     library_cache_refresh_hours: int = 24
     library_cache_refresh_hour: int = 3  # Hour (0-23) to refresh cache (local time)
+    # Items requested per ContentDirectory browse while crawling the library
+    # (speakers may return fewer; the crawl pages on from what it got)
+    library_page_size: int = 500
+    # Library browses in flight at once while crawling, spread across up to
+    # this many group coordinators (also capped by soco_background_workers)
+    library_crawl_concurrency: int = 3
+    # Refresh changed categories as soon as Sonos reports a library update
+    # (ContentDirectory events), waiting this many seconds for updates to settle
+    library_watch_updates: bool = True
+    library_update_debounce_seconds: float = 30.0
     
     # Auto-upgrade settings
     # Ring determines upgrade priority: 0 = canary (immediate), 1-3 = staged rollout
@@ -58,6 +143,17 @@ class Settings(BaseSettings):
         """Get the soco-cli server URL."""
         return f"http://localhost:{self.soco_cli_port}"
     
+    @property
+    def soco_cli_ports(self) -> list[int]:
+        """Get the ports of the soco-cli server worker processes."""
+        return [self.soco_cli_port + i for i in range(max(1, self.soco_cli_workers))]
+    
+    @property
+    def soco_cli_socket_paths(self) -> list[Path]:
+        """Get the Unix socket paths of the soco-cli server worker processes."""
+        directory = Path(self.soco_cli_socket_directory or self.data_directory).resolve()
+        return [directory / f"soco-cli-{port}.sock" for port in self.soco_cli_ports]
+    
     @property
     def macros_file_path(self) -> Path:
         """Get the absolute path to the macros file."""
@@ -67,6 +163,16 @@ class Settings(BaseSettings):
     def macros_metadata_path(self) -> Path:
         """Get the absolute path to the macros metadata file."""
         return Path(self.data_directory).resolve() / "macros-metadata.json"
+    
+    @property
+    def macros_db_path(self) -> Path:
+        """Get the absolute path to the macro store database."""
+        return Path(self.data_directory).resolve() / "macros.db"
+    
+    @property
+    def library_index_path(self) -> Path:
+        """Get the absolute path to the library index database."""
+        return Path(self.data_directory).resolve() / "library.db"
 
 
 @lru_cache
@@ -1,6 +1,8 @@
 """FastAPI application entry point for Sound Control."""
 
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -16,7 +18,15 @@ from .routers import sonos as sonos_router
 from .routers import upgrades as upgrades_router
 from .routers import voice as voice_router
 from .routers import library as library_router
-from .services import MacroService, SocoCliService, SonosCommandService, SoCoService
+from .services import (
+    MacroEngine,
+    MacroScheduler,
+    MacroService,
+    SocoCliService,
+    SonosCommandService,
+    SoCoService,
+    StartupProgress,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -30,13 +40,38 @@ _soco_cli_service: SocoCliService | None = None
 _command_service: SonosCommandService | None = None
 _soco_service: SoCoService | None = None
 _macro_service: MacroService | None = None
+_macro_scheduler: MacroScheduler | None = None
+_startup: StartupProgress | None = None
+
+
+async def _run_startup(startup: StartupProgress) -> None:
+    """Discover speakers, start soco-cli and index the library in the background."""
+    async with startup.phase("discovery"):
+        logger.info("Discovering Sonos speakers...")
+        speakers = await _soco_service.discover_speakers()
+        logger.info("Found %d speakers: %s", len(speakers), ", ".join(speakers))
+    
+    async def _start_soco_cli():
+        async with startup.phase("soco_cli"):
+            if not await _soco_cli_service.start_server():
+                raise RuntimeError("soco-cli server did not start")
+    
+    async def _start_library():
+        async with startup.phase("library"):
+            # Start library cache scheduler (refreshes library cache on schedule)
+            await _soco_service.start_library_cache_scheduler()
+    
+    # soco-cli reads the speaker list discovery published, so it starts after it
+    await asyncio.gather(_start_soco_cli(), _start_library())
+    startup.finish()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan context manager."""
-    global _soco_cli_service, _command_service, _soco_service, _macro_service
+    global _soco_cli_service, _command_service, _soco_service, _macro_service, _macro_scheduler, _startup
     
+    start_time = time.monotonic()
     settings = get_settings()
     logger.info("Starting Sound Control Python backend v%s", __version__)
     logger.info("Data directory: %s", settings.data_directory)
@@ -48,33 +83,47 @@ async def lifespan(app: FastAPI):
     
     # SocoCliService only for macro execution (complex chained commands)
     _soco_cli_service = SocoCliService(settings)
+    _soco_service.add_registry_listener(_soco_cli_service.reload_speaker_list)
     _command_service = SonosCommandService(settings, _soco_cli_service)
-    _macro_service = MacroService(settings, _soco_cli_service)
+    _command_service.add_write_listener(_soco_service.note_external_change)
+    _macro_engine = MacroEngine(settings, _soco_service, _command_service)
+    _macro_service = MacroService(settings, _soco_cli_service, _macro_engine, _soco_service)
+    _macro_scheduler = MacroScheduler(settings, _macro_service, _soco_service)
     
     # Initialize routers with services
     sonos_router.init_router(_soco_cli_service, _command_service, _soco_service)
-    macros_router.init_router(_macro_service)
+    macros_router.init_router(_macro_service, _macro_scheduler)
     library_router.init_router(_soco_service)
     voice_router.init_router(settings)
     
-    # Pre-discover speakers on startup
-    logger.info("Discovering Sonos speakers...")
-    speakers = await _soco_service.discover_speakers()
-    logger.info("Found %d speakers: %s", len(speakers), ", ".join(speakers))
+    # Start the shared speaker state poller
+    await _soco_service.start_state_poller()
+    
+    # Start the macro scheduler (cron and sunrise/sunset schedules)
+    await _macro_scheduler.start()
     
-    # Start library cache scheduler (refreshes library cache on schedule)
-    await _soco_service.start_library_cache_scheduler()
+    # Discovery, soco-cli and the library index start in the background so the
+    # app serves requests right away; /api/startup reports their progress
+    _startup = StartupProgress(["discovery", "soco_cli", "library"], required=["discovery"])
+    startup_task = asyncio.create_task(_run_startup(_startup))
     
-    logger.info("Services initialized")
+    logger.info("Services initialized in %.2fs", time.monotonic() - start_time)
     
     yield
     
     # Cleanup
     logger.info("Shutting down...")
+    startup_task.cancel()
+    try:
+        await startup_task
+    except asyncio.CancelledError:
+        pass
+    await _macro_scheduler.stop()
     await _soco_service.stop_library_cache_scheduler()
-    await _command_service.close()
+    await _soco_service.stop_state_poller()
+    _soco_service.close()
     await _macro_service.close()
-    _soco_cli_service.stop_server()
+    await _soco_cli_service.stop_server()
 
 
 # Create FastAPI app
@@ -121,6 +170,18 @@ async def get_version():
     return {"version": __version__}
 
 
+@app.get("/api/startup")
+async def get_startup_status():
+    """Get startup progress.
+    
+    The app serves requests while speakers are discovered, soco-cli starts
+    and the library is indexed. It reports ready once discovery finished.
+    """
+    if _startup is None:
+        return {"ready": False, "complete": False, "phases": {}}
+    return _startup.get_status()
+
+
 @app.get("/app")
 async def serve_mobile_app():
     """Serve the mobile app HTML."""
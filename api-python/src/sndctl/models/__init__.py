@@ -10,11 +10,15 @@ from .sonos import (
     Favorite,
     QueueItem,
     ShareLinkRequest,
+    TransferRequest,
 )
 from .macro import (
     Macro,
     MacroParameter,
+    MacroSchedule,
     MacroExecuteRequest,
+    MacroDiagnostic,
+    MacroValidationResult,
 )
 from .voice import (
     ApiKeyRequest,
@@ -30,8 +34,12 @@ __all__ = [
     "Favorite",
     "QueueItem",
     "ShareLinkRequest",
+    "TransferRequest",
     "Macro",
     "MacroParameter",
+    "MacroSchedule",
     "MacroExecuteRequest",
+    "MacroDiagnostic",
+    "MacroValidationResult",
     "ApiKeyRequest",
 ]
@@ -103,3 +103,26 @@ class GenreBrowseResult(BaseModel):
     items: list[Genre] = Field(..., description="Genre items")
     total_matches: int = Field(..., description="Total matches available")
     number_returned: int = Field(..., description="Number of items returned")
+
+
+class LibrarySearchItem(LibraryItem):
+    """Library search hit from any category."""
+    
+    category: str = Field(..., description="Category: artists, albums, tracks or genres")
+    artist: Optional[str] = Field(None, description="Artist")
+    album: Optional[str] = Field(None, description="Album name")
+    album_art_uri: Optional[str] = Field(None, description="Album art URL")
+
+
+class LibrarySearchResult(BaseModel):
+    """Library search results, best match first."""
+    
+    model_config = ConfigDict(alias_generator=lambda x: ''.join(
+        word.capitalize() if i > 0 else word for i, word in enumerate(x.split('_'))
+    ), populate_by_name=True)
+    
+    items: list[LibrarySearchItem] = Field(..., description="Matching items")
+    total_matches: int = Field(..., description="Total matches available")
+    number_returned: int = Field(..., description="Number of items returned")
+    offset: int = Field(0, description="Index of the first returned match")
+    is_indexed: bool = Field(..., description="Whether the library has been indexed yet")
@@ -15,6 +15,16 @@ class MacroParameter(CamelCaseModel):
     default_value: str | None = None
 
 
+class MacroSchedule(CamelCaseModel):
+    """A rule that runs a macro automatically."""
+    
+    kind: str = "cron"  # cron, sunrise, sunset
+    cron: str | None = None  # 5-field cron expression for kind "cron"
+    offset_minutes: int = 0  # Minutes after (negative: before) sunrise/sunset
+    arguments: list[str] = []
+    enabled: bool = True
+
+
 class Macro(CamelCaseModel):
     """Represents a Sonos macro."""
     
@@ -24,6 +34,24 @@ class Macro(CamelCaseModel):
     category: str | None = None
     is_favorite: bool = False
     parameters: list[MacroParameter] = []
+    schedules: list[MacroSchedule] = []
+
+
+class MacroDiagnostic(CamelCaseModel):
+    """A problem found by static validation of a macro."""
+    
+    severity: str = "error"  # error, warning
+    code: str = ""  # unknown_action, unknown_speaker, undeclared_parameter, etc.
+    message: str = ""
+    command: int | None = None  # Index of the command in the definition
+    text: str | None = None  # The command as written
+
+
+class MacroValidationResult(CamelCaseModel):
+    """Result of validating a macro without running it."""
+    
+    valid: bool = True  # False if any diagnostic is an error
+    diagnostics: list[MacroDiagnostic] = []
 
 
 class MacroExecuteRequest(CamelCaseModel):
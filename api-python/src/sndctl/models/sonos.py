@@ -45,6 +45,7 @@ class SocoCliResponse(CamelCaseModel):
     exit_code: int = 0
     result: str = ""
     error_msg: str = ""
+    cached: bool = False  # Answered from the read cache, without a soco-cli call
 
 
 class SocoServerStatus(CamelCaseModel):
@@ -102,6 +103,12 @@ class QueueItem(CamelCaseModel):
     is_current: bool = False
 
 
+class TransferRequest(CamelCaseModel):
+    """Request to transfer playback to one or more speakers."""
+    
+    targets: list[str] = []
+
+
 class ShareLinkRequest(CamelCaseModel):
     """Request to add a share link to the queue."""
     
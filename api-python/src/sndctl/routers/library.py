@@ -1,6 +1,7 @@
 """Local music library endpoints with server-side caching."""
 
 import logging
+from typing import Literal
 
 from fastapi import APIRouter, HTTPException, Query
 
@@ -9,6 +10,7 @@ from ..models.library import (
     AlbumBrowseResult,
     TrackBrowseResult,
     GenreBrowseResult,
+    LibrarySearchResult,
 )
 from ..services.soco_service import SoCoService
 
@@ -50,9 +52,13 @@ async def get_artists(
         max_items: Maximum number of items to return (1-1000).
         
     Returns:
-        Browse result with artists.
+        Browse result with artists (from the library index when unfiltered).
     """
     soco = _get_service()
+    if not search:
+        indexed = soco.get_indexed_library("artists", max_items=max_items)
+        if indexed is not None:
+            return indexed
     return await soco.get_library_artists(search=search, max_items=max_items)
 
 
@@ -70,9 +76,13 @@ async def get_albums(
         max_items: Maximum number of items to return (1-1000).
         
     Returns:
-        Browse result with albums.
+        Browse result with albums (from the library index when unfiltered).
     """
     soco = _get_service()
+    if not artist_id and not search:
+        indexed = soco.get_indexed_library("albums", max_items=max_items)
+        if indexed is not None:
+            return indexed
     return await soco.get_library_albums(
         artist_id=artist_id,
         search=search,
@@ -94,9 +104,13 @@ async def get_tracks(
         max_items: Maximum number of items to return (1-1000).
         
     Returns:
-        Browse result with tracks.
+        Browse result with tracks (from the library index when unfiltered).
     """
     soco = _get_service()
+    if not album_id and not search:
+        indexed = soco.get_indexed_library("tracks", max_items=max_items)
+        if indexed is not None:
+            return indexed
     return await soco.get_library_tracks(
         album_id=album_id,
         search=search,
@@ -114,28 +128,71 @@ async def get_genres(
         max_items: Maximum number of items to return (1-1000).
         
     Returns:
-        Browse result with genres.
+        Browse result with genres (from the library index once indexed).
     """
     soco = _get_service()
+    indexed = soco.get_indexed_library("genres", max_items=max_items)
+    if indexed is not None:
+        return indexed
     return await soco.get_library_genres(max_items=max_items)
 
 
+@router.get("/search", response_model=LibrarySearchResult)
+async def search_library(
+    q: str = Query(..., min_length=1, description="Search text (prefix match on each word)"),
+    category: Literal["artists", "albums", "tracks", "genres"] | None = Query(
+        None, description="Category to search (default: all)"
+    ),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(20, ge=1, le=500, description="Maximum results to return"),
+) -> LibrarySearchResult:
+    """Search the indexed library by title, artist and album.
+    
+    Served from the server's full-text index, so no request reaches the
+    speakers. Until the library has been indexed (or with the library cache
+    disabled) the search runs on a speaker instead, with isIndexed false.
+    
+    Args:
+        q: Search text; every word must match the start of a word.
+        category: Optional category to search.
+        offset: Number of results to skip (for paging).
+        limit: Maximum number of results to return (1-500).
+    
+    Returns:
+        Search result, best match first.
+    """
+    soco = _get_service()
+    try:
+        return await soco.search_library(q, category=category, offset=offset, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 # =============================================================================
 # CACHE MANAGEMENT ENDPOINTS
 # =============================================================================
 
 @router.get("/cache")
-async def get_cache():
-    """Get the entire library cache for client-side caching.
+async def get_cache(
+    offset: int = Query(0, ge=0, description="Number of items to skip in each category"),
+    limit: int = Query(1000, ge=1, le=5000, description="Maximum items per category"),
+):
+    """Get a page of the library cache.
     
-    Returns all cached library data (artists, albums, tracks, genres).
-    The client can cache this and filter locally for faster browsing.
+    Returns up to `limit` cached items of each category (artists, albums,
+    tracks, genres) and the total count of each, so large libraries can be
+    paged instead of sent whole. Browsing and search are better served by
+    the category and /search endpoints, which read the same index.
+    
+    Args:
+        offset: Number of items to skip in each category.
+        limit: Maximum number of items per category (1-5000).
     
     Returns:
-        Dict with all cached library items and metadata.
+        Dict with cached library items, item counts and metadata.
     """
     soco = _get_service()
-    return soco.get_library_cache()
+    return soco.get_library_cache(offset=offset, limit=limit)
 
 
 @router.get("/cache/status")
@@ -150,21 +207,26 @@ async def get_cache_status():
 
 
 @router.post("/cache/refresh")
-async def refresh_cache():
+async def refresh_cache(
+    force: bool = Query(False, description="Re-crawl every category even if Sonos reports no changes")
+):
     """Manually refresh the library cache.
     
-    This fetches all library data from Sonos and updates the server cache.
-    Useful after adding new music to the library.
+    This re-fetches the library categories Sonos reports as changed and
+    updates the server cache. Useful after adding new music to the library.
+    
+    Args:
+        force: Re-crawl every category even if nothing changed.
     
     Returns:
         Dict with counts of cached items.
     """
     soco = _get_service()
     try:
-        result = await soco.refresh_library_cache()
+        result = await soco.refresh_library_cache(force=force)
         return {
             "success": True,
-            "message": "Library cache refreshed",
+            "message": "Library unchanged" if result["skipped"] else "Library cache refreshed",
             **result
         }
     except Exception as e:
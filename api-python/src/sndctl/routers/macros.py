@@ -1,12 +1,14 @@
 """Macro API router - /api/macro/* endpoints."""
 
+import codecs
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 from fastapi import APIRouter, File, HTTPException, Query, Response, UploadFile
 
-from ..models import Macro, MacroExecuteRequest
-from ..services import MacroService
+from ..models import Macro, MacroExecuteRequest, MacroValidationResult
+from ..services import MacroNotFoundError, MacroScheduler, MacroService
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +16,14 @@ router = APIRouter(prefix="/api/macro", tags=["macro"])
 
 # This will be set by the main app
 _macro_service: MacroService | None = None
+_macro_scheduler: MacroScheduler | None = None
 
 
-def init_router(macro_service: MacroService) -> None:
+def init_router(macro_service: MacroService, macro_scheduler: MacroScheduler) -> None:
     """Initialize the router with services."""
-    global _macro_service
+    global _macro_service, _macro_scheduler
     _macro_service = macro_service
+    _macro_scheduler = macro_scheduler
 
 
 def _get_macro_service() -> MacroService:
@@ -29,6 +33,13 @@ def _get_macro_service() -> MacroService:
     return _macro_service
 
 
+def _get_macro_scheduler() -> MacroScheduler:
+    """Get the macro scheduler."""
+    if _macro_scheduler is None:
+        raise RuntimeError("Services not initialized")
+    return _macro_scheduler
+
+
 @router.get("")
 async def get_all_macros() -> list[Macro]:
     """Get all macros."""
@@ -56,6 +67,27 @@ async def export_macros() -> Response:
         raise HTTPException(status_code=500, detail="Failed to export macros")
 
 
+@router.get("/runs")
+async def get_macro_runs(
+    macro: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+) -> list[dict]:
+    """Get recent macro runs with per-step timelines, newest first."""
+    return _get_macro_service().get_runs(macro, limit)
+
+
+@router.get("/runs/stats")
+async def get_macro_run_stats() -> dict:
+    """Get run-time percentiles per macro over the recent runs."""
+    return _get_macro_service().get_run_stats()
+
+
+@router.get("/schedule")
+async def get_macro_schedule() -> dict:
+    """Get upcoming scheduled macro fires and the drift of recent ones."""
+    return _get_macro_scheduler().get_status()
+
+
 @router.get("/execute/{name}")
 async def execute_macro_by_name(name: str) -> Any:
     """Execute a macro by name (GET - browser friendly)."""
@@ -64,6 +96,8 @@ async def execute_macro_by_name(name: str) -> Any:
     
     try:
         return await _get_macro_service().execute_macro(name, [])
+    except MacroNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error("Failed to execute macro %s: %s", name, e)
         raise HTTPException(status_code=500, detail=f"Failed to execute macro: {e}")
@@ -79,12 +113,30 @@ async def get_macro(name: str) -> Macro:
 
 
 @router.post("")
-async def save_macro(macro: Macro) -> Macro:
-    """Create or update a macro."""
+async def save_macro(macro: Macro, force: bool = Query(default=False)) -> Macro:
+    """Create or update a macro.
+    
+    Macros whose definition has errors are rejected with 422 and the
+    validation diagnostics, unless force is set.
+    """
     if not macro.name:
         raise HTTPException(status_code=400, detail="Macro name is required")
     if not macro.definition:
         raise HTTPException(status_code=400, detail="Macro definition is required")
+    try:
+        _get_macro_scheduler().validate_schedules(macro.schedules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    validation = _get_macro_service().validate_macro(macro)
+    if not validation.valid and not force:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": "Macro definition has errors",
+                "diagnostics": [d.model_dump(by_alias=True) for d in validation.diagnostics],
+            },
+        )
     
     result = await _get_macro_service().save_macro(macro)
     if result:
@@ -118,11 +170,21 @@ async def execute_macro(request: MacroExecuteRequest) -> Any:
     
     try:
         return await _get_macro_service().execute_macro(request.macro_name, request.arguments)
+    except MacroNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error("Failed to execute macro %s: %s", request.macro_name, e)
         raise HTTPException(status_code=500, detail=f"Failed to execute macro: {e}")
 
 
+@router.post("/validate")
+async def validate_macro(macro: Macro) -> MacroValidationResult:
+    """Check a macro definition without running it."""
+    if not macro.definition:
+        raise HTTPException(status_code=400, detail="Macro definition is required")
+    return _get_macro_service().validate_macro(macro)
+
+
 @router.post("/reload")
 async def reload_macros() -> dict:
     """Reload all macros in the soco-cli server."""
@@ -136,31 +198,60 @@ async def reload_macros() -> dict:
 async def import_macros(
     file: UploadFile = File(None),
     merge: bool = Query(default=False),
+    force: bool = Query(default=False),
 ) -> dict:
-    """Import macros from an uploaded file."""
+    """Import macros from an uploaded file.
+    
+    Macros whose definition has errors are reported as invalid and left
+    out, unless force is set.
+    """
     logger.warning(
-        "Import request received. File: %s, Length: %s, Merge: %s",
+        "Import request received. File: %s, Length: %s, Merge: %s, Force: %s",
         file.filename if file else "null",
         file.size if file else 0,
         merge,
+        force,
     )
     
     if file is None or file.size == 0:
         raise HTTPException(status_code=400, detail="No file uploaded or file is empty")
     
     try:
-        content = await file.read()
-        content_str = content.decode("utf-8")
-        
-        result = await _get_macro_service().import_macros(content_str, merge=merge)
+        result = await _get_macro_service().import_macros(
+            _iter_upload_lines(file), merge=merge, force=force
+        )
         
         return {
             "success": result.success,
             "message": result.message,
             "importedCount": result.imported_count,
+            "lines": [
+                {
+                    "line": line.line,
+                    "name": line.name,
+                    "status": line.status,
+                    "message": line.message,
+                    "diagnostics": [d.model_dump(by_alias=True) for d in line.diagnostics],
+                }
+                for line in result.lines
+            ],
         }
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be valid UTF-8 text")
     except Exception as e:
         logger.error("Failed to import macros: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to import macros: {e}")
+
+
+async def _iter_upload_lines(file: UploadFile) -> AsyncIterator[str]:
+    """Read an uploaded text file line by line, decoding UTF-8 incrementally."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    while chunk := await file.read(64 * 1024):
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
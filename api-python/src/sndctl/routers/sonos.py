@@ -18,6 +18,7 @@ from ..models import (
     SocoCliResponse,
     SonosCommandRequest,
     Speaker,
+    TransferRequest,
 )
 from ..services import SocoCliService, SonosCommandService, SoCoService
 
@@ -81,6 +82,12 @@ async def get_status() -> dict:
     return _get_soco_cli_service().get_status()
 
 
+@router.get("/health")
+async def get_health() -> dict:
+    """Get soco-cli worker health: readiness, uptime and restarts."""
+    return _get_soco_cli_service().get_health()
+
+
 @router.post("/start")
 async def start_server() -> dict:
     """Start the soco-cli HTTP API server."""
@@ -90,10 +97,22 @@ async def start_server() -> dict:
     raise HTTPException(status_code=500, detail="Failed to start server")
 
 
+@router.get("/scheduler")
+async def get_scheduler_stats() -> dict:
+    """Get queue statistics for SoCo work (interactive, polling, background)."""
+    return _get_soco_service().get_scheduler_stats()
+
+
+@router.get("/state")
+async def get_speaker_states() -> dict:
+    """Get the shared speaker state cache maintained by the background poller."""
+    return _get_soco_service().get_state_snapshot()
+
+
 @router.post("/stop")
 async def stop_server() -> dict:
     """Stop the soco-cli HTTP API server."""
-    result = _get_soco_cli_service().stop_server()
+    result = await _get_soco_cli_service().stop_server()
     if result:
         return {"message": "Server stopped successfully"}
     raise HTTPException(status_code=500, detail="Failed to stop server")
@@ -144,14 +163,10 @@ async def execute_command(request: SonosCommandRequest) -> SocoCliResponse:
 async def play_pause(speaker_name: str) -> dict:
     """Toggle play/pause on a speaker using SoCo library.
     
-    Uses lightweight get_playback_state() for fast response.
+    Decides from the cached transport state, so a warm toggle is a single
+    SOAP call; the speaker is only read when the cached state is stale.
     """
-    state = await _get_soco_service().get_playback_state(speaker_name)
-    if state == "PLAYING":
-        success = await _get_soco_service().pause(speaker_name)
-    else:
-        success = await _get_soco_service().play(speaker_name)
-    return {"success": success}
+    return await _get_soco_service().toggle_playback(speaker_name)
 
 
 @router.post("/speakers/{speaker_name}/volume/{volume}")
@@ -231,17 +246,23 @@ async def ungroup_speaker(speaker_name: str) -> dict:
 
 
 @router.post("/speakers/{speaker_name}/party")
-async def party_mode(speaker_name: str) -> dict:
-    """Activate party mode (group all speakers) using SoCo library."""
-    success = await _get_soco_service().party_mode(speaker_name)
-    return {"success": success}
+async def party_mode(speaker_name: str, rollback: bool = False) -> dict:
+    """Activate party mode (group all speakers) using SoCo library.
+    
+    Joins run concurrently; the response reports the outcome per speaker.
+    With rollback=true the previous grouping is restored on failure.
+    """
+    return await _get_soco_service().party_mode(speaker_name, rollback=rollback)
 
 
 @router.post("/speakers/{speaker_name}/ungroup-all")
-async def ungroup_all(speaker_name: str) -> dict:
-    """Ungroup all speakers using SoCo library."""
-    success = await _get_soco_service().ungroup_all(speaker_name)
-    return {"success": success}
+async def ungroup_all(speaker_name: str, rollback: bool = False) -> dict:
+    """Ungroup all speakers using SoCo library.
+    
+    Unjoins run concurrently; the response reports the outcome per speaker.
+    With rollback=true the previous grouping is restored on failure.
+    """
+    return await _get_soco_service().ungroup_all(speaker_name, rollback=rollback)
 
 
 @router.post("/speakers/{speaker_name}/group-volume/{volume}")
@@ -257,14 +278,18 @@ async def set_group_volume(speaker_name: str, volume: int) -> dict:
 async def transfer_playback(speaker_name: str, target_speaker: str) -> dict:
     """Transfer playback to another speaker.
     
-    Note: This uses grouping - joins target to source, then ungroups source.
+    Note: This uses grouping - the target joins the source's group, then the
+    source hands the group over and leaves it.
     """
-    # Group target with source (source is playing)
-    success = await _get_soco_service().group_speakers(speaker_name, target_speaker)
-    if success:
-        # Ungroup the original speaker, leaving target playing
-        await _get_soco_service().ungroup_speaker(speaker_name)
-    return {"success": success}
+    return await _get_soco_service().transfer(speaker_name, [target_speaker])
+
+
+@router.post("/speakers/{speaker_name}/transfer")
+async def transfer_playback_to_many(speaker_name: str, request: TransferRequest) -> dict:
+    """Transfer playback to several speakers at once."""
+    if not request.targets:
+        raise HTTPException(status_code=400, detail="At least one target speaker is required")
+    return await _get_soco_service().transfer(speaker_name, request.targets)
 
 
 # ========================================
@@ -3,11 +3,18 @@
 from .soco_cli_service import SocoCliService
 from .sonos_command_service import SonosCommandService
 from .soco_service import SoCoService
-from .macro_service import MacroService
+from .macro_engine import MacroEngine
+from .macro_service import MacroNotFoundError, MacroService
+from .macro_scheduler import MacroScheduler
+from .startup import StartupProgress
 
 __all__ = [
     "SocoCliService",
     "SonosCommandService",
     "SoCoService",
+    "MacroEngine",
+    "MacroNotFoundError",
     "MacroService",
+    "MacroScheduler",
+    "StartupProgress",
 ]
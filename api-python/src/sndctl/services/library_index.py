@@ -0,0 +1,461 @@
+"""SQLite-backed index of the local music library.
+
+The library crawl pages through every ContentDirectory container and writes
+each page straight into this database, so even a very large NAS library is
+indexed in full without holding it in memory. Each crawl of a category
+writes a new generation of rows, which replaces the previous one in a single
+transaction once the crawl is complete; readers never see a half-crawled
+category.
+
+The current generation's titles, artists and albums are also kept in an FTS5
+full-text index for prefix search ranked by bm25. SQLite builds without FTS5
+fall back to LIKE matching.
+
+The database lives in the data directory, so the index (and the time of the
+last refresh) survives restarts and upgrades and is served straight away.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..models.library import Album, Artist, Genre, Track
+
+logger = logging.getLogger(__name__)
+
+# Library categories and the item model of each
+CATEGORY_MODELS = {
+    "artists": Artist,
+    "albums": Album,
+    "tracks": Track,
+    "genres": Genre,
+}
+
+# Item fields stored as columns (the rest of each model is left empty)
+ITEM_COLUMNS = ("id", "title", "uri", "artist", "album", "album_art_uri")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_items (
+    item_key INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    uri TEXT,
+    artist TEXT,
+    album TEXT,
+    album_art_uri TEXT
+);
+
+CREATE INDEX IF NOT EXISTS library_items_position
+    ON library_items (category, generation, position);
+
+CREATE TABLE IF NOT EXISTS library_categories (
+    category TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    item_count INTEGER NOT NULL,
+    total_matches INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    crawled_at TEXT NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    items_per_second REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Only items of finished crawls are added to the full-text index, so searches
+# never need to check generations. The category is indexed too, so filtering
+# and counting by category stay inside the index.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(
+    title, artist, album, category,
+    content='library_items', content_rowid='item_key',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# bm25 weights of the title, artist, album and category columns
+FTS_WEIGHTS = (10.0, 3.0, 1.0, 0.0)
+
+# Queries with more matches than this return them in library order instead
+# of ranking them all (ranking costs time for every match)
+RANKED_MATCH_LIMIT = 1000
+
+# Bytes of the database file memory-mapped for reads
+MMAP_SIZE = 128 * 1024 * 1024
+
+# Characters that separate search terms
+SEARCH_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class LibraryIndex:
+    """Persistent, generation-swapped index of library items."""
+    
+    def __init__(self, db_path: Path):
+        """Open (and create if needed) the library database.
+        
+        Args:
+            db_path: Path to the SQLite database file.
+        """
+        self._db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._discard_unfinished()
+        self._fts = self._create_fts()
+        # Crawl writes run on worker threads through their own connection, so
+        # reads never see a write transaction in progress (WAL keeps them on
+        # the last committed state). Callers must not run writes concurrently.
+        self._write_conn = self._connect()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Reads come straight from the mapped file, so a restart needs no load step
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+    
+    @property
+    def path(self) -> Path:
+        """Get the path to the database file."""
+        return self._db_path
+    
+    def close(self) -> None:
+        """Close the database connections."""
+        self._write_conn.close()
+        self._conn.close()
+    
+    def _create_fts(self) -> bool:
+        """Create the full-text index, filling it from the indexed items if it is new.
+        
+        Returns:
+            False if this SQLite build has no FTS5.
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'library_fts'"
+        ).fetchone()
+        try:
+            self._conn.execute(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite full-text search unavailable, library search uses LIKE: %s", e)
+            return False
+        if not exists:
+            with self._conn:
+                self._conn.execute("INSERT INTO library_fts (library_fts) VALUES ('rebuild')")
+        return True
+    
+    def _discard_unfinished(self) -> None:
+        """Delete rows left behind by crawls that never finished."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM library_items WHERE NOT EXISTS ("
+                " SELECT 1 FROM library_categories c"
+                " WHERE c.category = library_items.category"
+                " AND c.generation = library_items.generation)"
+            )
+        if cursor.rowcount:
+            logger.info("Discarded %d library items from an unfinished crawl", cursor.rowcount)
+    
+    # =========================================================================
+    # CRAWL WRITES
+    # =========================================================================
+    # These block on disk I/O (finishing a large category takes a while);
+    # run them on a worker thread, one at a time.
+    
+    def start_category(self, category: str) -> int:
+        """Start a new crawl generation for a category.
+        
+        Returns:
+            The generation that the crawl's items are written to.
+        """
+        with self._write_conn:
+            row = self._write_conn.execute(
+                "SELECT value FROM index_meta WHERE key = 'last_generation'"
+            ).fetchone()
+            generation = (json.loads(row["value"]) if row else 0) + 1
+            self._write_conn.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('last_generation', ?)",
+                (json.dumps(generation),),
+            )
+        return generation
+    
+    def add_items(
+        self, category: str, generation: int, start: int, items: list[dict[str, Any]]
+    ) -> None:
+        """Append one page of crawled items in a single transaction.
+        
+        Args:
+            category: Library category.
+            generation: Generation from start_category.
+            start: Position of the first item in the category.
+            items: Items as model dicts.
+        """
+        with self._write_conn:
+            self._write_conn.executemany(
+                "INSERT INTO library_items "
+                "(category, generation, position, id, title, uri, artist, album, album_art_uri) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (category, generation, start + offset, *(item.get(c) for c in ITEM_COLUMNS))
+                    for offset, item in enumerate(items)
+                ),
+            )
+    
+    def finish_category(
+        self,
+        category: str,
+        generation: int,
+        total_matches: int,
+        pages: int,
+        elapsed_seconds: float,
+    ) -> dict[str, Any]:
+        """Make a finished crawl the category's current generation.
+        
+        Args:
+            category: Library category.
+            generation: Generation from start_category.
+            total_matches: Item count reported by the speaker.
+            pages: Number of browse requests the crawl made.
+            elapsed_seconds: Crawl duration.
+        
+        Returns:
+            Crawl statistics for the category.
+        """
+        with self._write_conn:
+            item_count = self._write_conn.execute(
+                "SELECT COUNT(*) FROM library_items WHERE category = ? AND generation = ?",
+                (category, generation),
+            ).fetchone()[0]
+            stats = {
+                "category": category,
+                "generation": generation,
+                "item_count": item_count,
+                "total_matches": total_matches,
+                "pages": pages,
+                "crawled_at": datetime.now(timezone.utc).isoformat(),
+                "elapsed_seconds": round(elapsed_seconds, 3),
+                "items_per_second": round(item_count / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+            }
+            self._write_conn.execute(
+                "INSERT OR REPLACE INTO library_categories "
+                "(category, generation, item_count, total_matches, pages, crawled_at, elapsed_seconds, items_per_second) "
+                "VALUES (:category, :generation, :item_count, :total_matches, :pages, :crawled_at, "
+                ":elapsed_seconds, :items_per_second)",
+                stats,
+            )
+            if self._fts:
+                self._write_conn.execute(
+                    "INSERT INTO library_fts (library_fts, rowid, title, artist, album, category) "
+                    "SELECT 'delete', item_key, title, artist, album, category FROM library_items "
+                    "WHERE category = ? AND generation != ?",
+                    (category, generation),
+                )
+                self._write_conn.execute(
+                    "INSERT INTO library_fts (rowid, title, artist, album, category) "
+                    "SELECT item_key, title, artist, album, category FROM library_items "
+                    "WHERE category = ? AND generation = ?",
+                    (category, generation),
+                )
+            self._write_conn.execute(
+                "DELETE FROM library_items WHERE category = ? AND generation != ?",
+                (category, generation),
+            )
+        return stats
+    
+    def discard_generation(self, category: str, generation: int) -> None:
+        """Delete the items of an abandoned crawl."""
+        with self._write_conn:
+            self._write_conn.execute(
+                "DELETE FROM library_items WHERE category = ? AND generation = ?",
+                (category, generation),
+            )
+    
+    # =========================================================================
+    # READS
+    # =========================================================================
+    
+    def _current_generation(self, category: str) -> int | None:
+        """Get the generation of a category's last finished crawl."""
+        row = self._conn.execute(
+            "SELECT generation FROM library_categories WHERE category = ?", (category,)
+        ).fetchone()
+        return row["generation"] if row else None
+    
+    def get_items(self, category: str, start: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get indexed items of a category in library order.
+        
+        Args:
+            category: Library category.
+            start: Position of the first item to return.
+            limit: Maximum number of items, or None for all of them.
+        
+        Returns:
+            Items as model dicts.
+        """
+        generation = self._current_generation(category)
+        if generation is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT * FROM library_items WHERE category = ? AND generation = ? AND position >= ? "
+            "ORDER BY position LIMIT ?",
+            (category, generation, start, -1 if limit is None else limit),
+        )
+        return [self._row_to_item(category, row) for row in rows]
+    
+    def count(self, category: str) -> int:
+        """Get the number of indexed items in a category."""
+        row = self._conn.execute(
+            "SELECT item_count FROM library_categories WHERE category = ?", (category,)
+        ).fetchone()
+        return row["item_count"] if row else 0
+    
+    def get_crawl_stats(self) -> dict[str, dict[str, Any]]:
+        """Get the statistics of the last finished crawl of each category."""
+        rows = self._conn.execute("SELECT * FROM library_categories ORDER BY category")
+        return {row["category"]: dict(row) for row in rows}
+    
+    def search(
+        self,
+        query: str,
+        categories: list[str] | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Search indexed items by title, artist and album.
+        
+        Every word of the query must match the start of a word in the item
+        (so "beat ab" finds "Abbey Road" by The Beatles). Results are ranked
+        by bm25 with titles weighted highest. Very broad queries return
+        matches in library order instead, and the LIKE fallback puts titles
+        starting with the first word first.
+        
+        Args:
+            query: Search text.
+            categories: Categories to search, or None for all of them.
+            offset: Number of results to skip (for paging).
+            limit: Maximum number of results.
+        
+        Returns:
+            Tuple of the results (item dicts with their category) and the
+            total number of matches.
+        """
+        terms = SEARCH_TERM_PATTERN.findall(query)
+        if not terms:
+            return [], 0
+        categories = [c for c in (categories or CATEGORY_MODELS) if c in CATEGORY_MODELS]
+        if not categories:
+            return [], 0
+        
+        if self._fts:
+            rowids, total = self._search_fts(terms, categories, offset, limit)
+            rows = self._conn.execute(
+                "SELECT * FROM library_items WHERE item_key IN ({})".format(", ".join("?" * len(rowids))),
+                rowids,
+            ).fetchall()
+            by_key = {row["item_key"]: row for row in rows}
+            rows = [by_key[rowid] for rowid in rowids if rowid in by_key]
+        else:
+            rows, total = self._search_like(terms, categories, offset, limit)
+        
+        items = [
+            {"category": row["category"], **self._row_to_item(row["category"], row)}
+            for row in rows
+        ]
+        return items, total
+    
+    def _search_fts(
+        self, terms: list[str], categories: list[str], offset: int, limit: int
+    ) -> tuple[list[int], int]:
+        """Search the full-text index.
+        
+        Returns:
+            Tuple of the matching item keys (best first) and the total matches.
+        """
+        match = "{{title artist album}} : ({}) AND category : ({})".format(
+            " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms),
+            " OR ".join(f'"{category}"' for category in categories),
+        )
+        total = self._conn.execute(
+            "SELECT COUNT(*) FROM library_fts WHERE library_fts MATCH ?", (match,)
+        ).fetchone()[0]
+        if total == 0:
+            return [], 0
+        
+        if total <= RANKED_MATCH_LIMIT:
+            order = "bm25(library_fts, {}, {}, {}, {}), rowid".format(*FTS_WEIGHTS)
+        else:
+            order = "rowid"
+        rowids = [
+            row[0] for row in self._conn.execute(
+                f"SELECT rowid FROM library_fts WHERE library_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            )
+        ]
+        return rowids, total
+    
+    def _search_like(
+        self, terms: list[str], categories: list[str], offset: int, limit: int
+    ) -> tuple[list[sqlite3.Row], int]:
+        """Search with LIKE, for SQLite builds without FTS5.
+        
+        Returns:
+            Tuple of the matching rows (titles starting with the first word
+            first) and the total matches.
+        """
+        conditions = []
+        params: list[Any] = []
+        for term in terms:
+            conditions.append("(i.title LIKE ? OR i.artist LIKE ? OR i.album LIKE ?)")
+            params.extend([f"%{term}%"] * 3)
+        source = (
+            "library_items i "
+            "JOIN library_categories c ON c.category = i.category AND c.generation = i.generation "
+            "WHERE {} AND c.category IN ({})".format(" AND ".join(conditions), ", ".join("?" * len(categories)))
+        )
+        params.extend(categories)
+        
+        total = self._conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+        rows = self._conn.execute(
+            f"SELECT i.* FROM {source} ORDER BY i.title LIKE ? DESC, i.title LIMIT ? OFFSET ?",
+            [*params, f"{terms[0]}%", limit, offset],
+        ).fetchall()
+        return rows, total
+    
+    def get_meta(self, key: str) -> Any:
+        """Get a JSON value from the index's bookkeeping table."""
+        row = self._conn.execute(
+            "SELECT value FROM index_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row["value"]) if row else None
+    
+    def set_meta(self, key: str, value: Any) -> None:
+        """Set a JSON value in the index's bookkeeping table."""
+        self.update_meta({key: value})
+    
+    def update_meta(self, values: dict[str, Any]) -> None:
+        """Set several JSON values in the bookkeeping table in one transaction."""
+        with self._write_conn:
+            self._write_conn.executemany(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in values.items()),
+            )
+    
+    @staticmethod
+    def _row_to_item(category: str, row: sqlite3.Row) -> dict[str, Any]:
+        """Convert a row into the dict shape of the category's model."""
+        return {
+            field: row[field] if field in ITEM_COLUMNS else None
+            for field in CATEGORY_MODELS[category].model_fields
+        }
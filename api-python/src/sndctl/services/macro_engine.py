@@ -0,0 +1,715 @@
+"""In-process macro execution engine.
+
+Macros in macros.txt use the soco-cli sequence syntax::
+
+    morning = Kitchen volume 40 : Kitchen play_favourite "Radio 4"
+
+Commands within a stage can also be joined with ``&`` to run concurrently,
+for example ``Kitchen volume 30 & Den volume 30 : Kitchen party_mode``.
+
+Running them through the soco-cli HTTP server means a second process with
+its own discovery and no shared state. This engine parses the same syntax
+and runs each step directly on SoCoService, reusing its speaker registry,
+coordinator cache and worker threads. Actions without a native
+implementation are passed through to soco-cli one step at a time.
+"""
+
+import asyncio
+import logging
+import re
+import shlex
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..config import Settings
+from .soco_service import SoCoService
+from .sonos_command_service import SonosCommandService, is_read_only_action
+
+logger = logging.getLogger(__name__)
+
+# Separates the stages of a sequence
+SEQUENCE_SEPARATOR = ":"
+
+# Separates commands that run concurrently within a stage
+PARALLEL_SEPARATOR = "&"
+
+# Parameter placeholders (%1 to %12)
+PARAMETER_PATTERN = re.compile(r"%(\d+)")
+
+# Commands that don't take a speaker name. The loop commands repeat the
+# sequence and have no native implementation, so macros using them run on
+# soco-cli
+SPEAKERLESS_ACTIONS = {
+    "wait", "wait_for", "wait_until",
+    "loop", "loop_for", "loop_until", "loop_to_start",
+}
+
+# soco-cli action names (and aliases) implemented natively, mapped to handlers
+NATIVE_ACTIONS: dict[str, str] = {
+    "play": "_do_play",
+    "start": "_do_play",
+    "pause": "_do_pause",
+    "stop": "_do_stop",
+    "pauseplay": "_do_toggle",
+    "playpause": "_do_toggle",
+    "next": "_do_next",
+    "previous": "_do_previous",
+    "prev": "_do_previous",
+    "volume": "_do_volume",
+    "vol": "_do_volume",
+    "v": "_do_volume",
+    "relative_volume": "_do_relative_volume",
+    "rel_vol": "_do_relative_volume",
+    "rv": "_do_relative_volume",
+    "group_volume": "_do_group_volume",
+    "group_vol": "_do_group_volume",
+    "gv": "_do_group_volume",
+    "mute": "_do_mute",
+    "track": "_do_track",
+    "play_favourite": "_do_play_favourite",
+    "play_favorite": "_do_play_favourite",
+    "favourite": "_do_play_favourite",
+    "favorite": "_do_play_favourite",
+    "play_fav": "_do_play_favourite",
+    "pf": "_do_play_favourite",
+    "play_uri": "_do_play_uri",
+    "uri": "_do_play_uri",
+    "pu": "_do_play_uri",
+    "shuffle": "_do_shuffle",
+    "sh": "_do_shuffle",
+    "repeat": "_do_repeat",
+    "rpt": "_do_repeat",
+    "cross_fade": "_do_cross_fade",
+    "crossfade": "_do_cross_fade",
+    "fade": "_do_cross_fade",
+    "sleep_timer": "_do_sleep_timer",
+    "sleep": "_do_sleep_timer",
+    "seek": "_do_seek",
+    "seek_to": "_do_seek",
+    "clear_queue": "_do_clear_queue",
+    "cq": "_do_clear_queue",
+    "play_from_queue": "_do_play_from_queue",
+    "pfq": "_do_play_from_queue",
+    "pq": "_do_play_from_queue",
+    "add_playlist_to_queue": "_do_add_playlist_to_queue",
+    "queue_playlist": "_do_add_playlist_to_queue",
+    "apq": "_do_add_playlist_to_queue",
+    "add_favourite_to_queue": "_do_add_favourite_to_queue",
+    "add_favorite_to_queue": "_do_add_favourite_to_queue",
+    "add_fav_to_queue": "_do_add_favourite_to_queue",
+    "afq": "_do_add_favourite_to_queue",
+    "group": "_do_group",
+    "g": "_do_group",
+    "join": "_do_group",
+    "ungroup": "_do_ungroup",
+    "ug": "_do_ungroup",
+    "u": "_do_ungroup",
+    "unjoin": "_do_ungroup",
+    "party_mode": "_do_party_mode",
+    "party": "_do_party_mode",
+    "ungroup_all": "_do_ungroup_all",
+    "transfer_playback": "_do_transfer",
+    "transfer_to": "_do_transfer",
+    "transfer": "_do_transfer",
+    "wait": "_do_wait",
+    "wait_for": "_do_wait",
+    "wait_until": "_do_wait_until",
+}
+
+
+class MacroError(Exception):
+    """Raised when a macro step cannot be parsed or fails."""
+
+
+class NotNativeError(Exception):
+    """Raised by a handler when a form of an action has no native implementation."""
+
+
+class MacroStep:
+    """A single command in a macro sequence."""
+    
+    def __init__(self, speaker: str | None, action: str, args: list[str], stage: int = 0):
+        """Initialize the step.
+        
+        Args:
+            speaker: Speaker name as written in the macro, or None for speakerless commands.
+            action: soco-cli action name.
+            args: Action arguments.
+            stage: Index of the ':' stage the step belongs to.
+        """
+        self.speaker = speaker
+        self.action = action
+        self.args = args
+        self.stage = stage
+    
+    @property
+    def is_native(self) -> bool:
+        """Check if the step's action has a native implementation."""
+        return self.action.lower() in NATIVE_ACTIONS
+    
+    def __str__(self) -> str:
+        parts = [self.speaker] if self.speaker else []
+        parts.append(self.action)
+        parts.extend(shlex.quote(arg) for arg in self.args)
+        return " ".join(parts)
+
+
+def tokenize_definition(definition: str) -> list[tuple[int, list[str]]]:
+    """Split a macro definition into the token lists of its commands.
+    
+    Args:
+        definition: Macro definition in soco-cli sequence syntax.
+    
+    Returns:
+        (stage index, tokens) per command, with parameter placeholders unresolved.
+    
+    Raises:
+        MacroError: If the definition can't be tokenized.
+    """
+    try:
+        tokens = shlex.split(definition)
+    except ValueError as e:
+        raise MacroError(f"Invalid macro definition: {e}") from e
+    
+    stage = 0
+    commands: list[tuple[int, list[str]]] = [(stage, [])]
+    for token in tokens:
+        if token == SEQUENCE_SEPARATOR:
+            if commands[-1][1]:
+                stage += 1
+            commands.append((stage, []))
+        elif token == PARALLEL_SEPARATOR:
+            commands.append((stage, []))
+        else:
+            commands[-1][1].append(token)
+    return [(stage, command) for stage, command in commands if command]
+
+
+def substitute_parameters(tokens: list[str], arguments: list[str]) -> list[str]:
+    """Replace %1..%12 placeholders with macro arguments.
+    
+    A token that is only a placeholder with no matching argument is dropped,
+    as soco-cli does, so optional trailing arguments can be left out.
+    
+    Args:
+        tokens: Tokens of one command.
+        arguments: Macro arguments (%1 is arguments[0]).
+    
+    Returns:
+        The tokens with placeholders substituted.
+    """
+    def _argument(match: re.Match) -> str:
+        index = int(match.group(1)) - 1
+        return arguments[index] if 0 <= index < len(arguments) else ""
+    
+    result: list[str] = []
+    for token in tokens:
+        whole = PARAMETER_PATTERN.fullmatch(token)
+        if whole:
+            index = int(whole.group(1)) - 1
+            if 0 <= index < len(arguments) and arguments[index] != "_":
+                result.append(arguments[index])
+            continue
+        result.append(PARAMETER_PATTERN.sub(_argument, token))
+    return result
+
+
+def parse_command(tokens: list[str]) -> MacroStep:
+    """Parse the tokens of one command into a step.
+    
+    Raises:
+        MacroError: If the command has no action.
+    """
+    if tokens[0].lower() in SPEAKERLESS_ACTIONS:
+        return MacroStep(None, tokens[0].lower(), tokens[1:])
+    if len(tokens) < 2:
+        raise MacroError(f"Command '{' '.join(tokens)}' has no action")
+    return MacroStep(tokens[0], tokens[1], tokens[2:])
+
+
+def parse_definition(definition: str, arguments: list[str] | None = None) -> list[MacroStep]:
+    """Parse a macro definition into steps, substituting its arguments.
+    
+    Args:
+        definition: Macro definition in soco-cli sequence syntax.
+        arguments: Macro arguments.
+    
+    Returns:
+        The steps of the macro, in order.
+    
+    Raises:
+        MacroError: If the definition is invalid.
+    """
+    return bind_commands(tokenize_definition(definition), arguments or [])
+
+
+def bind_commands(commands: list[tuple[int, list[str]]], arguments: list[str]) -> list[MacroStep]:
+    """Build the steps of a tokenized macro definition for a set of arguments.
+    
+    Args:
+        commands: Output of tokenize_definition (can be cached per macro).
+        arguments: Macro arguments.
+    
+    Returns:
+        The steps of the macro, in order.
+    
+    Raises:
+        MacroError: If a command is invalid.
+    """
+    steps: list[MacroStep] = []
+    for stage, tokens in commands:
+        tokens = substitute_parameters(tokens, arguments)
+        if tokens:
+            step = parse_command(tokens)
+            step.stage = stage
+            steps.append(step)
+    return steps
+
+
+def group_stages(steps: list[MacroStep]) -> list[list[MacroStep]]:
+    """Group parsed steps by stage, preserving order."""
+    stages: list[list[MacroStep]] = []
+    for step in steps:
+        if stages and stages[-1][0].stage == step.stage:
+            stages[-1].append(step)
+        else:
+            stages.append([step])
+    return stages
+
+
+def has_parallel_steps(steps: list[MacroStep]) -> bool:
+    """Check if any stage of a macro has more than one step."""
+    return any(len(stage) > 1 for stage in group_stages(steps))
+
+
+def parse_duration(value: str) -> float:
+    """Parse a soco-cli duration (e.g. "30", "30s", "5m", "1h", "1:30", "0:01:30").
+    
+    Returns:
+        Duration in seconds.
+    
+    Raises:
+        MacroError: If the duration is invalid.
+    """
+    text = value.strip().lower()
+    try:
+        if ":" in text:
+            seconds = 0.0
+            for part in text.split(":"):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        multipliers = {"s": 1, "m": 60, "h": 3600}
+        if text and text[-1] in multipliers:
+            return float(text[:-1]) * multipliers[text[-1]]
+        return float(text)
+    except ValueError:
+        raise MacroError(f"Invalid duration '{value}'") from None
+
+
+def _parse_on_off(value: str) -> bool:
+    """Parse an on/off argument."""
+    lowered = value.lower()
+    if lowered in ("on", "true", "yes"):
+        return True
+    if lowered in ("off", "false", "no"):
+        return False
+    raise MacroError(f"Expected 'on' or 'off', got '{value}'")
+
+
+def _parse_int(value: str, what: str) -> int:
+    """Parse an integer argument."""
+    try:
+        return int(value)
+    except ValueError:
+        raise MacroError(f"Invalid {what} '{value}'") from None
+
+
+class MacroEngine:
+    """Runs macros natively on SoCoService.
+    
+    Stages run in order and the sequence stops after the first stage with a
+    failing step, matching soco-cli. Steps joined with '&' run concurrently,
+    up to the configured limit. Speaker actions without a native
+    implementation are sent to soco-cli as single commands.
+    """
+    
+    def __init__(
+        self,
+        settings: Settings,
+        soco_service: SoCoService,
+        command_service: SonosCommandService,
+    ):
+        """Initialize the engine.
+        
+        Args:
+            settings: Application settings.
+            soco_service: Service used for native steps.
+            command_service: soco-cli bridge used for non-native steps.
+        """
+        self._settings = settings
+        self._soco_service = soco_service
+        self._command_service = command_service
+        self._parallel_limit = asyncio.Semaphore(max(1, settings.macro_parallel_limit))
+    
+    @staticmethod
+    def supports(steps: list[MacroStep]) -> bool:
+        """Check if the engine can run a macro.
+        
+        Speaker actions can always fall back to soco-cli, but speakerless
+        commands can only run natively.
+        """
+        return all(step.speaker is not None or step.is_native for step in steps)
+    
+    async def run(self, name: str, steps: list[MacroStep]) -> dict[str, Any]:
+        """Run a macro.
+        
+        Args:
+            name: Macro name (for logging and the result).
+            steps: Parsed steps of the macro, with arguments substituted.
+        
+        Returns:
+            Dict with exit code, combined output, error message and per-step results.
+        """
+        started = time.monotonic()
+        stages = group_stages(steps)
+        results: list[dict[str, Any]] = []
+        error_msg = ""
+        index = 0
+        
+        logger.info("Executing macro natively: %s (%d stages)", name, len(stages))
+        
+        for stage in stages:
+            parallel = len(stage) > 1
+            stage_results = await asyncio.gather(*(
+                self._run_step(index + offset, step, parallel, started)
+                for offset, step in enumerate(stage)
+            ))
+            index += len(stage)
+            results.extend(stage_results)
+            
+            failed = [(step, r) for step, r in zip(stage, stage_results) if r["exit_code"] != 0]
+            if failed:
+                step, result = failed[0]
+                error_msg = f"Step {result['index'] + 1} ({step}) failed: {result['error_msg']}"
+                logger.warning("Macro %s stopped: %s", name, error_msg)
+                break
+        
+        return {
+            "macro": name,
+            "command": " : ".join(
+                f" {PARALLEL_SEPARATOR} ".join(str(step) for step in stage) for stage in stages
+            ),
+            "engine": "native",
+            "exit_code": 1 if error_msg else 0,
+            "result": "\n".join(r["result"] for r in results if r["result"]),
+            "error_msg": error_msg,
+            "steps": results,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+    
+    async def _run_step(
+        self, index: int, step: MacroStep, parallel: bool, origin: float
+    ) -> dict[str, Any]:
+        """Run one step, waiting for a parallel slot if it shares its stage.
+        
+        Args:
+            index: Position of the step in the macro.
+            step: The step to run.
+            parallel: Whether the step shares its stage with other steps.
+            origin: Monotonic time the macro started, for the step's start offset.
+        
+        Returns:
+            Dict describing the step and its outcome.
+        """
+        if not parallel:
+            return await self._run_timed_step(index, step, parallel, origin)
+        async with self._parallel_limit:
+            return await self._run_timed_step(index, step, parallel, origin)
+    
+    async def _run_timed_step(
+        self, index: int, step: MacroStep, parallel: bool, origin: float
+    ) -> dict[str, Any]:
+        """Run one step with the step timeout, natively when possible.
+        
+        Returns:
+            Dict describing the step and its outcome.
+        """
+        started = time.monotonic()
+        engine = "native" if step.is_native else "soco-cli"
+        exit_code = 0
+        outcome = "ok"
+        output = ""
+        error_msg = ""
+        # Waits are the only steps that never talk to a speaker or soco-cli
+        network = step.speaker is not None
+        
+        # Waits are meant to take long, so they aren't subject to the step timeout
+        timeout = None if step.speaker is None else self._settings.macro_step_timeout_seconds
+        
+        try:
+            engine, output, network = await asyncio.wait_for(self._execute_step(step), timeout)
+        except asyncio.TimeoutError:
+            exit_code = 1
+            outcome = "timeout"
+            error_msg = f"Timed out after {timeout:g}s"
+        except MacroError as e:
+            exit_code = 1
+            outcome = "failed"
+            error_msg = str(e)
+        except Exception as e:
+            logger.error("Macro step '%s' failed: %s", step, e)
+            exit_code = 1
+            outcome = "failed"
+            error_msg = str(e)
+        
+        ended = time.monotonic()
+        
+        return {
+            "index": index,
+            "stage": step.stage,
+            "parallel": parallel,
+            "speaker": step.speaker,
+            "action": step.action,
+            "args": step.args,
+            "engine": engine,
+            "network": network,
+            "outcome": outcome,
+            "exit_code": exit_code,
+            "result": output,
+            "error_msg": error_msg,
+            "start_ms": round((started - origin) * 1000, 1),
+            "end_ms": round((ended - origin) * 1000, 1),
+            "duration_ms": round((ended - started) * 1000, 1),
+        }
+    
+    async def _execute_step(self, step: MacroStep) -> tuple[str, str, bool]:
+        """Execute one step, natively when possible.
+        
+        Returns:
+            Tuple of the engine that ran the step, its output and whether it
+            made a network round trip (False for waits and cached reads).
+        
+        Raises:
+            MacroError: If the step failed.
+        """
+        speaker = None
+        if step.speaker is not None:
+            speaker = self._soco_service.resolve_speaker_name(step.speaker)
+        
+        handler = NATIVE_ACTIONS.get(step.action.lower())
+        # Speakers that only soco-cli knows (e.g. by IP address) go to soco-cli
+        if handler is not None and (step.speaker is None or speaker is not None):
+            try:
+                output = await getattr(self, handler)(speaker, step.args)
+            except NotNativeError:
+                pass
+            else:
+                # Native writes bypass soco-cli, so drop its cached reads here
+                if not is_read_only_action(step.action, tuple(step.args)):
+                    self._command_service.invalidate_reads(speaker)
+                return "native", output, step.speaker is not None
+        
+        response = await self._command_service.execute_command(
+            step.speaker, step.action, *step.args
+        )
+        if response.exit_code != 0:
+            raise MacroError(response.error_msg or f"soco-cli exit code {response.exit_code}")
+        return "soco-cli", response.result or "", not response.cached
+    
+    @staticmethod
+    def _check(success: bool, action: str, speaker: str | None) -> str:
+        """Turn a SoCoService success flag into a step result."""
+        if not success:
+            raise MacroError(f"'{action}' failed on {speaker}")
+        return ""
+    
+    # ========================================
+    # Native Action Handlers
+    # ========================================
+    
+    async def _do_play(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.play(speaker), "play", speaker)
+    
+    async def _do_pause(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.pause(speaker), "pause", speaker)
+    
+    async def _do_stop(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.stop(speaker), "stop", speaker)
+    
+    async def _do_toggle(self, speaker: str, args: list[str]) -> str:
+        result = await self._soco_service.toggle_playback(speaker)
+        self._check(result["success"], "pauseplay", speaker)
+        return ""
+    
+    async def _do_next(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.next_track(speaker), "next", speaker)
+    
+    async def _do_previous(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.previous_track(speaker), "previous", speaker)
+    
+    async def _do_volume(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            volume = await self._soco_service.get_volume(speaker)
+            if volume is None:
+                raise MacroError(f"Could not read volume of {speaker}")
+            return str(volume)
+        if args[0][:1] in ("+", "-"):
+            return await self._do_relative_volume(speaker, args)
+        volume = _parse_int(args[0], "volume")
+        return self._check(await self._soco_service.set_volume(speaker, volume), "volume", speaker)
+    
+    async def _do_relative_volume(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("relative_volume needs an adjustment")
+        current = await self._soco_service.get_volume(speaker)
+        if current is None:
+            raise MacroError(f"Could not read volume of {speaker}")
+        volume = current + _parse_int(args[0], "volume adjustment")
+        return self._check(await self._soco_service.set_volume(speaker, volume), "relative_volume", speaker)
+    
+    async def _do_group_volume(self, speaker: str, args: list[str]) -> str:
+        if not args or args[0][:1] in ("+", "-"):
+            # Reading and relative changes stay with soco-cli
+            raise NotNativeError()
+        volume = max(0, min(100, _parse_int(args[0], "volume")))
+        return self._check(await self._soco_service.set_group_volume(speaker, volume), "group_volume", speaker)
+    
+    async def _do_mute(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            muted = await self._soco_service.get_mute(speaker)
+            if muted is None:
+                raise MacroError(f"Could not read mute state of {speaker}")
+            return "on" if muted else "off"
+        mute = _parse_on_off(args[0])
+        return self._check(await self._soco_service.set_mute(speaker, mute), "mute", speaker)
+    
+    async def _do_track(self, speaker: str, args: list[str]) -> str:
+        return await self._soco_service.get_current_track(speaker) or ""
+    
+    async def _do_play_favourite(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("play_favourite needs a favourite name")
+        favourite = " ".join(args)
+        return self._check(await self._soco_service.play_favorite(speaker, favourite), "play_favourite", speaker)
+    
+    async def _do_play_uri(self, speaker: str, args: list[str]) -> str:
+        if len(args) != 1:
+            # The optional title argument is only supported by soco-cli
+            raise NotNativeError()
+        return self._check(await self._soco_service.play_uri(speaker, args[0]), "play_uri", speaker)
+    
+    async def _do_shuffle(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise NotNativeError()
+        enabled = _parse_on_off(args[0])
+        return self._check(await self._soco_service.set_shuffle(speaker, enabled), "shuffle", speaker)
+    
+    async def _do_repeat(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise NotNativeError()
+        mode = args[0].lower()
+        if mode not in ("off", "one", "all"):
+            raise MacroError(f"Invalid repeat mode '{args[0]}'")
+        return self._check(await self._soco_service.set_repeat(speaker, mode), "repeat", speaker)
+    
+    async def _do_cross_fade(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise NotNativeError()
+        enabled = _parse_on_off(args[0])
+        return self._check(await self._soco_service.set_crossfade(speaker, enabled), "cross_fade", speaker)
+    
+    async def _do_sleep_timer(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise NotNativeError()
+        if args[0].lower() in ("off", "cancel"):
+            seconds = None
+        else:
+            seconds = int(parse_duration(args[0]))
+        return self._check(await self._soco_service.set_sleep_timer(speaker, seconds), "sleep_timer", speaker)
+    
+    async def _do_seek(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("seek needs a position")
+        return self._check(await self._soco_service.seek(speaker, args[0]), "seek", speaker)
+    
+    async def _do_clear_queue(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.clear_queue(speaker), "clear_queue", speaker)
+    
+    async def _do_play_from_queue(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise NotNativeError()
+        # soco-cli queue positions are 1-based
+        position = _parse_int(args[0], "queue position") - 1
+        return self._check(await self._soco_service.play_from_queue(speaker, position), "play_from_queue", speaker)
+    
+    async def _do_add_playlist_to_queue(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("add_playlist_to_queue needs a playlist name")
+        position = await self._soco_service.add_playlist_to_queue(speaker, " ".join(args))
+        if position is None:
+            raise MacroError(f"'add_playlist_to_queue' failed on {speaker}")
+        return str(position)
+    
+    async def _do_add_favourite_to_queue(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("add_favourite_to_queue needs a favourite name")
+        position = await self._soco_service.add_favorite_to_queue(speaker, " ".join(args))
+        if position is None:
+            raise MacroError(f"'add_favourite_to_queue' failed on {speaker}")
+        return str(position)
+    
+    async def _do_group(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("group needs a speaker to join")
+        coordinator = self._soco_service.resolve_speaker_name(args[0])
+        if coordinator is None:
+            raise NotNativeError()
+        return self._check(await self._soco_service.group_speakers(coordinator, speaker), "group", speaker)
+    
+    async def _do_ungroup(self, speaker: str, args: list[str]) -> str:
+        return self._check(await self._soco_service.ungroup_speaker(speaker), "ungroup", speaker)
+    
+    async def _do_party_mode(self, speaker: str, args: list[str]) -> str:
+        result = await self._soco_service.party_mode(speaker)
+        return self._check(result.get("success", False), "party_mode", speaker)
+    
+    async def _do_ungroup_all(self, speaker: str, args: list[str]) -> str:
+        result = await self._soco_service.ungroup_all(speaker)
+        return self._check(result.get("success", False), "ungroup_all", speaker)
+    
+    async def _do_transfer(self, speaker: str, args: list[str]) -> str:
+        if not args:
+            raise MacroError("transfer_playback needs a target speaker")
+        target = self._soco_service.resolve_speaker_name(args[0])
+        if target is None:
+            raise NotNativeError()
+        result = await self._soco_service.transfer(speaker, [target])
+        if not result.get("success"):
+            raise MacroError(result.get("error") or f"'transfer_playback' failed on {speaker}")
+        return ""
+    
+    async def _do_wait(self, speaker: str | None, args: list[str]) -> str:
+        if not args:
+            raise MacroError("wait needs a duration")
+        await asyncio.sleep(parse_duration(args[0]))
+        return ""
+    
+    async def _do_wait_until(self, speaker: str | None, args: list[str]) -> str:
+        if not args:
+            raise MacroError("wait_until needs a time (HH:MM or HH:MM:SS)")
+        try:
+            parts = [int(p) for p in args[0].split(":")]
+            now = datetime.now()
+            target = now.replace(
+                hour=parts[0],
+                minute=parts[1] if len(parts) > 1 else 0,
+                second=parts[2] if len(parts) > 2 else 0,
+                microsecond=0,
+            )
+        except (ValueError, IndexError):
+            raise MacroError(f"Invalid time '{args[0]}'") from None
+        if target <= now:
+            target += timedelta(days=1)
+        await asyncio.sleep((target - now).total_seconds())
+        return ""
@@ -0,0 +1,122 @@
+"""Macro execution history and timing statistics."""
+
+import itertools
+import math
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Get a percentile of sorted values (nearest-rank method)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class MacroRunHistory:
+    """Ring buffer of recent macro executions with their step timelines.
+    
+    Only the most recent runs are kept, so memory use is bounded no matter
+    how often macros run.
+    """
+    
+    def __init__(self, max_runs: int):
+        """Initialize the history.
+        
+        Args:
+            max_runs: Number of runs to keep.
+        """
+        self._runs: deque[dict[str, Any]] = deque(maxlen=max(1, max_runs))
+        self._ids = itertools.count(1)
+    
+    def record(
+        self,
+        macro: str,
+        arguments: list[str],
+        started_at: datetime,
+        elapsed_ms: float,
+        engine: str,
+        exit_code: int,
+        error_msg: str,
+        steps: list[dict[str, Any]],
+    ) -> int:
+        """Record a finished run.
+        
+        Args:
+            macro: Macro name.
+            arguments: Macro arguments.
+            started_at: Wall-clock start time.
+            elapsed_ms: Total run time.
+            engine: "native" or "soco-cli".
+            exit_code: 0 on success.
+            error_msg: Error message if the run failed.
+            steps: Step timeline (start/end offsets, speaker, action, outcome, network).
+        
+        Returns:
+            The run's id.
+        """
+        run_id = next(self._ids)
+        self._runs.append({
+            "id": run_id,
+            "macro": macro,
+            "arguments": arguments,
+            "started_at": started_at.astimezone(timezone.utc).isoformat(),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "engine": engine,
+            "exit_code": exit_code,
+            "error_msg": error_msg,
+            "steps": [
+                {
+                    "index": step.get("index", i),
+                    "stage": step.get("stage", i),
+                    "parallel": step.get("parallel", False),
+                    "speaker": step.get("speaker"),
+                    "action": step.get("action"),
+                    "engine": step.get("engine", engine),
+                    "network": step.get("network", True),
+                    "outcome": step.get("outcome", "ok" if step.get("exit_code", 0) == 0 else "failed"),
+                    "start_ms": step.get("start_ms", 0.0),
+                    "end_ms": step.get("end_ms", step.get("duration_ms", 0.0)),
+                    "duration_ms": step.get("duration_ms", 0.0),
+                }
+                for i, step in enumerate(steps)
+            ],
+        })
+        return run_id
+    
+    def get_runs(self, macro: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Get recent runs, newest first.
+        
+        Args:
+            macro: Only include runs of this macro (case-insensitive).
+            limit: Maximum number of runs to return.
+        """
+        runs: list[dict[str, Any]] = []
+        for run in reversed(self._runs):
+            if macro is None or run["macro"].lower() == macro.lower():
+                runs.append(run)
+                if len(runs) >= limit:
+                    break
+        return runs
+    
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Get run-time percentiles per macro over the buffered runs."""
+        by_macro: dict[str, list[dict[str, Any]]] = {}
+        for run in self._runs:
+            by_macro.setdefault(run["macro"], []).append(run)
+        
+        stats: dict[str, dict[str, Any]] = {}
+        for macro, runs in by_macro.items():
+            durations = sorted(run["elapsed_ms"] for run in runs)
+            stats[macro] = {
+                "runs": len(runs),
+                "failures": sum(1 for run in runs if run["exit_code"] != 0),
+                "p50_ms": percentile(durations, 50),
+                "p90_ms": percentile(durations, 90),
+                "p99_ms": percentile(durations, 99),
+                "max_ms": durations[-1],
+                "last_run_at": runs[-1]["started_at"],
+            }
+        return stats
@@ -0,0 +1,525 @@
+"""Built-in macro scheduler.
+
+Macros can carry schedules: cron rules ("30 7 * * mon-fri") or offsets
+from sunrise/sunset at the configured location. The scheduler runs inside
+the app, so a scheduled macro starts without spawning any process; the
+speakers it uses are warmed up a few seconds before each fire time, and
+the scheduled and actual start times of every fire are kept so drift is
+visible.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from ..config import Settings
+from ..models import Macro, MacroSchedule
+from .macro_service import MacroService
+from .soco_service import SoCoService
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_KINDS = ("cron", "sunrise", "sunset")
+
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {
+    name: i + 1
+    for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# Macro name, kind, cron expression, offset and arguments of a schedule
+ScheduleKey = tuple[str, str, str | None, int, tuple[str, ...]]
+
+# Sun's apparent radius plus atmospheric refraction at the horizon (NOAA)
+SUN_ZENITH_DEGREES = 90.833
+
+
+class CronExpression:
+    """A standard 5-field cron expression (minute hour day-of-month month day-of-week).
+    
+    Supports '*', lists, ranges, steps, month and weekday names and the
+    usual @daily-style aliases. As in Vixie cron, when both day fields are
+    restricted a day matches if either of them does.
+    """
+    
+    def __init__(self, expression: str):
+        """Parse a cron expression.
+        
+        Args:
+            expression: The cron expression.
+        
+        Raises:
+            ValueError: If the expression is invalid.
+        """
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+        
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12, MONTH_NAMES)
+        # 7 is also Sunday
+        self.weekdays = {d % 7 for d in self._parse_field(fields[4], 0, 7, DAY_NAMES)}
+        # As in Vixie cron, a field starting with '*' (e.g. "*/2") counts as unrestricted
+        self._days_restricted = not fields[2].startswith("*")
+        self._weekdays_restricted = not fields[4].startswith("*")
+    
+    @staticmethod
+    def _parse_field(
+        field: str, low: int, high: int, names: dict[str, int] | None = None
+    ) -> list[int]:
+        """Parse one cron field into the sorted values it matches."""
+        def parse_value(value: str) -> int:
+            if names and value.lower() in names:
+                return names[value.lower()]
+            if not value.isdigit():
+                raise ValueError(f"Invalid cron value '{value}'")
+            number = int(value)
+            if not low <= number <= high:
+                raise ValueError(f"Cron value {number} is outside {low}-{high}")
+            return number
+        
+        values: set[int] = set()
+        for part in field.split(","):
+            range_part, _, step_part = part.partition("/")
+            step = 1
+            if step_part:
+                if not step_part.isdigit() or int(step_part) == 0:
+                    raise ValueError(f"Invalid cron step '{step_part}'")
+                step = int(step_part)
+            
+            if range_part == "*":
+                start, end = low, high
+            elif "-" in range_part:
+                first, last = range_part.split("-", 1)
+                start, end = parse_value(first), parse_value(last)
+                if start > end:
+                    raise ValueError(f"Invalid cron range '{range_part}'")
+            else:
+                start = parse_value(range_part)
+                # "5/15" means every 15 starting at 5
+                end = high if step_part else start
+            
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+    
+    def _matches_day(self, day: date) -> bool:
+        """Check whether the expression matches a calendar day."""
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+    
+    def next_after(self, after: datetime) -> datetime:
+        """Get the first matching minute strictly after a local wall-clock time.
+        
+        Args:
+            after: Naive local time.
+        
+        Returns:
+            Naive local time of the next match.
+        
+        Raises:
+            ValueError: If the expression never matches (e.g. "0 0 31 2 *").
+        """
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = candidate.date()
+        # Leap days can be up to 8 years apart
+        for _ in range(366 * 8):
+            if self._matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        fire_at = datetime(day.year, day.month, day.day, hour, minute)
+                        if fire_at >= candidate:
+                            return fire_at
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+
+def solar_event_time(day: date, latitude: float, longitude: float, event: str) -> datetime | None:
+    """Calculate sunrise or sunset with the NOAA solar position equations.
+    
+    Args:
+        day: UTC calendar day.
+        latitude: Latitude in decimal degrees (north positive).
+        longitude: Longitude in decimal degrees (east positive).
+        event: "sunrise" or "sunset".
+    
+    Returns:
+        The event time in UTC, or None if the sun doesn't rise or set that day.
+    """
+    sign = -1 if event == "sunrise" else 1
+    # Julian day of noon UTC, refined to the event time on the second pass
+    minutes = 720.0
+    for _ in range(2):
+        julian_day = day.toordinal() + 1721424.5 + minutes / 1440
+        t = (julian_day - 2451545.0) / 36525
+        
+        mean_long = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+        mean_anomaly = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+        eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+        center = (
+            math.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+            + math.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * t)
+            + math.sin(3 * mean_anomaly) * 0.000289
+        )
+        omega = math.radians(125.04 - 1934.136 * t)
+        apparent_long = math.radians(mean_long + center - 0.00569 - 0.00478 * math.sin(omega))
+        mean_obliquity = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+        obliquity = math.radians(mean_obliquity + 0.00256 * math.cos(omega))
+        declination = math.asin(math.sin(obliquity) * math.sin(apparent_long))
+        
+        y = math.tan(obliquity / 2) ** 2
+        l0 = math.radians(mean_long)
+        equation_of_time = 4 * math.degrees(
+            y * math.sin(2 * l0)
+            - 2 * eccentricity * math.sin(mean_anomaly)
+            + 4 * eccentricity * y * math.sin(mean_anomaly) * math.cos(2 * l0)
+            - 0.5 * y * y * math.sin(4 * l0)
+            - 1.25 * eccentricity * eccentricity * math.sin(2 * mean_anomaly)
+        )
+        
+        lat = math.radians(latitude)
+        cos_hour_angle = (
+            math.cos(math.radians(SUN_ZENITH_DEGREES)) / (math.cos(lat) * math.cos(declination))
+            - math.tan(lat) * math.tan(declination)
+        )
+        if not -1 <= cos_hour_angle <= 1:
+            return None  # Polar day or night
+        hour_angle = math.degrees(math.acos(cos_hour_angle))
+        
+        solar_noon = 720 - 4 * longitude - equation_of_time
+        minutes = solar_noon + sign * 4 * hour_angle
+    
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+
+
+def next_fire_time(
+    schedule: MacroSchedule,
+    after: datetime,
+    latitude: float | None = None,
+    longitude: float | None = None,
+) -> datetime | None:
+    """Get the next time a schedule fires.
+    
+    Args:
+        schedule: The schedule.
+        after: Aware time; the result is strictly later.
+        latitude: Location for sunrise/sunset schedules.
+        longitude: Location for sunrise/sunset schedules.
+    
+    Returns:
+        Aware local fire time, or None if the schedule can't fire.
+    """
+    if schedule.kind == "cron":
+        local_after = after.astimezone().replace(tzinfo=None)
+        # Naive local times are interpreted in the system timezone
+        return CronExpression(schedule.cron or "").next_after(local_after).astimezone()
+    
+    if latitude is None or longitude is None:
+        return None
+    offset = timedelta(minutes=schedule.offset_minutes)
+    first_day = after.astimezone(timezone.utc).date() - timedelta(days=1)
+    for days in range(368):
+        event_at = solar_event_time(first_day + timedelta(days=days), latitude, longitude, schedule.kind)
+        if event_at is not None and event_at + offset > after:
+            return (event_at + offset).astimezone()
+    return None
+
+
+def describe_schedule(schedule: MacroSchedule) -> str:
+    """Get a short human-readable description of a schedule."""
+    if schedule.kind == "cron":
+        return f"cron {schedule.cron}"
+    if schedule.offset_minutes:
+        return f"{schedule.kind} {schedule.offset_minutes:+d} min"
+    return schedule.kind
+
+
+class ScheduledFire:
+    """One upcoming fire of a macro schedule."""
+    
+    def __init__(self, fire_at: datetime, macro: Macro, schedule: MacroSchedule):
+        self.fire_at = fire_at
+        self.macro = macro
+        self.schedule = schedule
+    
+    @staticmethod
+    def schedule_key(macro: Macro, schedule: MacroSchedule) -> ScheduleKey:
+        """Identify a schedule by its macro and content.
+        
+        Keying on content rather than list position means reordering,
+        inserting or removing other schedules doesn't re-fire this one.
+        """
+        return (
+            macro.name.lower(),
+            schedule.kind,
+            schedule.cron,
+            schedule.offset_minutes,
+            tuple(schedule.arguments),
+        )
+    
+    @property
+    def key(self) -> ScheduleKey:
+        """Identify the schedule this fire belongs to."""
+        return self.schedule_key(self.macro, self.schedule)
+
+
+class MacroScheduler:
+    """Runs macros on their schedules.
+    
+    One loop sleeps until the next fire's pre-warm time, then hands the
+    fire to its own task, which warms up the macro's speakers, sleeps out
+    the last few seconds and runs the macro. The loop is woken whenever
+    macros change, so edited schedules apply immediately.
+    """
+    
+    def __init__(self, settings: Settings, macro_service: MacroService, soco_service: SoCoService):
+        """Initialize the scheduler.
+        
+        Args:
+            settings: Application settings.
+            macro_service: The macro service (runs macros and provides schedules).
+            soco_service: The SoCo service (pre-warms speakers).
+        """
+        self._settings = settings
+        self._macro_service = macro_service
+        self._soco_service = soco_service
+        self._task: asyncio.Task | None = None
+        self._fire_tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        # Last fire time handed out per schedule, so a fire is never started twice
+        self._dispatched: dict[ScheduleKey, datetime] = {}
+        self._fires: deque[dict[str, Any]] = deque(maxlen=max(1, settings.macro_run_history_size))
+        
+        macro_service.add_change_listener(self._wakeup.set)
+    
+    async def start(self) -> None:
+        """Start the scheduler loop.
+        
+        Call this from the application lifespan startup.
+        """
+        if not self._settings.macro_scheduler_enabled:
+            logger.info("Macro scheduler disabled")
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._scheduler_loop())
+        logger.info("Macro scheduler started")
+    
+    async def stop(self) -> None:
+        """Stop the scheduler loop and any pending fires."""
+        # wait_for() can swallow a cancel that races with the wakeup event,
+        # so the loop also checks this flag
+        self._stopping = True
+        self._wakeup.set()
+        tasks = [t for t in [self._task, *self._fire_tasks] if t]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._fire_tasks.clear()
+        if tasks:
+            logger.info("Macro scheduler stopped")
+    
+    def validate_schedules(self, schedules: list[MacroSchedule]) -> None:
+        """Check that schedules are well-formed before they are saved.
+        
+        Raises:
+            ValueError: Describing the first invalid schedule.
+        """
+        for schedule in schedules:
+            if schedule.kind not in SCHEDULE_KINDS:
+                raise ValueError(
+                    f"Unknown schedule kind '{schedule.kind}' (expected {', '.join(SCHEDULE_KINDS)})"
+                )
+            if schedule.kind == "cron":
+                if not schedule.cron:
+                    raise ValueError("Cron schedules need a cron expression")
+                CronExpression(schedule.cron).next_after(datetime.now())
+            elif self._settings.latitude is None or self._settings.longitude is None:
+                raise ValueError(
+                    "Sunrise/sunset schedules need SNDCTL_LATITUDE and SNDCTL_LONGITUDE to be set"
+                )
+    
+    def _get_upcoming(self, now: datetime) -> list[ScheduledFire]:
+        """Get the next fire of every enabled schedule, soonest first."""
+        upcoming: list[ScheduledFire] = []
+        keys: set[ScheduleKey] = set()
+        for macro in self._macro_service.get_scheduled_macros():
+            for schedule in macro.schedules:
+                if not schedule.enabled:
+                    continue
+                key = ScheduledFire.schedule_key(macro, schedule)
+                keys.add(key)
+                after = max(now, self._dispatched.get(key, now))
+                try:
+                    fire_at = next_fire_time(
+                        schedule, after, self._settings.latitude, self._settings.longitude
+                    )
+                except ValueError as e:
+                    logger.warning("Ignoring schedule of macro %s: %s", macro.name, e)
+                    continue
+                if fire_at is not None:
+                    upcoming.append(ScheduledFire(fire_at, macro, schedule))
+        # Forget schedules that were edited, disabled or deleted
+        for key in self._dispatched.keys() - keys:
+            del self._dispatched[key]
+        upcoming.sort(key=lambda f: f.fire_at)
+        return upcoming
+    
+    async def _scheduler_loop(self) -> None:
+        """Background loop that dispatches fires at their pre-warm time."""
+        prewarm = timedelta(seconds=self._settings.macro_schedule_prewarm_seconds)
+        while not self._stopping:
+            try:
+                self._wakeup.clear()
+                now = datetime.now().astimezone()
+                upcoming = self._get_upcoming(now)
+                
+                due = [f for f in upcoming if f.fire_at - prewarm <= now]
+                for fire in due:
+                    self._dispatched[fire.key] = fire.fire_at
+                    task = asyncio.create_task(self._run_fire(fire))
+                    self._fire_tasks.add(task)
+                    task.add_done_callback(self._fire_tasks.discard)
+                if due:
+                    continue
+                
+                # Re-check at least hourly so wall-clock changes are picked up
+                wait_seconds = 3600.0
+                if upcoming:
+                    wait_seconds = min(wait_seconds, (upcoming[0].fire_at - prewarm - now).total_seconds())
+                    logger.debug(
+                        "Macro scheduler: next fire %s at %s",
+                        upcoming[0].macro.name,
+                        upcoming[0].fire_at.isoformat(timespec="seconds"),
+                    )
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, wait_seconds))
+                except asyncio.TimeoutError:
+                    pass
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in macro scheduler: %s", e)
+                await asyncio.sleep(60)
+    
+    async def _run_fire(self, fire: ScheduledFire) -> None:
+        """Pre-warm the macro's speakers, wait for the fire time and run the macro."""
+        name = fire.macro.name
+        arguments = fire.schedule.arguments
+        record: dict[str, Any] = {
+            "macro": name,
+            "schedule": describe_schedule(fire.schedule),
+            "scheduled_at": fire.fire_at.isoformat(),
+            "prewarm_ms": 0.0,
+            "prewarmed_speakers": [],
+            "started_at": None,
+            "drift_ms": None,
+            "skipped": False,
+            "exit_code": None,
+            "error_msg": "",
+            "run_id": None,
+        }
+        
+        try:
+            prewarm_started = time.monotonic()
+            try:
+                speakers = self._macro_service.get_macro_speakers(name, arguments)
+                record["prewarmed_speakers"] = await self._soco_service.prewarm_speakers(speakers)
+            except Exception as e:
+                logger.debug("Pre-warm for scheduled macro %s failed: %s", name, e)
+            record["prewarm_ms"] = round((time.monotonic() - prewarm_started) * 1000, 1)
+            
+            delay = (fire.fire_at - datetime.now().astimezone()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            started_at = datetime.now().astimezone()
+            drift_ms = (started_at - fire.fire_at).total_seconds() * 1000
+            record["started_at"] = started_at.isoformat()
+            record["drift_ms"] = round(drift_ms, 1)
+            
+            if drift_ms > self._settings.macro_schedule_grace_seconds * 1000:
+                record["skipped"] = True
+                logger.warning(
+                    "Skipped scheduled macro %s: missed %s by %.0f s",
+                    name, fire.fire_at.isoformat(timespec="seconds"), drift_ms / 1000,
+                )
+                return
+            
+            logger.info(
+                "Running scheduled macro %s (%s, drift %.1f ms)",
+                name, record["schedule"], drift_ms,
+            )
+            try:
+                result = await self._macro_service.execute_macro(name, arguments)
+                if isinstance(result, dict):
+                    record["exit_code"] = result.get("exit_code", 0)
+                    record["error_msg"] = result.get("error_msg", "")
+                    record["run_id"] = result.get("run_id")
+                else:
+                    record["exit_code"] = 0
+            except Exception as e:
+                logger.error("Scheduled macro %s failed: %s", name, e)
+                record["exit_code"] = 1
+                record["error_msg"] = str(e)
+        finally:
+            self._fires.append(record)
+    
+    def get_status(self) -> dict[str, Any]:
+        """Get upcoming fires and the scheduled vs actual start of recent fires.
+        
+        Returns:
+            Dict with scheduler status, upcoming fires and recent fires (newest first).
+        """
+        now = datetime.now().astimezone()
+        drifts = sorted(
+            abs(f["drift_ms"]) for f in self._fires if f["drift_ms"] is not None and not f["skipped"]
+        )
+        return {
+            "enabled": self._settings.macro_scheduler_enabled,
+            "running": bool(self._task and not self._task.done()),
+            "location_configured": (
+                self._settings.latitude is not None and self._settings.longitude is not None
+            ),
+            "prewarm_seconds": self._settings.macro_schedule_prewarm_seconds,
+            "max_drift_ms": drifts[-1] if drifts else None,
+            "upcoming": [
+                {
+                    "macro": fire.macro.name,
+                    "schedule": describe_schedule(fire.schedule),
+                    "arguments": fire.schedule.arguments,
+                    "scheduled_at": fire.fire_at.isoformat(),
+                }
+                for fire in self._get_upcoming(now)
+            ],
+            "recent_fires": list(reversed(self._fires)),
+        }
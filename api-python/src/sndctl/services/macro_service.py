@@ -1,21 +1,40 @@
 """Service to manage Sonos macros."""
 
+import asyncio
 import json
 import logging
+import os
 import re
+import time
+from collections.abc import AsyncIterable
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 from urllib.parse import quote
 
-import httpx
-
 from ..config import Settings
-from ..models import Macro, MacroParameter
+from ..models import Macro, MacroDiagnostic, MacroParameter, MacroSchedule, MacroValidationResult
+from .macro_engine import (
+    MacroEngine,
+    MacroError,
+    MacroStep,
+    bind_commands,
+    has_parallel_steps,
+    tokenize_definition,
+)
+from .macro_runs import MacroRunHistory
+from .macro_store import MacroStore
+from .macro_validation import validate_definition
 from .soco_cli_service import SocoCliService
+from .soco_service import SoCoService
 
 logger = logging.getLogger(__name__)
 
 
+class MacroNotFoundError(ValueError):
+    """Raised when a macro to execute doesn't exist."""
+
+
 class ImportResult:
     """Result of a macro import operation."""
     
@@ -23,23 +42,82 @@ class ImportResult:
         self.success: bool = False
         self.message: str = ""
         self.imported_count: int = 0
+        self.lines: list[ImportLineResult] = []
+
+
+class ImportLineResult:
+    """Outcome of one macro line of an imported file."""
+    
+    def __init__(self, line: int, name: str | None, status: str, message: str = ""):
+        """Initialize the line result.
+        
+        Args:
+            line: Line number (1-based).
+            name: Macro name, or None if the line couldn't be parsed.
+            status: imported, replaced, skipped, superseded or invalid.
+            message: Explanation for skipped, superseded and invalid lines.
+        """
+        self.line = line
+        self.name = name
+        self.status = status
+        self.message = message
+        self.diagnostics: list[MacroDiagnostic] = []
 
 
 class MacroService:
-    """Service to manage Sonos macros."""
+    """Service to manage Sonos macros.
     
-    def __init__(self, settings: Settings, soco_cli_service: SocoCliService):
+    Macros are stored in a SQLite macro store and parsed once into an
+    in-memory table indexed by lower-cased name. macros.txt is exported from
+    the store only when soco-cli or an export needs it. Edits made to
+    macros.txt outside the app are detected by stat and imported.
+    """
+    
+    def __init__(
+        self,
+        settings: Settings,
+        soco_cli_service: SocoCliService,
+        macro_engine: MacroEngine | None = None,
+        soco_service: SoCoService | None = None,
+    ):
         """Initialize the service.
         
         Args:
             settings: Application settings.
             soco_cli_service: The soco-cli service.
+            macro_engine: In-process engine for running macros natively.
+            soco_service: SoCo service whose speaker registry macros are validated against.
         """
         self._settings = settings
         self._soco_cli_service = soco_cli_service
-        self._client: httpx.AsyncClient | None = None
+        self._macro_engine = macro_engine
+        self._soco_service = soco_service
+        
+        # Compiled macro table: lower-cased name -> macro / tokenized definition
+        self._macros: dict[str, Macro] = {}
+        self._compiled: dict[str, list[tuple[int, list[str]]] | None] = {}
+        
+        # Signature of macros.txt as last exported or imported, and whether
+        # the store has changes that haven't been exported yet
+        self._file_signature: list[int] | None = None
+        self._export_pending = False
+        self._write_lock = asyncio.Lock()
+        
+        # Reload bookkeeping: every change bumps the generation, soco-cli has
+        # loaded everything up to its loaded generation
+        self._generation = 0
+        self._loaded_generation = 0
+        self._last_reload_ok = True
+        self._reload_task: asyncio.Task | None = None
+        self._reload_now = asyncio.Event()
+        self._reload_done = asyncio.Condition()
+        self._change_listeners: list[Callable[[], None]] = []
+        
+        self._runs = MacroRunHistory(settings.macro_run_history_size)
         
         self._ensure_macros_file_exists()
+        self._store = MacroStore(settings.macros_db_path)
+        self._load_store()
     
     @property
     def _macros_file_path(self) -> Path:
@@ -51,17 +129,11 @@ class MacroService:
         """Get the path to the metadata file."""
         return self._settings.macros_metadata_path
     
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create the HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=30.0)
-        return self._client
-    
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Stop a pending reload and close the macro store."""
+        if self._reload_task and not self._reload_task.done():
+            self._reload_task.cancel()
+        self._store.close()
     
     def _ensure_macros_file_exists(self) -> None:
         """Ensure the macros file exists."""
@@ -85,16 +157,249 @@ class MacroService:
         return {
             "filePath": str(self._macros_file_path),
             "fileExists": self._macros_file_path.exists(),
+            "storePath": str(self._store.path),
+            "macroCount": len(self._macros),
+            "exportPending": self._export_pending,
+            "generation": self._generation,
+            "socoCliGeneration": self._loaded_generation,
         }
     
     async def get_all_macros(self) -> list[Macro]:
-        """Get all macros from the file.
+        """Get all macros.
+        
+        Returns:
+            List of macros, ordered by name.
+        """
+        self._refresh_cache()
+        return [
+            macro.model_copy(deep=True)
+            for macro in sorted(self._macros.values(), key=lambda m: m.name.lower())
+        ]
+    
+    async def get_macro(self, name: str) -> Macro | None:
+        """Get a specific macro by name.
+        
+        Args:
+            name: Macro name (case-insensitive).
+            
+        Returns:
+            The macro, or None if not found.
+        """
+        self._refresh_cache()
+        macro = self._macros.get(name.lower())
+        return macro.model_copy(deep=True) if macro else None
+    
+    def _load_store(self) -> None:
+        """Load the macro table from the store, migrating macros.txt on first run."""
+        if self._store.get_meta("migrated_from") is None:
+            macros = self._read_macros()
+            self._store.replace_all(macros)
+            self._store.set_meta("migrated_from", str(self._macros_file_path))
+            self._record_file_signature(self._get_file_signature())
+            logger.info(
+                "Migrated %d macros from %s to %s",
+                len(macros), self._macros_file_path, self._store.path,
+            )
+        
+        self._set_macros(self._store.load_all())
+        
+        recorded = self._store.get_meta("macros_file_signature")
+        self._file_signature = self._get_file_signature()
+        if recorded is not None and self._file_signature != recorded:
+            # macros.txt was edited while the app wasn't running
+            self._import_external_edits()
+        else:
+            # The store is authoritative; make sure soco-cli's copy matches
+            self._mark_changed()
+    
+    def _get_file_signature(self) -> list[int] | None:
+        """Get a cheap fingerprint of macros.txt (inode, mtime, size)."""
+        try:
+            stat = self._macros_file_path.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+    
+    def _record_file_signature(self, signature: list[int] | None) -> None:
+        """Remember the signature of macros.txt as written or read by the app."""
+        self._file_signature = signature
+        self._store.set_meta("macros_file_signature", signature)
+    
+    def _refresh_cache(self) -> None:
+        """Import macros.txt if it was changed outside the app."""
+        if self._get_file_signature() != self._file_signature:
+            self._import_external_edits()
+    
+    def _import_external_edits(self) -> None:
+        """Replace the stored macros with the contents of an externally edited macros.txt.
+        
+        Metadata (description, category, parameters...) is kept for macros
+        that still exist.
+        """
+        try:
+            content = self._macros_file_path.read_text()
+        except FileNotFoundError:
+            logger.warning("%s was removed, exporting it again", self._macros_file_path)
+            self._export_macros_file()
+            return
+        
+        if self._export_pending:
+            logger.warning(
+                "%s was edited outside the app; it replaces unexported macro changes",
+                self._macros_file_path,
+            )
+        
+        macros: list[Macro] = []
+        for name, definition in self._parse_macros_file(content).items():
+            existing = self._macros.get(name.lower())
+            if existing:
+                macro = existing.model_copy(deep=True)
+                macro.name = name
+                macro.definition = definition
+            else:
+                macro = Macro(
+                    name=name,
+                    definition=definition,
+                    parameters=self._detect_parameters(definition),
+                )
+            macros.append(macro)
+        
+        self._store.replace_all(macros)
+        self._set_macros(macros)
+        self._record_file_signature(self._get_file_signature())
+        self._export_pending = False
+        # soco-cli only picks up the edited file on its next reload
+        self._generation += 1
+        self._notify_change()
+        logger.info("Imported %d macros from edited %s", len(macros), self._macros_file_path)
+    
+    @staticmethod
+    def _format_macros_file(macros: list[Macro]) -> str:
+        """Format macros in the macros.txt syntax read by soco-cli."""
+        content = "# Sound Control Macros\n"
+        content += "# Format: macro_name = speaker action args : speaker action args\n\n"
+        
+        for m in sorted(macros, key=lambda x: x.name):
+            if m.description:
+                content += f"# {m.description}\n"
+            content += f"{m.name} = {m.definition}\n\n"
+        return content
+    
+    def _export_macros_file(self) -> None:
+        """Write macros.txt from the store atomically (temp file + rename)."""
+        content = self._format_macros_file(list(self._macros.values()))
+        temp_path = self._macros_file_path.with_name(self._macros_file_path.name + ".tmp")
+        temp_path.write_text(content)
+        os.replace(temp_path, self._macros_file_path)
+        
+        self._record_file_signature(self._get_file_signature())
+        self._export_pending = False
+        logger.debug("Exported %d macros to %s", len(self._macros), self._macros_file_path)
+    
+    def _mark_changed(self) -> None:
+        """Record that the store changed since macros.txt and soco-cli last saw it."""
+        self._export_pending = True
+        self._generation += 1
+        self._notify_change()
+    
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback that is called whenever the macros change."""
+        self._change_listeners.append(callback)
+    
+    def _notify_change(self) -> None:
+        """Call the registered change listeners."""
+        for callback in self._change_listeners:
+            callback()
+    
+    async def _after_write(self) -> None:
+        """Bring soco-cli up to date after a macro change, if it needs to be.
+        
+        With the native engine, soco-cli only runs macros as a fallback, so
+        it is reloaded lazily right before that happens. Otherwise a reload
+        is scheduled, coalescing all changes made within the debounce window.
+        """
+        if not (self._macro_engine and self._settings.macro_native_engine):
+            self._schedule_reload()
+    
+    def _schedule_reload(self) -> None:
+        """Start the debounced reload task if it isn't already running."""
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload_loop())
+    
+    async def _reload_loop(self) -> None:
+        """Reload soco-cli until it has loaded the latest generation.
+        
+        Waits out the debounce window first (or until an execution needs the
+        reload now), so a burst of edits results in a single reload.
+        """
+        while self._loaded_generation < self._generation:
+            try:
+                await asyncio.wait_for(
+                    self._reload_now.wait(),
+                    timeout=self._settings.macro_reload_debounce_seconds,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._reload_now.clear()
+            
+            ok = False
+            try:
+                ok = await self.reload_macros()
+            except Exception as e:
+                logger.error("Failed to reload macros in soco-cli: %s", e)
+            finally:
+                # Always wake waiting executions, even if the reload failed or was cancelled
+                async with self._reload_done:
+                    self._last_reload_ok = ok
+                    self._reload_done.notify_all()
+            if not ok:
+                break
+    
+    async def _wait_for_reload(self) -> None:
+        """Wait until soco-cli has loaded the current generation of macros.
+        
+        Used before running a macro through soco-cli, so it never runs
+        against a half-applied set of changes.
+        """
+        target = self._generation
+        while self._loaded_generation < target:
+            async with self._reload_done:
+                if self._loaded_generation >= target:
+                    return
+                self._schedule_reload()
+                self._reload_now.set()
+                await self._reload_done.wait()
+                if self._loaded_generation < target and not self._last_reload_ok:
+                    logger.warning("soco-cli did not reload macros, running with its current copy")
+                    return
+    
+    def _set_macros(self, macros: list[Macro]) -> None:
+        """Replace the macro table, compiling each definition."""
+        self._macros = {}
+        self._compiled = {}
+        for macro in macros:
+            self._cache_macro(macro)
+    
+    def _cache_macro(self, macro: Macro) -> None:
+        """Add or replace one macro in the macro table."""
+        key = macro.name.lower()
+        self._macros[key] = macro
+        try:
+            self._compiled[key] = tokenize_definition(macro.definition)
+        except MacroError:
+            # Reported when the macro is executed
+            self._compiled[key] = None
+    
+    def _read_macros(self) -> list[Macro]:
+        """Read and parse all macros from the macros and metadata files.
+        
+        Only used to migrate the files into the macro store.
         
         Returns:
             List of macros.
         """
         macros: list[Macro] = []
-        metadata = await self._load_metadata()
+        metadata = self._load_metadata()
         
         try:
             lines = self._macros_file_path.read_text().splitlines()
@@ -128,6 +433,16 @@ class MacroService:
                             )
                             for p in params
                         ]
+                        macro.schedules = [
+                            MacroSchedule(
+                                kind=sch.get("kind", "cron"),
+                                cron=sch.get("cron"),
+                                offset_minutes=sch.get("offsetMinutes", 0),
+                                arguments=sch.get("arguments", []),
+                                enabled=sch.get("enabled", True),
+                            )
+                            for sch in meta.get("schedules", [])
+                        ]
                     else:
                         # Auto-detect parameters
                         macro.parameters = self._detect_parameters(definition)
@@ -139,21 +454,6 @@ class MacroService:
         
         return macros
     
-    async def get_macro(self, name: str) -> Macro | None:
-        """Get a specific macro by name.
-        
-        Args:
-            name: Macro name.
-            
-        Returns:
-            The macro, or None if not found.
-        """
-        macros = await self.get_all_macros()
-        for macro in macros:
-            if macro.name.lower() == name.lower():
-                return macro
-        return None
-    
     @staticmethod
     def _clean_share_links(definition: str) -> str:
         """Clean share links by removing Apple Music query parameters."""
@@ -169,6 +469,31 @@ class MacroService:
         )
         return cleaned
     
+    def validate_macro(self, macro: Macro) -> MacroValidationResult:
+        """Check a macro's definition without running it.
+        
+        Actions are checked against the native and soco-cli action tables,
+        speakers against the speaker registry (if any speakers are known)
+        and %N placeholders against the declared parameters.
+        
+        Args:
+            macro: The macro to check.
+        
+        Returns:
+            The diagnostics; the macro is valid if none of them is an error.
+        """
+        speakers = self._soco_service.get_known_speaker_names() if self._soco_service else []
+        diagnostics = validate_definition(
+            self._clean_share_links(macro.definition),
+            macro.parameters,
+            speakers or None,
+            self._soco_service.resolve_speaker_name if speakers else None,
+        )
+        return MacroValidationResult(
+            valid=not any(d.severity == "error" for d in diagnostics),
+            diagnostics=diagnostics,
+        )
+    
     async def save_macro(self, macro: Macro) -> bool:
         """Save or update a macro.
         
@@ -182,28 +507,14 @@ class MacroService:
             # Clean share links in the definition
             macro.definition = self._clean_share_links(macro.definition)
             
-            macros = await self.get_all_macros()
-            
-            # Remove existing macro with same name
-            macros = [m for m in macros if m.name.lower() != macro.name.lower()]
-            macros.append(macro)
-            
-            # Write to file
-            content = "# Sound Control Macros\n"
-            content += "# Format: macro_name = speaker action args : speaker action args\n\n"
-            
-            for m in sorted(macros, key=lambda x: x.name):
-                if m.description:
-                    content += f"# {m.description}\n"
-                content += f"{m.name} = {m.definition}\n\n"
+            async with self._write_lock:
+                self._refresh_cache()
+                stored = macro.model_copy(deep=True)
+                self._store.upsert(stored)
+                self._cache_macro(stored)
+                self._mark_changed()
             
-            self._macros_file_path.write_text(content)
-            
-            # Save metadata
-            await self._save_metadata(macros)
-            
-            # Reload macros in soco-cli server
-            await self.reload_macros()
+            await self._after_write()
             
             logger.info("Saved macro: %s", macro.name)
             return True
@@ -222,29 +533,16 @@ class MacroService:
             True if deleted successfully.
         """
         try:
-            macros = await self.get_all_macros()
-            original_count = len(macros)
+            async with self._write_lock:
+                self._refresh_cache()
+                if not self._store.delete(name):
+                    return False
+                key = name.lower()
+                self._macros.pop(key, None)
+                self._compiled.pop(key, None)
+                self._mark_changed()
             
-            macros = [m for m in macros if m.name.lower() != name.lower()]
-            
-            if len(macros) == original_count:
-                return False
-            
-            # Write to file
-            content = "# Sound Control Macros\n\n"
-            
-            for m in sorted(macros, key=lambda x: x.name):
-                if m.description:
-                    content += f"# {m.description}\n"
-                content += f"{m.name} = {m.definition}\n\n"
-            
-            self._macros_file_path.write_text(content)
-            
-            # Save metadata
-            await self._save_metadata(macros)
-            
-            # Reload macros in soco-cli server
-            await self.reload_macros()
+            await self._after_write()
             
             logger.info("Deleted macro: %s", name)
             return True
@@ -269,12 +567,11 @@ class MacroService:
                 return None
             
             # Generate a unique name for the duplicate
-            macros = await self.get_all_macros()
             base_name = f"{source_name}_copy"
             new_name = base_name
             counter = 1
             
-            while any(m.name.lower() == new_name.lower() for m in macros):
+            while new_name.lower() in self._macros:
                 counter += 1
                 new_name = f"{base_name}_{counter}"
             
@@ -302,51 +599,176 @@ class MacroService:
     async def execute_macro(self, macro_name: str, arguments: list[str]) -> Any:
         """Execute a macro.
         
+        Runs in-process when the native engine is enabled and supports every
+        step of the macro, otherwise through the soco-cli server.
+        
         Args:
             macro_name: Name of the macro.
             arguments: List of arguments.
             
         Returns:
-            Response from soco-cli.
+            Execution result.
+        
+        Raises:
+            MacroNotFoundError: If there is no macro with that name.
         """
-        await self._soco_cli_service.ensure_server_running()
+        self._refresh_cache()
+        key = macro_name.lower()
+        if key not in self._macros:
+            raise MacroNotFoundError(f"Macro '{macro_name}' not found")
+        name = self._macros[key].name
         
+        steps: list[MacroStep] | None = None
+        commands = self._compiled[key]
         try:
-            client = await self._get_client()
-            url = f"{self._soco_cli_service.server_url}/macro/{quote(macro_name)}"
-            
-            if arguments:
-                encoded_args = "/".join(quote(arg) for arg in arguments)
-                url += f"/{encoded_args}"
-            
-            logger.info("Executing macro: %s", url)
-            
-            response = await client.get(url)
-            
-            if response.status_code != 200:
-                logger.error(
-                    "soco-cli request failed: GET %s => %d. Body: %s",
-                    url, response.status_code, response.text
+            if commands is None:
+                # Re-tokenize to get the parse error
+                commands = tokenize_definition(self._macros[key].definition)
+            steps = bind_commands(commands, arguments)
+        except MacroError as e:
+            # soco-cli has the final say on its own sequence syntax
+            logger.info("Macro %s couldn't be parsed (%s), using soco-cli", macro_name, e)
+        
+        if steps is not None and self._macro_engine and self._settings.macro_native_engine:
+            if self._macro_engine.supports(steps):
+                started_at = datetime.now()
+                result = await self._macro_engine.run(name, steps)
+                result["run_id"] = self._runs.record(
+                    name, arguments, started_at, result["elapsed_ms"], "native",
+                    result["exit_code"], result["error_msg"], result["steps"],
                 )
-                response.raise_for_status()
-            
-            return response.json()
-            
+                return result
+            logger.info("Macro %s uses commands without a native implementation, using soco-cli", macro_name)
+        
+        if steps is not None and has_parallel_steps(steps):
+            # soco-cli only understands ':' sequences
+            raise ValueError(f"Macro '{macro_name}' uses parallel steps ('&'), which soco-cli cannot run")
+        
+        started_at = datetime.now()
+        started = time.monotonic()
+        error_msg = ""
+        
+        try:
+            await self._soco_cli_service.ensure_server_running()
+            await self._wait_for_reload()
+            
+            try:
+                async with self._soco_cli_service.checkout_worker() as base_url:
+                    result = await self._request_macro(base_url, macro_name, arguments)
+            finally:
+                if self._soco_service:
+                    # Whatever soco-cli changed, cached speaker state is now stale
+                    speakers = {step.speaker for step in steps or [] if step.speaker}
+                    if steps is None or not speakers:
+                        self._soco_service.note_external_change()
+                    for speaker in speakers:
+                        self._soco_service.note_external_change(speaker)
+            return result
         except Exception as e:
             logger.error("Failed to execute macro %s: %s", macro_name, e)
+            error_msg = str(e)
             raise
+        finally:
+            # soco-cli runs the whole macro as one opaque network call
+            elapsed_ms = (time.monotonic() - started) * 1000
+            exit_code = 1 if error_msg else 0
+            self._runs.record(
+                name, arguments, started_at, elapsed_ms, "soco-cli", exit_code, error_msg,
+                [{
+                    "speaker": None,
+                    "action": "macro",
+                    "engine": "soco-cli",
+                    "outcome": "failed" if error_msg else "ok",
+                    "exit_code": exit_code,
+                    "duration_ms": round(elapsed_ms, 1),
+                }],
+            )
+    
+    def get_scheduled_macros(self) -> list[Macro]:
+        """Get the macros that have at least one schedule."""
+        self._refresh_cache()
+        return [macro for macro in self._macros.values() if macro.schedules]
+    
+    def get_macro_speakers(self, macro_name: str, arguments: list[str]) -> list[str]:
+        """Get the speakers a macro's steps address, as written in the macro.
+        
+        Args:
+            macro_name: Name of the macro.
+            arguments: Macro arguments.
+        
+        Returns:
+            Speaker names in order of first use.
+        """
+        commands = self._compiled.get(macro_name.lower())
+        if not commands:
+            return []
+        speakers: list[str] = []
+        for step in bind_commands(commands, arguments):
+            if step.speaker and step.speaker not in speakers:
+                speakers.append(step.speaker)
+        return speakers
+    
+    def get_runs(self, macro_name: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Get recent macro runs with their step timelines, newest first.
+        
+        Args:
+            macro_name: Only include runs of this macro.
+            limit: Maximum number of runs to return.
+        """
+        return self._runs.get_runs(macro_name, limit)
+    
+    def get_run_stats(self) -> dict[str, dict[str, Any]]:
+        """Get run-time percentiles per macro over the recent runs."""
+        return self._runs.get_stats()
+    
+    async def _request_macro(self, base_url: str, macro_name: str, arguments: list[str]) -> Any:
+        """Run a macro on one soco-cli server worker."""
+        client = self._soco_cli_service.client
+        url = f"{base_url}/macro/{quote(macro_name)}"
+        
+        if arguments:
+            encoded_args = "/".join(quote(arg) for arg in arguments)
+            url += f"/{encoded_args}"
+        
+        logger.info("Executing macro: %s", url)
+        
+        response = await client.get(url)
+        
+        if response.status_code != 200:
+            logger.error(
+                "soco-cli request failed: GET %s => %d. Body: %s",
+                url, response.status_code, response.text
+            )
+            response.raise_for_status()
+        
+        return response.json()
     
     async def reload_macros(self) -> bool:
-        """Reload macros in the soco-cli server.
+        """Reload macros in every soco-cli server worker.
         
         Returns:
-            True if reloaded successfully.
+            True if all workers reloaded successfully.
         """
         await self._soco_cli_service.ensure_server_running()
         
+        generation = self._generation
+        if self._export_pending:
+            self._export_macros_file()
+        
+        results = await asyncio.gather(*(
+            self._reload_worker_macros(base_url)
+            for base_url in self._soco_cli_service.worker_urls
+        ))
+        if all(results):
+            self._loaded_generation = max(self._loaded_generation, generation)
+            logger.info("Reloaded macros in soco-cli server (generation %d)", generation)
+        return all(results)
+    
+    async def _reload_worker_macros(self, base_url: str) -> bool:
+        """Reload macros in one soco-cli server worker."""
         try:
-            client = await self._get_client()
-            url = f"{self._soco_cli_service.server_url}/macros/reload"
+            client = self._soco_cli_service.client
+            url = f"{base_url}/macros/reload"
             response = await client.get(url)
             
             if response.status_code != 200:
@@ -356,7 +778,6 @@ class MacroService:
                 )
                 return False
             
-            logger.info("Reloaded macros in soco-cli server")
             return True
             
         except Exception as e:
@@ -382,7 +803,7 @@ class MacroService:
         
         return sorted(parameters, key=lambda p: p.position)
     
-    async def _load_metadata(self) -> dict[str, dict]:
+    def _load_metadata(self) -> dict[str, dict]:
         """Load metadata from JSON file."""
         if not self._metadata_file_path.exists():
             return {}
@@ -408,100 +829,166 @@ class MacroService:
             logger.error("Failed to load macro metadata: %s", e)
             return {}
     
-    async def _save_metadata(self, macros: list[Macro]) -> None:
-        """Save metadata to JSON file."""
-        try:
-            data = [
-                {
-                    "name": m.name,
-                    "description": m.description,
-                    "category": m.category,
-                    "isFavorite": m.is_favorite,
-                    "parameters": [
-                        {
-                            "position": p.position,
-                            "name": p.name,
-                            "description": p.description,
-                            "type": p.type,
-                            "defaultValue": p.default_value,
-                        }
-                        for p in m.parameters
-                    ],
-                }
-                for m in macros
-            ]
-            
-            self._metadata_file_path.write_text(json.dumps(data, indent=2))
-            
-        except Exception as e:
-            logger.error("Failed to save macro metadata: %s", e)
-    
     async def get_macros_file_content(self) -> str:
         """Get the raw macros file content for export."""
-        if not self._macros_file_path.exists():
-            return ""
+        self._refresh_cache()
+        if self._export_pending or not self._macros_file_path.exists():
+            self._export_macros_file()
         return self._macros_file_path.read_text()
     
-    async def import_macros(self, content: str, merge: bool = False) -> ImportResult:
-        """Import macros from file content.
+    async def import_macros(
+        self, lines: AsyncIterable[str], merge: bool = False, force: bool = False
+    ) -> ImportResult:
+        """Import macros from a macros.txt-style file, read line by line.
+        
+        Each macro is validated and checked against the macro table and the
+        macros read so far (a later line with the same name replaces an
+        earlier one, as in soco-cli). A comment line directly above a macro
+        becomes its description. Macros whose definition has errors are
+        marked invalid and left out, unless force is set. The result is
+        written to the store in one transaction.
         
         Args:
-            content: File content.
+            lines: Lines of the file.
             merge: If True, merge with existing macros instead of replacing.
-            
+            force: If True, also import macros whose definition has errors.
+        
         Returns:
-            Import result.
+            Import result, with one entry per macro line.
+        
+        Raises:
+            UnicodeDecodeError: If the file isn't valid UTF-8.
         """
         result = ImportResult()
         
         try:
-            # Parse the imported content to validate it
-            imported_macros = self._parse_macros_file(content)
+            # Name, definition and description of each macro line, with its result
+            entries: list[tuple[str, str, str | None, ImportLineResult]] = []
+            comment: str | None = None
+            line_number = 0
             
-            if not imported_macros:
+            async for line in lines:
+                line_number += 1
+                stripped = line.strip()
+                if not stripped:
+                    comment = None
+                    continue
+                if stripped.startswith("#"):
+                    comment = stripped[1:].strip() or None
+                    continue
+                
+                split = self._split_macro_line(stripped)
+                if split is None:
+                    result.lines.append(
+                        ImportLineResult(line_number, None, "invalid", "Expected 'name = definition'")
+                    )
+                    comment = None
+                    continue
+                name, definition = split
+                
+                line_result = ImportLineResult(line_number, name, "imported")
+                entries.append((name, definition, comment, line_result))
+                result.lines.append(line_result)
+                comment = None
+            
+            if not entries:
                 result.message = "No valid macros found in the imported file"
                 return result
             
-            if merge:
-                # Merge with existing macros
-                existing_content = await self.get_macros_file_content()
-                existing_macros = self._parse_macros_file(existing_content)
+            async with self._write_lock:
+                # Statuses depend on the macro table, so decide them under the lock
+                self._refresh_cache()
+                # Lower-cased name -> macro and the result of the line it came from
+                parsed: dict[str, tuple[Macro, ImportLineResult]] = {}
+                invalid = 0
+                for name, definition, description, line_result in entries:
+                    key = name.lower()
+                    existing = self._macros.get(key)
+                    if existing and not merge:
+                        # Keep metadata of macros that are being replaced
+                        macro = existing.model_copy(deep=True)
+                        macro.name = name
+                        macro.definition = definition
+                        macro.description = description or existing.description
+                        line_result.status = "replaced"
+                    else:
+                        macro = Macro(
+                            name=name,
+                            definition=definition,
+                            description=description,
+                            parameters=self._detect_parameters(definition),
+                        )
+                        if existing:
+                            line_result.status = "skipped"
+                            line_result.message = "Macro already exists"
+                    
+                    validation = self.validate_macro(macro)
+                    line_result.diagnostics = validation.diagnostics
+                    if not validation.valid:
+                        invalid += 1
+                        if not force:
+                            line_result.status = "invalid"
+                            line_result.message = "Macro definition has errors"
+                            continue
+                    
+                    earlier = parsed.get(key)
+                    if earlier:
+                        earlier[1].status = "superseded"
+                        earlier[1].message = f"Replaced by line {line_result.line}"
+                    parsed[key] = (macro, line_result)
                 
-                # Add new macros, skip existing ones
-                new_macros: list[str] = []
-                for name, definition in imported_macros.items():
-                    if name.lower() not in {k.lower() for k in existing_macros}:
-                        new_macros.append(f"{name} = {definition}")
-                        result.imported_count += 1
+                if not parsed:
+                    result.message = f"No valid macros found in the imported file; {invalid} macros have errors"
+                    return result
                 
-                if new_macros:
-                    # Append to existing file
-                    append_content = "\n# Imported macros\n" + "\n".join(new_macros) + "\n"
-                    with open(self._macros_file_path, "a") as f:
-                        f.write(append_content)
-                    result.message = (
-                        f"Merged {result.imported_count} new macros "
-                        f"(skipped {len(imported_macros) - result.imported_count} existing)"
+                if merge:
+                    # Add new macros, skip existing ones
+                    result.imported_count = self._store.insert_missing(
+                        [macro for macro, _ in parsed.values()]
                     )
+                    if result.imported_count:
+                        result.message = (
+                            f"Merged {result.imported_count} new macros "
+                            f"(skipped {len(parsed) - result.imported_count} existing)"
+                        )
+                    else:
+                        result.message = "All macros already exist, nothing to import"
                 else:
-                    result.message = "All macros already exist, nothing to import"
-            else:
-                # Replace entire file
-                self._macros_file_path.write_text(content)
-                result.imported_count = len(imported_macros)
-                result.message = f"Imported {result.imported_count} macros (replaced existing file)"
+                    self._store.replace_all([macro for macro, _ in parsed.values()])
+                    result.imported_count = len(parsed)
+                    result.message = f"Imported {result.imported_count} macros (replaced existing macros)"
+                
+                self._set_macros(self._store.load_all())
+                self._mark_changed()
             
             result.success = True
+            if invalid and force:
+                result.message += f"; {invalid} macros have errors"
+            elif invalid:
+                result.message += f"; left out {invalid} macros with errors"
             
-            # Reload macros in soco-cli
-            await self.reload_macros()
-            
+            await self._after_write()
+        
+        except UnicodeDecodeError:
+            # Nothing was written; let the caller report the bad upload
+            raise
         except Exception as e:
             logger.error("Failed to import macros: %s", e)
             result.message = f"Failed to import macros: {e}"
         
         return result
     
+    @staticmethod
+    def _split_macro_line(line: str) -> tuple[str, str] | None:
+        """Split a 'name = definition' line, or return None if it isn't one."""
+        equals_index = line.find("=")
+        if equals_index > 0:
+            name = line[:equals_index].strip()
+            definition = line[equals_index + 1:].strip()
+            if name and definition:
+                return name, definition
+        return None
+    
     @staticmethod
     def _parse_macros_file(content: str) -> dict[str, str]:
         """Parse macros file content into a dictionary."""
@@ -512,11 +999,8 @@ class MacroService:
             if not stripped or stripped.startswith("#"):
                 continue
             
-            equals_index = stripped.find("=")
-            if equals_index > 0:
-                name = stripped[:equals_index].strip()
-                definition = stripped[equals_index + 1:].strip()
-                if name and definition:
-                    macros[name] = definition
+            split = MacroService._split_macro_line(stripped)
+            if split:
+                macros[split[0]] = split[1]
         
         return macros
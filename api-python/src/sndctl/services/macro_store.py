@@ -0,0 +1,172 @@
+"""SQLite-backed macro store.
+
+Macros (definitions and their metadata) live in a small SQLite database so
+that saving or deleting one macro is a single-row transaction, instead of
+rewriting macros.txt and the metadata JSON. macros.txt is still exported
+for soco-cli, but only when something needs it.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from ..models import Macro, MacroParameter, MacroSchedule
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS macros (
+    name TEXT PRIMARY KEY COLLATE NOCASE,
+    definition TEXT NOT NULL,
+    description TEXT,
+    category TEXT,
+    is_favorite INTEGER NOT NULL DEFAULT 0,
+    parameters TEXT NOT NULL DEFAULT '[]',
+    schedules TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class MacroStore:
+    """Transactional storage for macros.
+
+    Every write runs in its own SQLite transaction, so a crash or a
+    concurrent save can never leave a half-written macro table.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (and create if needed) the macro database.
+
+        Args:
+            db_path: Path to the SQLite database file.
+        """
+        self._db_path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._upgrade_schema()
+
+    def _upgrade_schema(self) -> None:
+        """Add columns introduced after a database was created."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(macros)")}
+        if "schedules" not in columns:
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE macros ADD COLUMN schedules TEXT NOT NULL DEFAULT '[]'"
+                )
+
+    @property
+    def path(self) -> Path:
+        """Get the path to the database file."""
+        return self._db_path
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def load_all(self) -> list[Macro]:
+        """Load every macro, ordered by name."""
+        rows = self._conn.execute("SELECT * FROM macros ORDER BY name").fetchall()
+        return [self._row_to_macro(row) for row in rows]
+
+    def count(self) -> int:
+        """Get the number of stored macros."""
+        return self._conn.execute("SELECT COUNT(*) FROM macros").fetchone()[0]
+
+    def upsert(self, macro: Macro) -> None:
+        """Insert or replace one macro atomically."""
+        with self._conn:
+            # Delete first so a rename in letter case replaces the old row
+            self._conn.execute("DELETE FROM macros WHERE name = ?", (macro.name,))
+            self._insert(macro)
+
+    def delete(self, name: str) -> bool:
+        """Delete one macro atomically.
+
+        Returns:
+            True if the macro existed.
+        """
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM macros WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def replace_all(self, macros: list[Macro]) -> None:
+        """Replace the whole macro table in one transaction."""
+        with self._conn:
+            self._conn.execute("DELETE FROM macros")
+            for macro in macros:
+                self._conn.execute("DELETE FROM macros WHERE name = ?", (macro.name,))
+                self._insert(macro)
+
+    def insert_missing(self, macros: list[Macro]) -> int:
+        """Insert the macros that don't exist yet, in one transaction.
+
+        Returns:
+            Number of macros inserted.
+        """
+        inserted = 0
+        with self._conn:
+            for macro in macros:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM macros WHERE name = ?", (macro.name,)
+                ).fetchone()
+                if not exists:
+                    self._insert(macro)
+                    inserted += 1
+        return inserted
+
+    def get_meta(self, key: str) -> Any:
+        """Get a JSON value from the store's bookkeeping table."""
+        row = self._conn.execute(
+            "SELECT value FROM store_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row["value"]) if row else None
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """Set a JSON value in the store's bookkeeping table."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+
+    def _insert(self, macro: Macro) -> None:
+        """Insert one macro row (inside the caller's transaction)."""
+        self._conn.execute(
+            "INSERT INTO macros "
+            "(name, definition, description, category, is_favorite, parameters, schedules, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                macro.name,
+                macro.definition,
+                macro.description,
+                macro.category,
+                int(macro.is_favorite),
+                json.dumps([p.model_dump() for p in macro.parameters]),
+                json.dumps([s.model_dump() for s in macro.schedules]),
+                time.time(),
+            ),
+        )
+
+    @staticmethod
+    def _row_to_macro(row: sqlite3.Row) -> Macro:
+        """Build a Macro from a database row."""
+        return Macro(
+            name=row["name"],
+            definition=row["definition"],
+            description=row["description"],
+            category=row["category"],
+            is_favorite=bool(row["is_favorite"]),
+            parameters=[MacroParameter(**p) for p in json.loads(row["parameters"])],
+            schedules=[MacroSchedule(**s) for s in json.loads(row["schedules"])],
+        )
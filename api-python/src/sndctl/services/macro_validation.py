@@ -0,0 +1,197 @@
+"""Static validation of macro definitions.
+
+Checks a definition without running it: every command should use a known
+action, every speaker should exist in the speaker registry, and the %N
+placeholders must match the macro's declared parameters. Typos are
+reported when the macro is saved instead of halfway through a run.
+"""
+
+import difflib
+from collections.abc import Callable
+
+from ..models import MacroDiagnostic, MacroParameter
+from .macro_engine import (
+    NATIVE_ACTIONS,
+    PARAMETER_PATTERN,
+    SPEAKERLESS_ACTIONS,
+    MacroError,
+    parse_duration,
+    tokenize_definition,
+)
+
+# Maximum number of macro parameters (%1 to %12)
+MAX_PARAMETERS = 12
+
+# soco-cli actions (and aliases) without a native implementation, which are
+# passed through to soco-cli: the keys of soco_cli.action_processor.actions in
+# soco-cli 0.4.86, plus the track-follow actions its command line handles itself.
+# Other soco-cli versions may add actions, so unknown actions are only warnings.
+SOCO_CLI_ACTIONS = frozenset({
+    "add_alarm", "add_library_playlist_to_queue", "add_pl_to_queue", "add_satellite_speakers",
+    "add_satellites", "add_sharelink_to_queue", "add_uri_to_queue", "alarms", "alarms_spec",
+    "alarms_spec_zone", "alarms_zone", "album_art", "albums", "all_rooms", "all_zones", "alpq",
+    "artists", "audio_format", "auq", "available_actions", "balance", "bass", "battery",
+    "buttons", "cf", "cfrs", "channel", "clear_playlist", "copy_alarm", "copy_modify_alarm",
+    "create_alarm", "create_playlist", "create_playlist_from_queue", "cue_fav", "cue_favorite",
+    "cue_favorite_radio_station", "cue_favourite", "cue_favourite_radio_station", "cue_line_in",
+    "delete_playlist", "dialog", "dialog_mode", "dialogue", "dialogue_mode", "disable_alarm",
+    "disable_alarms", "enable_alarm", "enable_alarms", "end_session", "fav",
+    "favorite_radio_stations", "favourite_radio_stations", "fixed_volume", "frs", "get_channel",
+    "get_uri", "group_mute", "group_rel_vol", "group_relative_volume", "group_volume_equalise",
+    "group_volume_equalize", "groups", "groupstatus", "grv", "gve", "has_satellites",
+    "has_subwoofer", "if_coordinator", "if_no_queue", "if_not_coordinator", "if_playing",
+    "if_queue", "if_stopped", "info", "is_indexing", "is_playing_tv", "is_satellite",
+    "is_subwoofer", "lapt", "last_search", "lf", "lfrs", "libraries", "light", "line_in",
+    "list_alarms", "list_albums", "list_all_playlist_tracks", "list_artists", "list_favorites",
+    "list_favourites", "list_favs", "list_library_playlist_tracks", "list_library_playlists",
+    "list_playlist_tracks", "list_playlists", "list_queue", "llp", "llpt", "loudness", "lp",
+    "lpt", "lq", "ls", "lta", "mg", "mic_enabled", "mode", "modify_alarm", "modify_alarms",
+    "move_alarm", "multi_group", "night", "night_mode", "pair", "pause_all", "pfn", "pfrs",
+    "pfrsn", "play_cd", "play_dir", "play_directory", "play_fav_radio_station_no",
+    "play_favorite_number", "play_favorite_radio_station", "play_favourite_number",
+    "play_favourite_radio_station", "play_file", "play_local_file", "play_local_m3u",
+    "play_m3u", "play_mode", "play_queue", "play_sharelink", "playback", "playback_state",
+    "playing_tv", "playlists", "q", "qa", "ql", "qmsr", "qp", "qsn", "qsr", "qt", "queue",
+    "queue_album", "queue_length", "queue_multiple_search_results", "queue_position",
+    "queue_search_number", "queue_search_result_number", "queue_search_results", "queue_track",
+    "ramp", "ramp_to_volume", "rb", "rctfq", "reboot_count", "reindex", "rel_bass",
+    "rel_sub_gain", "rel_treble", "relative_bass", "relative_sub_gain", "relative_treble",
+    "remove_alarm", "remove_alarms", "remove_current_track_from_queue", "remove_from_playlist",
+    "remove_from_queue", "remove_last_track_from_queue", "remove_playlist", "rename", "rfp",
+    "rfq", "rltfq", "rooms", "rq", "rsg", "rt", "salb", "sart", "save_queue", "sb",
+    "search_album", "search_albums", "search_artist", "search_artists", "search_library",
+    "search_track", "search_tracks", "seek_back", "seek_forward", "separate_satellite_speakers",
+    "separate_satellites", "set_queue_position", "sf", "sharelink", "shares", "sl", "sleep_at",
+    "snooze_alarm", "sq", "sqp", "st", "state", "status", "status_light", "stop_all",
+    "sub_enabled", "sub_gain", "surround_enabled", "surround_full_volume_enabled",
+    "surround_volume_music", "surround_volume_tv", "switch_to_tv", "sysinfo", "tf", "tfc",
+    "tia", "track_follow", "track_follow_compact", "tracks_in_album", "treble", "trueplay",
+    "tv_audio_delay", "ugaig", "ungroup_all_in_group", "unpair", "visible_rooms",
+    "visible_zones", "wait_end_track", "wait_start", "wait_stop", "wait_stop_not_pause",
+    "wait_stopped_for", "wait_stopped_for_not_pause", "wsf", "wsfnp", "wsnp", "zones"
+})
+
+# Every action a macro command may use
+KNOWN_ACTIONS = frozenset(NATIVE_ACTIONS) | SOCO_CLI_ACTIONS | frozenset(SPEAKERLESS_ACTIONS)
+
+
+def _has_placeholder(token: str) -> bool:
+    """Check if a token contains a %N placeholder (only known at run time)."""
+    return PARAMETER_PATTERN.search(token) is not None
+
+
+def _suggestion(value: str, choices: list[str]) -> str:
+    """Get a ' (did you mean ...?)' hint for a misspelt value, if there's a close match."""
+    matches = difflib.get_close_matches(value.lower(), [c.lower() for c in choices], n=1)
+    if not matches:
+        return ""
+    original = next(c for c in choices if c.lower() == matches[0])
+    return f" (did you mean '{original}'?)"
+
+
+def validate_definition(
+    definition: str,
+    parameters: list[MacroParameter],
+    speakers: list[str] | None = None,
+    resolve_speaker: Callable[[str], str | None] | None = None,
+) -> list[MacroDiagnostic]:
+    """Validate a macro definition.
+    
+    Args:
+        definition: Macro definition in soco-cli sequence syntax.
+        parameters: The macro's declared parameters.
+        speakers: Known speaker names, or None to skip speaker checks.
+        resolve_speaker: Resolves a speaker name as typed in a macro.
+    
+    Returns:
+        Diagnostics, in definition order. Unknown speakers are warnings
+        (the speaker may just be offline), as are unknown actions (the
+        installed soco-cli may be newer); everything else is an error.
+    """
+    diagnostics: list[MacroDiagnostic] = []
+    try:
+        commands = tokenize_definition(definition)
+    except MacroError as e:
+        return [MacroDiagnostic(code="parse_error", message=str(e))]
+    if not commands:
+        return [MacroDiagnostic(code="empty_definition", message="The macro has no commands")]
+    
+    used: set[int] = set()
+    for index, (_, tokens) in enumerate(commands):
+        text = " ".join(tokens)
+        for token in tokens:
+            used.update(int(n) for n in PARAMETER_PATTERN.findall(token))
+        
+        if tokens[0].lower() in SPEAKERLESS_ACTIONS:
+            speaker, action, args = None, tokens[0].lower(), tokens[1:]
+        elif len(tokens) < 2:
+            diagnostics.append(MacroDiagnostic(
+                code="missing_action",
+                message=f"Command '{text}' has a speaker but no action",
+                command=index,
+                text=text,
+            ))
+            continue
+        else:
+            speaker, action, args = tokens[0], tokens[1], tokens[2:]
+        
+        if not _has_placeholder(action) and action.lower() not in KNOWN_ACTIONS:
+            diagnostics.append(MacroDiagnostic(
+                severity="warning",
+                code="unknown_action",
+                message=f"Unknown action '{action}'" + _suggestion(action, sorted(KNOWN_ACTIONS)),
+                command=index,
+                text=text,
+            ))
+        
+        if action in ("wait", "wait_for", "loop_for"):
+            if not args:
+                diagnostics.append(MacroDiagnostic(
+                    code="missing_argument",
+                    message=f"'{action}' needs a duration",
+                    command=index,
+                    text=text,
+                ))
+            elif not _has_placeholder(args[0]):
+                try:
+                    parse_duration(args[0])
+                except MacroError as e:
+                    diagnostics.append(MacroDiagnostic(
+                        code="invalid_argument", message=str(e), command=index, text=text,
+                    ))
+        
+        if (
+            speaker is not None
+            and speakers is not None
+            and resolve_speaker is not None
+            and not _has_placeholder(speaker)
+            and resolve_speaker(speaker) is None
+        ):
+            diagnostics.append(MacroDiagnostic(
+                severity="warning",
+                code="unknown_speaker",
+                message=f"Speaker '{speaker}' was not found" + _suggestion(speaker, speakers),
+                command=index,
+                text=text,
+            ))
+    
+    declared = {p.position for p in parameters}
+    for number in sorted(used):
+        if not 1 <= number <= MAX_PARAMETERS:
+            diagnostics.append(MacroDiagnostic(
+                code="parameter_out_of_range",
+                message=f"%{number} is not a valid parameter (use %1 to %{MAX_PARAMETERS})",
+            ))
+        elif declared and number not in declared:
+            diagnostics.append(MacroDiagnostic(
+                code="undeclared_parameter",
+                message=f"%{number} is used but the macro declares {len(declared)} parameter(s)",
+            ))
+    for number in sorted(declared - used):
+        diagnostics.append(MacroDiagnostic(
+            severity="warning",
+            code="unused_parameter",
+            message=f"Parameter {number} is declared but %{number} is not used",
+        ))
+    
+    return diagnostics
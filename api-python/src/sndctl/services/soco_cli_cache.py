@@ -0,0 +1,78 @@
+"""soco-cli's local speaker cache.
+
+With ``--use-local-speaker-list``, soco-cli reads its speakers from a
+pickled list of ``soco_cli.speakers.SonosDevice`` namedtuples instead of
+running its own discovery. sndctl writes that file from its own speaker
+registry so both agree on speaker names and addresses.
+
+soco-cli usually lives in its own (pipx) environment and can't be imported
+here, so the pickle is written opcode by opcode with a reference to
+soco-cli's class; soco-cli resolves it when it loads the file.
+"""
+
+import os
+import pickle
+import struct
+from pathlib import Path
+
+# Fields of soco_cli.speakers.SonosDevice, in order
+SONOS_DEVICE_FIELDS = (
+    "household_id",
+    "ip_address",
+    "speaker_name",
+    "is_visible",
+    "model_name",
+    "display_version",
+)
+
+SONOS_DEVICE_CLASS = b"soco_cli.speakers\nSonosDevice\n"
+
+
+def default_cache_path() -> Path:
+    """Get the path soco-cli reads its local speaker list from."""
+    return Path.home() / ".soco-cli" / "speakers_v2.pickle"
+
+
+def _pickle_value(value: str | bool) -> bytes:
+    """Pickle a string or bool (protocol 2 opcodes)."""
+    if isinstance(value, bool):
+        return pickle.NEWTRUE if value else pickle.NEWFALSE
+    encoded = value.encode("utf-8")
+    return pickle.BINUNICODE + struct.pack("<I", len(encoded)) + encoded
+
+
+def dumps_speaker_cache(devices: list[tuple[str, str, str, bool, str, str]]) -> bytes:
+    """Serialize devices as a pickled list of SonosDevice namedtuples.
+
+    Args:
+        devices: One tuple per speaker, with the values of SONOS_DEVICE_FIELDS.
+
+    Returns:
+        The pickle, loadable where soco_cli is importable.
+    """
+    parts = [pickle.PROTO, b"\x02", pickle.EMPTY_LIST]
+    if devices:
+        parts.append(pickle.MARK)
+        for device in devices:
+            # SonosDevice(*fields)
+            parts.append(pickle.GLOBAL + SONOS_DEVICE_CLASS)
+            parts.append(pickle.MARK)
+            parts.extend(_pickle_value(value) for value in device)
+            parts.append(pickle.TUPLE)
+            parts.append(pickle.REDUCE)
+        parts.append(pickle.APPENDS)
+    parts.append(pickle.STOP)
+    return b"".join(parts)
+
+
+def write_speaker_cache(path: Path, devices: list[tuple[str, str, str, bool, str, str]]) -> None:
+    """Write soco-cli's speaker cache atomically (temp file + rename).
+
+    Args:
+        path: Cache file path.
+        devices: One tuple per speaker, with the values of SONOS_DEVICE_FIELDS.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(dumps_speaker_cache(devices))
+    os.replace(temp_path, path)
@@ -4,17 +4,96 @@ import asyncio
 import logging
 import os
 import subprocess
+import time
+import zlib
 from datetime import datetime, timezone
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
+
+import httpx
 
 from ..config import Settings
+from .soco_cli_cache import default_cache_path
 
 logger = logging.getLogger(__name__)
 
+# Runs soco-cli's server on a Unix socket: soco-cli always serves TCP, so its
+# uvicorn.run() call is redirected to the socket passed as the first argument
+UDS_LAUNCHER = """\
+import sys
+import uvicorn
+from soco_cli import http_api
+
+socket_path = sys.argv.pop(1)
+serve = uvicorn.run
+
+def run(app, host=None, port=None, **kwargs):
+    serve(app, uds=socket_path, **kwargs)
+
+uvicorn.run = run
+http_api.main()
+"""
+
+
+class SocoCliWorker:
+    """A single soco-cli HTTP API server process."""
+    
+    def __init__(self, index: int, port: int, socket_path: Path | None = None):
+        """Initialize the worker.
+        
+        Args:
+            index: Position of the worker in the pool.
+            port: Port the server listens on (with UDS, just identifies the worker).
+            socket_path: Unix socket the server listens on instead of the port.
+        """
+        self.index = index
+        self.port = port
+        self.socket_path = socket_path
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at: Optional[datetime] = None
+        self.started_monotonic: float | None = None
+        self.ready = False
+        
+        # Supervision state
+        self.stopping = False
+        self.restarts = 0
+        self.consecutive_crashes = 0
+        self.last_exit_code: int | None = None
+        self.last_exit_at: Optional[datetime] = None
+        self.supervisor_task: asyncio.Task | None = None
+        self.pump_tasks: list[asyncio.Task] = []
+    
+    @property
+    def url(self) -> str:
+        """Get the worker's server URL."""
+        return f"http://localhost:{self.port}"
+    
+    @property
+    def uptime_seconds(self) -> float | None:
+        """Get how long the current process has been running."""
+        if not self.is_running() or self.started_monotonic is None:
+            return None
+        return time.monotonic() - self.started_monotonic
+    
+    def is_running(self) -> bool:
+        """Check if the worker process is running."""
+        if self.process is None:
+            return False
+        return self.process.returncode is None
+
 
 class SocoCliService:
-    """Service to manage the soco-cli HTTP API server process."""
+    """Service to manage the pool of soco-cli HTTP API server processes.
+    
+    soco-cli cannot handle concurrent requests properly, so several server
+    processes are run on consecutive ports and each handles one request at a
+    time. Speakers are routed to a home worker by a stable hash of their name.
+    
+    Each worker is supervised: its output is drained into our logger (so the
+    pipes never fill up and block it), and if it exits on its own it is
+    restarted with exponential backoff.
+    """
     
     def __init__(self, settings: Settings):
         """Initialize the service.
@@ -23,21 +102,75 @@ class SocoCliService:
             settings: Application settings.
         """
         self._settings = settings
-        self._process: Optional[subprocess.Popen] = None
-        self._started_at: Optional[datetime] = None
+        use_uds = settings.soco_cli_transport == "uds"
+        if settings.soco_cli_transport not in ("tcp", "uds"):
+            logger.warning("Unknown soco-cli transport '%s', using tcp", settings.soco_cli_transport)
+        self._workers = [
+            SocoCliWorker(index, port, socket_path if use_uds else None)
+            for index, (port, socket_path) in enumerate(
+                zip(settings.soco_cli_ports, settings.soco_cli_socket_paths)
+            )
+        ]
+        self._busy_workers: set[int] = set()
+        self._worker_released = asyncio.Condition()
         self._start_lock = asyncio.Lock()
-        self._is_starting = False
+        self._client: httpx.AsyncClient | None = None
     
     @property
     def server_url(self) -> str:
-        """Get the soco-cli server URL."""
-        return self._settings.soco_cli_url
+        """Get the URL of the first soco-cli server worker."""
+        return self._workers[0].url
+    
+    @property
+    def worker_urls(self) -> list[str]:
+        """Get the URLs of all soco-cli server workers."""
+        return [worker.url for worker in self._workers]
+    
+    def worker_index_for(self, speaker: str) -> int:
+        """Get the home worker for a speaker.
+        
+        Uses a stable hash so a speaker maps to the same worker across restarts.
+        """
+        return zlib.crc32(speaker.lower().encode("utf-8")) % len(self._workers)
+    
+    @asynccontextmanager
+    async def checkout_worker(
+        self, preferred: int = 0, exclusive: bool = False
+    ) -> AsyncIterator[str]:
+        """Check out an idle soco-cli worker for one request.
+        
+        Each worker handles one request at a time.
+        
+        Args:
+            preferred: Index of the worker to use if it is idle.
+            exclusive: Wait for the preferred worker instead of using another.
+        
+        Yields:
+            The base URL of the checked out worker.
+        """
+        urls = self.worker_urls
+        async with self._worker_released:
+            while True:
+                idle = [i for i in range(len(urls)) if i not in self._busy_workers]
+                if preferred in idle:
+                    index = preferred
+                    break
+                if idle and not exclusive:
+                    index = idle[0]
+                    break
+                await self._worker_released.wait()
+            self._busy_workers.add(index)
+        
+        try:
+            yield urls[index]
+        finally:
+            async with self._worker_released:
+                self._busy_workers.discard(index)
+                self._worker_released.notify_all()
     
     def is_running(self) -> bool:
-        """Check if the soco-cli HTTP API server is running."""
-        if self._process is None:
-            return False
-        return self._process.poll() is None
+        """Check if every soco-cli HTTP API server worker is running."""
+        return all(worker.is_running() for worker in self._workers)
     
     def _get_executable_path(self) -> str:
         """Resolve the full path to the sonos-http-api-server executable."""
@@ -112,114 +245,350 @@ class SocoCliService:
     
     def get_status(self) -> dict:
         """Get the current server status."""
+        first = self._workers[0]
         return {
             "isRunning": self.is_running(),
-            "processId": self._process.pid if self._process else None,
+            "processId": first.process.pid if first.process else None,
             "serverUrl": self.server_url if self.is_running() else None,
-            "startedAt": self._started_at.isoformat() if self._started_at else None,
+            "startedAt": first.started_at.isoformat() if first.started_at else None,
+            "workers": [
+                {
+                    "port": worker.port,
+                    "socketPath": str(worker.socket_path) if worker.socket_path else None,
+                    "isRunning": worker.is_running(),
+                    "processId": worker.process.pid if worker.process else None,
+                    "startedAt": worker.started_at.isoformat() if worker.started_at else None,
+                }
+                for worker in self._workers
+            ],
         }
     
+    def get_health(self) -> dict:
+        """Get supervisor health: readiness, uptime and restarts of each worker."""
+        workers = [
+            {
+                "port": worker.port,
+                "isRunning": worker.is_running(),
+                "ready": worker.ready,
+                "processId": worker.process.pid if worker.process else None,
+                "uptimeSeconds": (
+                    round(worker.uptime_seconds, 1) if worker.uptime_seconds is not None else None
+                ),
+                "restarts": worker.restarts,
+                "consecutiveCrashes": worker.consecutive_crashes,
+                "lastExitCode": worker.last_exit_code,
+                "lastExitAt": worker.last_exit_at.isoformat() if worker.last_exit_at else None,
+            }
+            for worker in self._workers
+        ]
+        return {
+            "healthy": all(w["isRunning"] and w["ready"] for w in workers),
+            "restarts": sum(w["restarts"] for w in workers),
+            "workers": workers,
+        }
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the HTTP client shared by everything that talks to soco-cli.
+        
+        Connections to each worker are kept alive between requests. With the
+        UDS transport, each worker URL is mounted on a transport for its socket,
+        so callers build the same URLs either way.
+        """
+        if self._client is None or self._client.is_closed:
+            mounts = {
+                worker.url: httpx.AsyncHTTPTransport(uds=str(worker.socket_path))
+                for worker in self._workers
+                if worker.socket_path is not None
+            }
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=2 * len(self._workers)),
+                mounts=mounts,
+            )
+        return self._client
+    
+    def _get_interpreter(self, executable: str) -> str | None:
+        """Get the Python interpreter of a soco-cli script from its shebang line."""
+        try:
+            with open(executable, "rb") as f:
+                first_line = f.readline().decode("utf-8", errors="replace").strip()
+        except OSError:
+            return None
+        if not first_line.startswith("#!"):
+            return None
+        parts = first_line[2:].split()
+        if parts and Path(parts[0]).name == "env" and len(parts) > 1:
+            return self._resolve_from_path(parts[1])
+        return parts[0] if parts else None
+    
     async def start_server(self) -> bool:
-        """Start the soco-cli HTTP API server.
+        """Start any soco-cli HTTP API server workers that aren't running.
         
         Returns:
-            True if the server started successfully.
+            True if all workers started successfully.
         """
         # Quick check without lock
         if self.is_running():
             return True
         
+        # Concurrent callers wait here until the workers are up
         async with self._start_lock:
-            # Double-check after acquiring lock
-            if self.is_running() or self._is_starting:
-                logger.info("Soco-CLI server is already running or starting")
-                return True
+            executable = self._get_executable_path()
+            results = await asyncio.gather(*(
+                self._start_worker(worker, executable)
+                for worker in self._workers
+                if not worker.is_running()
+            ))
+            return all(results)
+    
+    async def _start_worker(self, worker: SocoCliWorker, executable: str) -> bool:
+        """Start one soco-cli server worker under supervision and wait for it to respond.
+        
+        Must be called with the start lock held.
+        
+        Args:
+            worker: The worker to start.
+            executable: Path to the sonos-http-api-server executable.
+        
+        Returns:
+            True if the worker started successfully.
+        """
+        if worker.is_running():
+            return True
+        
+        try:
+            # Use the same path resolution approach as MacroService for consistency
+            macros_path = self._settings.macros_file_path
             
-            self._is_starting = True
+            args = [
+                executable,
+                "--port", str(worker.port),
+                "--macros", str(macros_path),
+            ]
+            if worker.socket_path is not None:
+                interpreter = self._get_interpreter(executable)
+                if interpreter is None:
+                    logger.error(
+                        "Cannot serve soco-cli on a Unix socket: no Python interpreter found for %s",
+                        executable,
+                    )
+                    return False
+                worker.socket_path.parent.mkdir(parents=True, exist_ok=True)
+                worker.socket_path.unlink(missing_ok=True)
+                args[:1] = [interpreter, "-c", UDS_LAUNCHER, str(worker.socket_path)]
             
-            try:
-                # Use the same path resolution approach as MacroService for consistency
-                macros_path = self._settings.macros_file_path
-                
-                args = [
-                    self._get_executable_path(),
-                    "--port", str(self._settings.soco_cli_port),
-                    "--macros", str(macros_path),
-                ]
-                
-                logger.info("Using macros file: %s", macros_path)
-                
-                if self._settings.soco_cli_use_local_cache:
-                    args.append("--use-local-speaker-list")
-                
-                logger.info("Starting soco-cli server with args: %s", " ".join(args))
-                
-                self._process = subprocess.Popen(
-                    args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
-                self._started_at = datetime.now(timezone.utc)
-                
-                logger.info(
-                    "Started soco-cli HTTP API server on port %d with executable %s",
-                    self._settings.soco_cli_port,
-                    args[0],
-                )
-                
-                # Wait for the server to start and become responsive
-                # Speaker discovery can take several seconds
-                for i in range(10):
-                    await asyncio.sleep(1)
-                    if not self.is_running():
-                        logger.error("soco-cli process exited unexpectedly")
-                        return False
-                    
-                    # Try to connect
-                    import httpx
-                    try:
-                        async with httpx.AsyncClient() as client:
-                            response = await client.get(f"{self.server_url}/speakers", timeout=2)
-                            if response.status_code == 200:
-                                logger.info("soco-cli server is now responsive")
-                                return True
-                    except Exception:
-                        logger.debug("Waiting for soco-cli server... (%d/10)", i + 1)
-                
-                logger.warning("soco-cli server started but not yet responsive")
-                return True
-                
-            except Exception as e:
-                logger.error("Failed to start soco-cli server: %s", e)
+            logger.info("Using macros file: %s", macros_path)
+            
+            if self._settings.soco_cli_use_local_cache or (
+                self._settings.soco_cli_share_speaker_list and default_cache_path().exists()
+            ):
+                args.append("--use-local-speaker-list")
+            
+            logger.info(
+                "Starting soco-cli server with args: %s",
+                " ".join(arg for arg in args if arg != UDS_LAUNCHER),
+            )
+            
+            worker.stopping = False
+            worker.ready = False
+            worker.process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            worker.started_at = datetime.now(timezone.utc)
+            worker.started_monotonic = time.monotonic()
+            
+            # Drain both pipes so the child never blocks on a full buffer
+            worker.pump_tasks = [
+                asyncio.create_task(self._pump_output(worker, worker.process.stdout, logging.DEBUG)),
+                asyncio.create_task(self._pump_output(worker, worker.process.stderr, logging.INFO)),
+            ]
+            worker.supervisor_task = asyncio.create_task(self._supervise(worker, worker.process))
+            
+            logger.info(
+                "Started soco-cli HTTP API server on %s with executable %s (pid %d)",
+                worker.socket_path or f"port {worker.port}",
+                executable,
+                worker.process.pid,
+            )
+            
+            worker.ready = await self._wait_until_ready(worker)
+            if not worker.ready and worker.is_running():
+                logger.warning("soco-cli server on port %d started but not yet responsive", worker.port)
+            return worker.is_running()
+        
+        except Exception as e:
+            logger.error("Failed to start soco-cli server on port %d: %s", worker.port, e)
+            return False
+    
+    async def _wait_until_ready(self, worker: SocoCliWorker) -> bool:
+        """Probe a worker until it answers, with exponentially growing intervals.
+        
+        Speaker discovery can take several seconds, so probing starts fast
+        and backs off up to one second between attempts.
+        
+        Returns:
+            True if the worker responded before the startup timeout.
+        """
+        client = self.client
+        deadline = time.monotonic() + self._settings.soco_cli_startup_timeout_seconds
+        delay = 0.05
+        attempt = 0
+        while time.monotonic() < deadline:
+            if not worker.is_running():
+                logger.error("soco-cli process on port %d exited unexpectedly", worker.port)
                 return False
-            finally:
-                self._is_starting = False
+            
+            attempt += 1
+            try:
+                response = await client.get(f"{worker.url}/speakers", timeout=2.0)
+                if response.status_code == 200:
+                    logger.info(
+                        "soco-cli server on port %d is responsive after %.2fs (%d probes)",
+                        worker.port,
+                        time.monotonic() - (worker.started_monotonic or 0),
+                        attempt,
+                    )
+                    return True
+            except httpx.HTTPError:
+                logger.debug("Waiting for soco-cli server on port %d... (probe %d)", worker.port, attempt)
+            
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, 1.0)
+        return False
+    
+    async def _pump_output(
+        self, worker: SocoCliWorker, stream: asyncio.StreamReader | None, level: int
+    ) -> None:
+        """Forward a worker's output to our logger, line by line, until EOF."""
+        if stream is None:
+            return
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Line longer than the stream limit; drop what was buffered
+                continue
+            if not line:
+                return
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if text:
+                logger.log(level, "[soco-cli:%d] %s", worker.port, text)
+    
+    async def _supervise(self, worker: SocoCliWorker, process: asyncio.subprocess.Process) -> None:
+        """Wait for a worker process to exit and restart it unless it was stopped.
+        
+        Restarts back off exponentially while the worker keeps crashing soon
+        after starting; a worker that stayed up long enough starts over.
+        """
+        return_code = await process.wait()
+        if worker.stopping or worker.process is not process:
+            return
+        
+        uptime = time.monotonic() - (worker.started_monotonic or time.monotonic())
+        worker.ready = False
+        worker.last_exit_code = return_code
+        worker.last_exit_at = datetime.now(timezone.utc)
+        if uptime >= self._settings.soco_cli_stable_seconds:
+            worker.consecutive_crashes = 0
+        logger.warning(
+            "soco-cli server on port %d exited with code %s after %.1fs",
+            worker.port,
+            return_code,
+            uptime,
+        )
+        
+        while True:
+            worker.consecutive_crashes += 1
+            delay = min(
+                self._settings.soco_cli_restart_backoff_max_seconds,
+                self._settings.soco_cli_restart_backoff_seconds * 2 ** (worker.consecutive_crashes - 1),
+            )
+            logger.info("Restarting soco-cli server on port %d in %.1fs", worker.port, delay)
+            await asyncio.sleep(delay)
+            
+            async with self._start_lock:
+                # A request may have started it during the backoff, or it was stopped
+                if worker.stopping or worker.is_running():
+                    return
+                worker.restarts += 1
+                worker.process = None
+                await self._start_worker(worker, self._get_executable_path())
+                if worker.process is not None:
+                    # The new process has its own supervisor
+                    return
+    
+    async def reload_speaker_list(self) -> None:
+        """Restart running workers so they reload the shared speaker list.
+        
+        soco-cli only reads its local speaker list at startup (its /rediscover
+        runs a fresh discovery and overwrites the list), so workers are
+        restarted one at a time, each once it is idle, while the others keep
+        serving requests. Workers that aren't running read the list when they
+        next start.
+        """
+        for worker in self._workers:
+            if not worker.is_running():
+                continue
+            async with self.checkout_worker(worker.index, exclusive=True):
+                async with self._start_lock:
+                    logger.info("Restarting soco-cli server on port %d to reload speakers", worker.port)
+                    await self._stop_worker(worker)
+                    await self._start_worker(worker, self._get_executable_path())
     
-    def stop_server(self) -> bool:
-        """Stop the soco-cli HTTP API server.
+    async def stop_server(self) -> bool:
+        """Stop all soco-cli HTTP API server workers.
         
         Returns:
-            True if the server was stopped successfully.
+            True if every worker was stopped successfully.
         """
-        if self._process is None:
+        results = await asyncio.gather(*(self._stop_worker(worker) for worker in self._workers))
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        return all(results)
+    
+    async def _stop_worker(self, worker: SocoCliWorker) -> bool:
+        """Stop one soco-cli server worker and its supervisor.
+        
+        Returns:
+            True if the worker was stopped successfully.
+        """
+        worker.stopping = True
+        worker.ready = False
+        if worker.supervisor_task and worker.supervisor_task is not asyncio.current_task():
+            worker.supervisor_task.cancel()
+        
+        if worker.process is None:
             return True
         
         try:
-            self._process.terminate()
-            self._process.wait(timeout=5)
-            logger.info("Stopped soco-cli server")
-            return True
-        except subprocess.TimeoutExpired:
-            self._process.kill()
-            logger.warning("Killed soco-cli server after timeout")
+            if worker.process.returncode is None:
+                worker.process.terminate()
+                try:
+                    await asyncio.wait_for(worker.process.wait(), timeout=5)
+                    logger.info("Stopped soco-cli server on port %d", worker.port)
+                except asyncio.TimeoutError:
+                    worker.process.kill()
+                    await worker.process.wait()
+                    logger.warning("Killed soco-cli server on port %d after timeout", worker.port)
+            # The pumps finish at EOF once the process is gone
+            await asyncio.gather(*worker.pump_tasks, return_exceptions=True)
             return True
         except Exception as e:
-            logger.error("Failed to stop soco-cli server: %s", e)
+            logger.error("Failed to stop soco-cli server on port %d: %s", worker.port, e)
             return False
         finally:
-            self._process = None
-            self._started_at = None
+            worker.process = None
+            worker.started_at = None
+            worker.started_monotonic = None
+            worker.supervisor_task = None
+            worker.pump_tasks = []
+            if worker.socket_path is not None:
+                worker.socket_path.unlink(missing_ok=True)
     
     async def ensure_server_running(self) -> None:
         """Ensure the soco-cli server is running, starting it if necessary."""
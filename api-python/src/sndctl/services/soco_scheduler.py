@@ -0,0 +1,174 @@
+"""Priority-aware scheduler for blocking SoCo work.
+
+SoCo calls block on network I/O, so they run on worker threads. When every
+call shares one thread pool, a library crawl or discovery scan can delay a
+user's "pause" tap. This scheduler keeps a separate queue per class of work,
+always dispatches the highest class first, and caps how many threads the
+lower classes may occupy so there is always room for interactive commands.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import IntEnum
+from functools import partial
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WorkPriority(IntEnum):
+    """Classes of SoCo work, highest priority first."""
+    
+    INTERACTIVE = 0  # User commands (play, pause, volume, grouping...)
+    POLLING = 1  # Periodic state refreshes
+    BACKGROUND = 2  # Library crawls, discovery scans
+
+
+class SoCoScheduler:
+    """Runs blocking SoCo calls on a thread pool in priority order."""
+    
+    def __init__(self, max_workers: int, polling_workers: int, background_workers: int):
+        """Initialize the scheduler.
+        
+        Args:
+            max_workers: Total number of worker threads.
+            polling_workers: Maximum threads polling work may occupy.
+            background_workers: Maximum threads background work may occupy.
+        """
+        self._max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="soco",
+        )
+        self._limits = {
+            WorkPriority.INTERACTIVE: self._max_workers,
+            WorkPriority.POLLING: max(1, min(polling_workers, self._max_workers)),
+            WorkPriority.BACKGROUND: max(1, min(background_workers, self._max_workers)),
+        }
+        self._queues: dict[WorkPriority, deque] = {p: deque() for p in WorkPriority}
+        self._running = {p: 0 for p in WorkPriority}
+        self._completed = {p: 0 for p in WorkPriority}
+        self._max_wait_ms = {p: 0.0 for p in WorkPriority}
+        # Set while no interactive work is queued or running (created in the event loop)
+        self._interactive_idle: asyncio.Event | None = None
+    
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: WorkPriority = WorkPriority.INTERACTIVE,
+        **kwargs: Any,
+    ) -> Any:
+        """Run a blocking function on a worker thread.
+        
+        Drop-in replacement for asyncio.to_thread() with a priority class.
+        
+        Args:
+            func: The blocking function to call.
+            args: Positional arguments for the function.
+            priority: Class of work, used to order the queue.
+            kwargs: Keyword arguments for the function.
+        
+        Returns:
+            The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._get_interactive_idle()
+        self._queues[priority].append((waiter, partial(func, *args, **kwargs), time.monotonic()))
+        self._update_interactive_idle()
+        self._dispatch()
+        return await waiter
+    
+    async def checkpoint(self) -> None:
+        """Yield to interactive work.
+        
+        Background loops call this between pages so a user command never
+        queues behind a long-running crawl.
+        """
+        await asyncio.sleep(0)
+        while not self._get_interactive_idle().is_set():
+            await self._get_interactive_idle().wait()
+    
+    def get_stats(self) -> dict[str, Any]:
+        """Get queue statistics per class of work."""
+        return {
+            "max_workers": self._max_workers,
+            "classes": {
+                priority.name.lower(): {
+                    "limit": self._limits[priority],
+                    "queued": len(self._queues[priority]),
+                    "running": self._running[priority],
+                    "completed": self._completed[priority],
+                    "max_wait_ms": round(self._max_wait_ms[priority], 1),
+                }
+                for priority in WorkPriority
+            },
+        }
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads, dropping queued work."""
+        for queue in self._queues.values():
+            while queue:
+                waiter, _, _ = queue.popleft()
+                if not waiter.done():
+                    waiter.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _get_interactive_idle(self) -> asyncio.Event:
+        """Get the interactive-idle event, creating it in the running loop."""
+        if self._interactive_idle is None:
+            self._interactive_idle = asyncio.Event()
+            self._update_interactive_idle()
+        return self._interactive_idle
+    
+    def _update_interactive_idle(self) -> None:
+        """Set or clear the interactive-idle event."""
+        event = self._interactive_idle
+        if event is None:
+            return
+        if self._queues[WorkPriority.INTERACTIVE] or self._running[WorkPriority.INTERACTIVE]:
+            event.clear()
+        else:
+            event.set()
+    
+    def _dispatch(self) -> None:
+        """Start queued work, highest class first, while threads are free."""
+        for priority in WorkPriority:
+            queue = self._queues[priority]
+            while (
+                queue
+                and sum(self._running.values()) < self._max_workers
+                and self._running[priority] < self._limits[priority]
+            ):
+                waiter, call, queued_at = queue.popleft()
+                if waiter.done():
+                    # Caller was cancelled while queued
+                    continue
+                wait_ms = (time.monotonic() - queued_at) * 1000
+                self._max_wait_ms[priority] = max(self._max_wait_ms[priority], wait_ms)
+                self._running[priority] += 1
+                future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+                future.add_done_callback(partial(self._on_done, priority, waiter))
+    
+    def _on_done(self, priority: WorkPriority, waiter: asyncio.Future, future: Future) -> None:
+        """Hand a finished call's result to its caller and start the next one."""
+        self._running[priority] -= 1
+        self._completed[priority] += 1
+        
+        if not waiter.done():
+            if future.cancelled():
+                waiter.cancel()
+            elif future.exception() is not None:
+                waiter.set_exception(future.exception())
+            else:
+                waiter.set_result(future.result())
+        elif not future.cancelled():
+            # The caller gave up (cancelled crawl); don't leave its error unretrieved
+            future.exception()
+        
+        self._update_interactive_idle()
+        self._dispatch()
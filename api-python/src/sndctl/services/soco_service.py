@@ -11,11 +11,14 @@ import asyncio
 import logging
 import re
 import subprocess
+import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from functools import lru_cache
-from typing import Any
+from typing import Any, Awaitable, Callable
 
+import requests
 import soco
 from soco import SoCo
 from soco.exceptions import SoCoException
@@ -32,13 +35,61 @@ from ..models.library import (
     AlbumBrowseResult,
     TrackBrowseResult,
     GenreBrowseResult,
+    LibrarySearchItem,
+    LibrarySearchResult,
 )
+from .library_index import LibraryIndex
+from .soco_cli_cache import default_cache_path, write_speaker_cache
+from .soco_scheduler import SoCoScheduler, WorkPriority
 
 logger = logging.getLogger(__name__)
 
 
-# Type alias for library cache data
-LibraryCacheData = dict[str, list[dict]]
+# Library categories, each crawled by paging through its ContentDirectory container
+LIBRARY_CATEGORIES = ("artists", "albums", "tracks", "genres")
+
+# Browse result model of each library category
+LIBRARY_BROWSE_RESULTS = {
+    "artists": ArtistBrowseResult,
+    "albums": AlbumBrowseResult,
+    "tracks": TrackBrowseResult,
+    "genres": GenreBrowseResult,
+}
+
+# ContentDirectory containers behind each library category, matched by prefix in
+# order. The root containers ("A:" attributes, "S:" shares) cover every category.
+LIBRARY_CONTAINERS = (
+    ("A:ALBUMARTIST", ("artists",)),
+    ("A:ARTIST", ("artists",)),
+    ("A:ALBUM", ("albums",)),
+    ("A:TRACKS", ("tracks",)),
+    ("A:GENRE", ("genres",)),
+    ("A:", LIBRARY_CATEGORIES),
+    ("S:", LIBRARY_CATEGORIES),
+)
+
+
+def parse_container_update_ids(value: str) -> dict[str, str]:
+    """Parse a ContainerUpdateIDs event value ("A:,12,S:,4") into {container: update ID}."""
+    parts = [part.strip() for part in value.split(",")] if value else []
+    return {
+        container: update_id
+        for container, update_id in zip(parts[0::2], parts[1::2])
+        if container
+    }
+
+
+def library_categories_for_container(container: str) -> tuple[str, ...]:
+    """Get the library categories a ContentDirectory container feeds.
+    
+    Returns:
+        The categories, or an empty tuple for containers outside the music
+        library (Sonos playlists, favorites, queues).
+    """
+    for prefix, categories in LIBRARY_CONTAINERS:
+        if container.startswith(prefix):
+            return categories
+    return ()
 
 
 class SoCoService:
@@ -51,20 +102,50 @@ class SoCoService:
             settings: Application settings.
         """
         self._settings = settings
+        self._scheduler = SoCoScheduler(
+            max_workers=settings.soco_worker_threads,
+            polling_workers=settings.soco_polling_workers,
+            background_workers=settings.soco_background_workers,
+        )
         self._speakers_cache: dict[str, SoCo] = {}
         self._last_discovery: datetime | None = None
         self._discovery_lock = asyncio.Lock()
         
-        # Library cache for faster browsing
-        self._library_cache: LibraryCacheData = {
-            'artists': [],
-            'albums': [],
-            'tracks': [],
-            'genres': []
-        }
-        self._library_cache_time: datetime | None = None
+        # Registry last written to soco-cli's speaker list ({name: ip}), speaker
+        # details keyed by IP, and callbacks run after the list is rewritten
+        self._published_registry: dict[str, str] | None = None
+        self._speaker_details: dict[str, tuple[str, str, str]] = {}
+        self._registry_listeners: list[Callable[[], Awaitable[None]]] = []
+        self._registry_lock = asyncio.Lock()
+        self._registry_task: asyncio.Task | None = None
+        
+        # Transport state cache keyed by coordinator IP: (state, monotonic time)
+        self._transport_states: dict[str, tuple[str, float]] = {}
+        # Group coordinator cache keyed by speaker name: (coordinator, monotonic time)
+        self._coordinators: dict[str, tuple[SoCo, float]] = {}
+        
+        # Shared speaker state cache fed by the poller: name -> (info, monotonic time)
+        self._speaker_states: dict[str, tuple[dict[str, Any], float]] = {}
+        self._next_poll: dict[str, float] = {}
+        self._last_touched: dict[str, float] = {}
+        self._last_client_activity: float | None = None
+        self._poller_wakeup = asyncio.Event()
+        self._poller_task: asyncio.Task | None = None
+        
+        # Library index (SQLite) filled by the library crawl, for faster browsing;
+        # it persists in the data directory, so it is warm right after a restart
+        self._library_index = LibraryIndex(settings.library_index_path)
+        self._library_cache_time: datetime | None = self._load_library_cache_time()
+        self._library_write_lock = asyncio.Lock()
         self._library_cache_lock = asyncio.Lock()
         self._library_cache_task: asyncio.Task | None = None
+        
+        # ContentDirectory update IDs from events ({container: update ID}), the
+        # event subscription, and the refresh scheduled after a library change
+        self._container_update_ids: dict[str, str] = {}
+        self._share_index_in_progress = False
+        self._content_subscription: Any = None
+        self._library_update_task: asyncio.Task | None = None
     
     def _scan_ip_for_sonos(self, ip: str) -> tuple[str, str] | None:
         """Check if a Sonos speaker exists at the given IP.
@@ -138,7 +219,11 @@ class SoCoService:
             
             # Run discovery in thread pool (blocking I/O)
             try:
-                speakers = await asyncio.to_thread(soco.discover, timeout=5)
+                speakers = await self._scheduler.run(
+                    soco.discover, timeout=5, priority=WorkPriority.BACKGROUND
+                )
+                
+                self._invalidate_topology()
                 
                 if speakers:
                     # Filter to only visible speakers (excludes bonded subs, surrounds)
@@ -149,15 +234,19 @@ class SoCoService:
                     }
                     self._last_discovery = datetime.now(timezone.utc)
                     logger.info("Discovered %d visible speakers via multicast", len(self._speakers_cache))
+                    self._registry_updated()
                     return list(self._speakers_cache.keys())
                 else:
                     logger.warning("Multicast discovery found no speakers, trying IP scan")
                     # Fallback to IP scan (useful in Docker where multicast doesn't work)
-                    scanned = await asyncio.to_thread(self._discover_by_ip_scan)
+                    scanned = await self._scheduler.run(
+                        self._discover_by_ip_scan, priority=WorkPriority.BACKGROUND
+                    )
                     if scanned:
                         self._speakers_cache = scanned
                         self._last_discovery = datetime.now(timezone.utc)
                         logger.info("Discovered %d visible speakers via IP scan", len(self._speakers_cache))
+                        self._registry_updated()
                         return list(self._speakers_cache.keys())
                     return []
                     
@@ -176,15 +265,114 @@ class SoCoService:
         """
         return self._speakers_cache.get(name)
     
+    def get_known_speaker_names(self) -> list[str]:
+        """Get the names of the speakers in the registry, without rediscovering."""
+        return list(self._speakers_cache.keys())
+    
+    def add_registry_listener(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine function called after soco-cli's speaker list is rewritten."""
+        self._registry_listeners.append(callback)
+    
+    def _registry_updated(self) -> None:
+        """Publish the speaker registry to soco-cli if it has changed."""
+        if not self._settings.soco_cli_share_speaker_list:
+            return
+        registry = {name: device.ip_address for name, device in self._speakers_cache.items()}
+        if registry == self._published_registry:
+            return
+        if self._registry_task is None or self._registry_task.done():
+            self._registry_task = asyncio.create_task(self._publish_registry())
+    
+    async def _publish_registry(self) -> None:
+        """Write the speaker registry to soco-cli's local speaker list.
+        
+        Runs until the written list matches the registry, in case discovery
+        changes it again while the speaker details are being read.
+        """
+        async with self._registry_lock:
+            while True:
+                speakers = dict(self._speakers_cache)
+                registry = {name: device.ip_address for name, device in speakers.items()}
+                if not registry or registry == self._published_registry:
+                    return
+                try:
+                    await self._scheduler.run(
+                        self._write_speaker_list_sync, speakers, priority=WorkPriority.BACKGROUND
+                    )
+                except Exception as e:
+                    logger.warning("Could not write soco-cli speaker list: %s", e)
+                    return
+                self._published_registry = registry
+                logger.info("Wrote %d speakers to soco-cli's speaker list", len(registry))
+                
+                for callback in self._registry_listeners:
+                    try:
+                        await callback()
+                    except Exception as e:
+                        logger.warning("Speaker registry listener failed: %s", e)
+    
+    def _write_speaker_list_sync(self, speakers: dict[str, SoCo]) -> None:
+        """Write speakers to soco-cli's speaker list, reading missing details from the devices."""
+        devices = []
+        for name, device in speakers.items():
+            details = self._speaker_details.get(device.ip_address)
+            if details is None:
+                try:
+                    info = device.get_speaker_info()
+                    details = (
+                        device.household_id or "",
+                        info.get("model_name") or "",
+                        info.get("display_version") or "",
+                    )
+                    self._speaker_details[device.ip_address] = details
+                except Exception as e:
+                    logger.debug("Could not read details of %s: %s", name, e)
+                    details = ("", "", "")
+            household_id, model_name, display_version = details
+            devices.append((household_id, device.ip_address, name, True, model_name, display_version))
+        write_speaker_cache(default_cache_path(), devices)
+    
+    def resolve_speaker_name(self, name: str) -> str | None:
+        """Resolve a loosely typed speaker name the way soco-cli does.
+        
+        Tries an exact match, then a case-insensitive match, then a unique
+        case-insensitive partial match.
+        
+        Args:
+            name: Speaker name as typed (e.g. in a macro).
+        
+        Returns:
+            The registered speaker name, or None if not found or ambiguous.
+        """
+        if name in self._speakers_cache:
+            return name
+        
+        lowered = name.lower()
+        for speaker_name in self._speakers_cache:
+            if speaker_name.lower() == lowered:
+                return speaker_name
+        
+        partial = [n for n in self._speakers_cache if lowered in n.lower()]
+        return partial[0] if len(partial) == 1 else None
+    
     async def get_speaker_info(self, speaker_name: str) -> Speaker:
         """Get detailed information about a speaker.
         
+        Served from the shared state cache when the poller has a fresh
+        snapshot, otherwise read from the speaker.
+        
         Args:
             speaker_name: Name of the speaker.
             
         Returns:
             Speaker information.
         """
+        self._note_client_activity()
+        
+        cached = self._get_fresh_speaker_state(speaker_name)
+        if cached is not None:
+            return self._build_speaker(speaker_name, cached)
+        
         speaker = Speaker(name=speaker_name)
         device = self._get_speaker(speaker_name)
         
@@ -200,20 +388,9 @@ class SoCoService:
         
         try:
             # Run all blocking calls in thread pool
-            info = await asyncio.to_thread(self._get_speaker_info_sync, device)
-            speaker.volume = info.get("volume")
-            speaker.is_muted = info.get("is_muted", False)
-            speaker.playback_state = info.get("playback_state")
-            speaker.current_track = info.get("current_track")
-            speaker.ip_address = info.get("ip_address")
-            speaker.model = info.get("model")
-            speaker.is_coordinator = info.get("is_coordinator", False)
-            speaker.group_members = info.get("group_members", [])
-            
-            # Battery level for portable speakers
-            battery = info.get("battery_level")
-            if battery is not None:
-                speaker.battery_level = battery
+            info = await self._scheduler.run(self._get_speaker_info_sync, device)
+            self._store_speaker_state(speaker_name, info)
+            return self._build_speaker(speaker_name, info)
                 
         except SoCoException as e:
             error_str = str(e)
@@ -252,6 +429,7 @@ class SoCoService:
             transport_info = playback_device.get_current_transport_info()
             state = transport_info.get("current_transport_state", "UNKNOWN")
             info["playback_state"] = state
+            self._remember_transport_state(playback_device, state)
             
             # Get current track (from coordinator if grouped)
             track_info = playback_device.get_current_track_info()
@@ -287,6 +465,287 @@ class SoCoService:
         
         return info
     
+    @staticmethod
+    def _build_speaker(speaker_name: str, info: dict[str, Any]) -> Speaker:
+        """Build a Speaker model from a speaker info dict."""
+        speaker = Speaker(name=speaker_name)
+        speaker.volume = info.get("volume")
+        speaker.is_muted = info.get("is_muted", False)
+        speaker.playback_state = info.get("playback_state")
+        speaker.current_track = info.get("current_track")
+        speaker.ip_address = info.get("ip_address")
+        speaker.model = info.get("model")
+        speaker.is_coordinator = info.get("is_coordinator", False)
+        speaker.group_members = info.get("group_members", [])
+        
+        # Battery level for portable speakers
+        battery = info.get("battery_level")
+        if battery is not None:
+            speaker.battery_level = battery
+        
+        return speaker
+    
+    # ========================================
+    # Shared State Cache and Poller
+    # ========================================
+    
+    def _store_speaker_state(self, speaker_name: str, info: dict[str, Any]) -> None:
+        """Store a speaker info snapshot in the shared state cache."""
+        now = time.monotonic()
+        self._speaker_states[speaker_name] = (info, now)
+        self._next_poll[speaker_name] = now + self._get_poll_interval(speaker_name)
+    
+    def _get_poll_interval(self, speaker_name: str) -> float:
+        """Get how often a speaker should be polled.
+        
+        Fast while playing or recently touched by a user, slow when idle.
+        """
+        cached = self._speaker_states.get(speaker_name)
+        if cached and cached[0].get("playback_state") in ("PLAYING", "TRANSITIONING"):
+            return self._settings.state_poll_fast_seconds
+        touched = self._last_touched.get(speaker_name)
+        if touched and time.monotonic() - touched < self._settings.state_poll_recent_seconds:
+            return self._settings.state_poll_fast_seconds
+        return self._settings.state_poll_slow_seconds
+    
+    def note_external_change(self, speaker_name: str | None = None) -> None:
+        """Record a change made to a speaker outside this service (e.g. by soco-cli).
+        
+        Cached state of the speaker is dropped and it is polled fast for a while.
+        
+        Args:
+            speaker_name: Speaker name as typed, or None if any speaker may have changed.
+        """
+        if speaker_name is None:
+            self._transport_states.clear()
+            self._speaker_states.clear()
+            self._poller_wakeup.set()
+            return
+        name = self.resolve_speaker_name(speaker_name)
+        if name is not None:
+            self._touch(name)
+    
+    def _get_fresh_speaker_state(self, speaker_name: str) -> dict[str, Any] | None:
+        """Get a cached snapshot the poller is still keeping up to date.
+        
+        Returns:
+            The snapshot, or None if the poller isn't running or it is stale.
+        """
+        if not self._poller_task or self._poller_task.done():
+            return None
+        cached = self._speaker_states.get(speaker_name)
+        if not cached:
+            return None
+        max_age = self._get_poll_interval(speaker_name) + self._settings.state_poll_fast_seconds
+        if time.monotonic() - cached[1] > max_age:
+            return None
+        return cached[0]
+    
+    def _touch(self, speaker_name: str, **fields: Any) -> None:
+        """Record a user action on a speaker.
+        
+        Known new values are patched into the cached snapshot of the speaker
+        and its group members; otherwise the snapshot and the group's cached
+        transport state are dropped, since the action (a favorite, a queue
+        jump, a soco-cli command...) may have started or stopped playback.
+        The speaker is then polled fast for a while.
+        
+        Args:
+            speaker_name: Name of the speaker that was changed.
+            fields: Snapshot fields whose new value is known.
+        """
+        cached = self._speaker_states.get(speaker_name)
+        names = [speaker_name]
+        if cached and "volume" not in fields and "is_muted" not in fields:
+            # Transport changes apply to the whole group
+            names.extend(cached[0].get("group_members", []))
+        
+        if not fields:
+            coordinator = self._coordinators.get(speaker_name)
+            devices = [self._get_speaker(name) for name in names]
+            devices.append(coordinator[0] if coordinator else None)
+            for device in devices:
+                if device is not None:
+                    self._transport_states.pop(device.ip_address, None)
+        
+        for name in names:
+            entry = self._speaker_states.get(name)
+            if entry is None:
+                continue
+            if fields:
+                entry[0].update(fields)
+            else:
+                del self._speaker_states[name]
+        
+        now = time.monotonic()
+        self._last_touched[speaker_name] = now
+        self._next_poll[speaker_name] = min(
+            self._next_poll.get(speaker_name, now),
+            now + self._settings.state_poll_fast_seconds,
+        )
+        self._poller_wakeup.set()
+    
+    def _note_client_activity(self) -> None:
+        """Record that a client asked for speaker state, resuming the poller."""
+        idle = not self._has_active_clients()
+        self._last_client_activity = time.monotonic()
+        if idle:
+            self._poller_wakeup.set()
+    
+    def _has_active_clients(self) -> bool:
+        """Check whether any client asked for speaker state recently."""
+        if self._last_client_activity is None:
+            return False
+        idle_for = time.monotonic() - self._last_client_activity
+        return idle_for < self._settings.state_poll_client_timeout_seconds
+    
+    async def start_state_poller(self):
+        """Start the background speaker state poller.
+        
+        Call this from the application lifespan startup.
+        """
+        if not self._settings.state_poller_enabled:
+            logger.info("State poller disabled")
+            return
+        if self._poller_task and not self._poller_task.done():
+            return
+        
+        self._poller_task = asyncio.create_task(self._state_poller_loop())
+        logger.info(
+            "State poller started (%.0fs active / %.0fs idle)",
+            self._settings.state_poll_fast_seconds,
+            self._settings.state_poll_slow_seconds,
+        )
+    
+    async def stop_state_poller(self):
+        """Stop the background speaker state poller."""
+        if self._poller_task:
+            self._poller_task.cancel()
+            try:
+                await self._poller_task
+            except asyncio.CancelledError:
+                pass
+            self._poller_task = None
+            logger.info("State poller stopped")
+    
+    async def _state_poller_loop(self):
+        """Background loop that polls each speaker when it is due."""
+        while True:
+            try:
+                self._poller_wakeup.clear()
+                
+                if not self._has_active_clients():
+                    # Nobody is watching - sleep until a client asks for state
+                    logger.debug("State poller paused (no active clients)")
+                    await self._poller_wakeup.wait()
+                    continue
+                
+                now = time.monotonic()
+                due = [
+                    name for name in list(self._speakers_cache)
+                    if self._next_poll.get(name, 0) <= now
+                ]
+                if due:
+                    await asyncio.gather(*(self._poll_speaker(name) for name in due))
+                
+                next_due = min(
+                    (self._next_poll.get(name, 0) for name in self._speakers_cache),
+                    default=time.monotonic() + self._settings.state_poll_slow_seconds,
+                )
+                try:
+                    await asyncio.wait_for(
+                        self._poller_wakeup.wait(),
+                        timeout=max(0.1, next_due - time.monotonic()),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in state poller: %s", e)
+                await asyncio.sleep(self._settings.state_poll_slow_seconds)
+    
+    async def _poll_speaker(self, speaker_name: str) -> None:
+        """Poll one speaker and store the result in the shared state cache."""
+        device = self._get_speaker(speaker_name)
+        if not device:
+            return
+        try:
+            info = await self._scheduler.run(
+                self._get_speaker_info_sync, device, priority=WorkPriority.POLLING
+            )
+            self._store_speaker_state(speaker_name, info)
+        except Exception as e:
+            logger.debug("State poll failed for %s: %s", speaker_name, e)
+            # Let the next client request read it directly (and report the error)
+            self._speaker_states.pop(speaker_name, None)
+            self._next_poll[speaker_name] = time.monotonic() + self._settings.state_poll_slow_seconds
+    
+    def get_state_snapshot(self) -> dict[str, Any]:
+        """Get the shared speaker state cache and poller status.
+        
+        Returns:
+            Dict with poller status and the cached state of each speaker.
+        """
+        self._note_client_activity()
+        now = time.monotonic()
+        return {
+            "poller": {
+                "running": bool(self._poller_task and not self._poller_task.done()),
+                "active_clients": self._has_active_clients(),
+            },
+            "speakers": {
+                name: {
+                    **self._build_speaker(name, info).model_dump(by_alias=True),
+                    "ageSeconds": round(now - updated, 1),
+                    "pollIntervalSeconds": self._get_poll_interval(name),
+                }
+                for name, (info, updated) in self._speaker_states.items()
+            },
+        }
+    
+    async def prewarm_speakers(self, speaker_names: list[str]) -> list[str]:
+        """Warm up speakers ahead of a scheduled command.
+        
+        Resolves each speaker's group coordinator and reads its transport
+        state, so the first commands that follow find both in the cache.
+        
+        Args:
+            speaker_names: Speaker names (loosely typed, as in macros).
+        
+        Returns:
+            Names of the speakers that were warmed up.
+        """
+        names: list[str] = []
+        for name in speaker_names:
+            resolved = self.resolve_speaker_name(name)
+            if resolved and resolved not in names:
+                names.append(resolved)
+        
+        results = await asyncio.gather(
+            *(
+                self._scheduler.run(
+                    self._prewarm_speaker_sync, name, self._get_speaker(name),
+                    priority=WorkPriority.POLLING,
+                )
+                for name in names
+            ),
+            return_exceptions=True,
+        )
+        warmed = []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.debug("Pre-warm failed for %s: %s", name, result)
+            else:
+                warmed.append(name)
+        return warmed
+    
+    def _prewarm_speaker_sync(self, speaker_name: str, device: SoCo) -> None:
+        """Cache a speaker's coordinator and transport state (blocking)."""
+        coordinator = self._get_cached_playback_device(speaker_name, device)
+        self._read_transport_state(coordinator)
+    
     def _get_playback_device(self, device: SoCo) -> SoCo:
         """Get the playback device (coordinator) for transport operations.
         
@@ -306,6 +765,66 @@ class SoCoService:
             pass  # If we can't get group info, use the device itself
         return device
     
+    def _get_cached_playback_device(self, speaker_name: str, device: SoCo) -> SoCo:
+        """Get the playback device, reusing a recent coordinator lookup.
+        
+        Resolving the coordinator costs a ZoneGroupTopology read once SoCo's
+        own short-lived cache has expired, so remember it per speaker.
+        
+        Args:
+            speaker_name: Name of the speaker.
+            device: The SoCo device instance.
+            
+        Returns:
+            The coordinator if grouped, otherwise the device itself.
+        """
+        cached = self._coordinators.get(speaker_name)
+        if cached and time.monotonic() - cached[1] < self._settings.coordinator_cache_ttl_seconds:
+            return cached[0]
+        
+        coordinator = self._get_playback_device(device)
+        self._coordinators[speaker_name] = (coordinator, time.monotonic())
+        return coordinator
+    
+    def _invalidate_topology(self) -> None:
+        """Forget cached coordinators after the group topology changed."""
+        self._coordinators.clear()
+        # Group members and transport state in the snapshots are now stale
+        self._speaker_states.clear()
+    
+    def _remember_transport_state(self, coordinator: SoCo, state: str) -> None:
+        """Record the transport state of a coordinator in the state cache."""
+        self._transport_states[coordinator.ip_address] = (state, time.monotonic())
+    
+    def _get_cached_transport_state(self, coordinator: SoCo) -> str | None:
+        """Get the cached transport state of a coordinator.
+        
+        Returns:
+            The cached state, or None if unknown or older than the TTL.
+        """
+        cached = self._transport_states.get(coordinator.ip_address)
+        if cached and time.monotonic() - cached[1] < self._settings.transport_state_ttl_seconds:
+            return cached[0]
+        return None
+    
+    def _read_transport_state(self, coordinator: SoCo) -> str:
+        """Read the transport state from a coordinator and cache it (one SOAP call)."""
+        transport = coordinator.get_current_transport_info()
+        state = transport.get("current_transport_state", "UNKNOWN")
+        self._remember_transport_state(coordinator, state)
+        return state
+    
+    def _apply_toggle(self, coordinator: SoCo, state: str) -> str:
+        """Pause if playing, otherwise play, and cache the expected new state."""
+        if state == "PLAYING":
+            coordinator.pause()
+            new_state = "PAUSED_PLAYBACK"
+        else:
+            coordinator.play()
+            new_state = "PLAYING"
+        self._remember_transport_state(coordinator, new_state)
+        return new_state
+    
     async def get_playback_state(self, speaker_name: str) -> str:
         """Get just the playback state (fast, minimal UPnP calls).
         
@@ -321,17 +840,55 @@ class SoCoService:
         try:
             def get_state():
                 # For grouped speakers, get state from coordinator
-                if device.group and not device.is_coordinator:
-                    transport = device.group.coordinator.get_current_transport_info()
-                else:
-                    transport = device.get_current_transport_info()
-                return transport.get("current_transport_state", "UNKNOWN")
+                coordinator = self._get_cached_playback_device(speaker_name, device)
+                return self._read_transport_state(coordinator)
             
-            return await asyncio.to_thread(get_state)
+            return await self._scheduler.run(get_state)
         except Exception as e:
             logger.error("Get playback state failed for %s: %s", speaker_name, e)
             return "UNKNOWN"
     
+    async def toggle_playback(self, speaker_name: str) -> dict[str, Any]:
+        """Toggle play/pause using the cached transport state.
+        
+        The decision is taken from the transport state cache, which is then
+        updated optimistically, so a warm toggle costs a single SOAP call.
+        The state is only read from the speaker when the cache is stale, or
+        when the command is rejected because another controller changed it.
+        
+        Args:
+            speaker_name: Name of the speaker.
+            
+        Returns:
+            Dict with success flag, the new state and whether a read was needed.
+        """
+        device = self._get_speaker(speaker_name)
+        if not device:
+            return {"success": False, "state": "UNKNOWN", "reconciled": False}
+        
+        def _toggle() -> tuple[str, bool]:
+            coordinator = self._get_cached_playback_device(speaker_name, device)
+            state = self._get_cached_transport_state(coordinator)
+            if state is None:
+                return self._apply_toggle(coordinator, self._read_transport_state(coordinator)), True
+            try:
+                return self._apply_toggle(coordinator, state), False
+            except SoCoException as e:
+                # Cached state or coordinator was wrong - reconcile and retry once
+                logger.debug("Optimistic toggle rejected for %s (%s), reconciling", speaker_name, e)
+                self._coordinators.pop(speaker_name, None)
+                coordinator = self._get_cached_playback_device(speaker_name, device)
+                return self._apply_toggle(coordinator, self._read_transport_state(coordinator)), True
+        
+        try:
+            state, reconciled = await self._scheduler.run(_toggle)
+            self._touch(speaker_name, playback_state=state)
+            return {"success": True, "state": state, "reconciled": reconciled}
+        except Exception as e:
+            logger.error("Play/pause toggle failed for %s: %s", speaker_name, e)
+            self._coordinators.pop(speaker_name, None)
+            return {"success": False, "state": "UNKNOWN", "reconciled": True}
+    
     async def play(self, speaker_name: str) -> bool:
         """Start playback on a speaker.
         
@@ -342,12 +899,15 @@ class SoCoService:
             return False
         try:
             def _play():
-                playback_device = self._get_playback_device(device)
+                playback_device = self._get_cached_playback_device(speaker_name, device)
                 playback_device.play()
-            await asyncio.to_thread(_play)
+                self._remember_transport_state(playback_device, "PLAYING")
+            await self._scheduler.run(_play)
+            self._touch(speaker_name, playback_state="PLAYING")
             return True
         except Exception as e:
             logger.error("Play failed for %s: %s", speaker_name, e)
+            self._coordinators.pop(speaker_name, None)
             return False
     
     async def pause(self, speaker_name: str) -> bool:
@@ -360,12 +920,15 @@ class SoCoService:
             return False
         try:
             def _pause():
-                playback_device = self._get_playback_device(device)
+                playback_device = self._get_cached_playback_device(speaker_name, device)
                 playback_device.pause()
-            await asyncio.to_thread(_pause)
+                self._remember_transport_state(playback_device, "PAUSED_PLAYBACK")
+            await self._scheduler.run(_pause)
+            self._touch(speaker_name, playback_state="PAUSED_PLAYBACK")
             return True
         except Exception as e:
             logger.error("Pause failed for %s: %s", speaker_name, e)
+            self._coordinators.pop(speaker_name, None)
             return False
     
     async def stop(self, speaker_name: str) -> bool:
@@ -378,9 +941,11 @@ class SoCoService:
             return False
         try:
             def _stop():
-                playback_device = self._get_playback_device(device)
+                playback_device = self._get_cached_playback_device(speaker_name, device)
                 playback_device.stop()
-            await asyncio.to_thread(_stop)
+                self._remember_transport_state(playback_device, "STOPPED")
+            await self._scheduler.run(_stop)
+            self._touch(speaker_name, playback_state="STOPPED")
             return True
         except Exception as e:
             logger.error("Stop failed for %s: %s", speaker_name, e)
@@ -398,7 +963,8 @@ class SoCoService:
             def _next():
                 playback_device = self._get_playback_device(device)
                 playback_device.next()
-            await asyncio.to_thread(_next)
+            await self._scheduler.run(_next)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Next track failed for %s: %s", speaker_name, e)
@@ -416,7 +982,8 @@ class SoCoService:
             def _previous():
                 playback_device = self._get_playback_device(device)
                 playback_device.previous()
-            await asyncio.to_thread(_previous)
+            await self._scheduler.run(_previous)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Previous track failed for %s: %s", speaker_name, e)
@@ -429,7 +996,8 @@ class SoCoService:
             return False
         try:
             volume = max(0, min(100, volume))
-            await asyncio.to_thread(setattr, device, "volume", volume)
+            await self._scheduler.run(setattr, device, "volume", volume)
+            self._touch(speaker_name, volume=volume)
             return True
         except Exception as e:
             logger.error("Set volume failed for %s: %s", speaker_name, e)
@@ -448,7 +1016,7 @@ class SoCoService:
         if not device:
             return None
         try:
-            return await asyncio.to_thread(lambda: device.volume)
+            return await self._scheduler.run(lambda: device.volume)
         except Exception as e:
             logger.error("Get volume failed for %s: %s", speaker_name, e)
             return None
@@ -466,7 +1034,7 @@ class SoCoService:
         if not device:
             return None
         try:
-            return await asyncio.to_thread(lambda: device.mute)
+            return await self._scheduler.run(lambda: device.mute)
         except Exception as e:
             logger.error("Get mute failed for %s: %s", speaker_name, e)
             return None
@@ -496,7 +1064,7 @@ class SoCoService:
                     return f"{artist} - {title}"
                 return title or None
             
-            return await asyncio.to_thread(get_track)
+            return await self._scheduler.run(get_track)
         except Exception as e:
             logger.error("Get current track failed for %s: %s", speaker_name, e)
             return None
@@ -507,7 +1075,8 @@ class SoCoService:
         if not device:
             return False
         try:
-            await asyncio.to_thread(setattr, device, "mute", mute)
+            await self._scheduler.run(setattr, device, "mute", mute)
+            self._touch(speaker_name, is_muted=mute)
             return True
         except Exception as e:
             logger.error("Set mute failed for %s: %s", speaker_name, e)
@@ -543,19 +1112,19 @@ class SoCoService:
         device = self._get_speaker(speaker_name)
         if not device:
             # Try to get a coordinator (needed for favorites)
-            device = await asyncio.to_thread(self._get_any_coordinator)
+            device = await self._scheduler.run(self._get_any_coordinator)
             if not device:
                 return []
         
         # Need to use the group coordinator
         try:
-            coordinator = await asyncio.to_thread(lambda: device.group.coordinator)
+            coordinator = await self._scheduler.run(lambda: device.group.coordinator)
             device = coordinator
         except Exception:
             pass  # Use original device if group.coordinator fails
         
         try:
-            favorites = await asyncio.to_thread(self._get_favorites_sync, device)
+            favorites = await self._scheduler.run(self._get_favorites_sync, device)
             return favorites
         except Exception as e:
             logger.error("Failed to get favorites: %s", e)
@@ -594,9 +1163,10 @@ class SoCoService:
             return False
         
         try:
-            result = await asyncio.to_thread(
+            result = await self._scheduler.run(
                 self._play_favorite_sync, device, favorite_name
             )
+            self._touch(speaker_name)
             return result
         except Exception as e:
             logger.error("Failed to play favorite %s: %s", favorite_name, e)
@@ -806,7 +1376,8 @@ class SoCoService:
                 playback_device.add_to_queue(fav)
                 playback_device.play_from_queue(0)
             
-            await asyncio.to_thread(_play_favorite_by_number)
+            await self._scheduler.run(_play_favorite_by_number)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to play favorite #%d: %s", number, e)
@@ -831,7 +1402,7 @@ class SoCoService:
             def _get_queue():
                 playback_device = self._get_playback_device(device)
                 return self._get_queue_sync(playback_device)
-            queue = await asyncio.to_thread(_get_queue)
+            queue = await self._scheduler.run(_get_queue)
             return queue
         except Exception as e:
             logger.error("Failed to get queue for %s: %s", speaker_name, e)
@@ -871,7 +1442,7 @@ class SoCoService:
         try:
             # Get any speaker to query groups
             device = next(iter(self._speakers_cache.values()))
-            groups = await asyncio.to_thread(self._get_groups_sync, device)
+            groups = await self._scheduler.run(self._get_groups_sync, device)
             return groups
         except Exception as e:
             logger.error("Failed to get groups: %s", e)
@@ -929,7 +1500,8 @@ class SoCoService:
             return False
         
         try:
-            await asyncio.to_thread(member_device.join, coord_device)
+            await self._scheduler.run(member_device.join, coord_device)
+            self._invalidate_topology()
             return True
         except Exception as e:
             logger.error("Failed to group %s with %s: %s", member, coordinator, e)
@@ -949,58 +1521,345 @@ class SoCoService:
             return False
         
         try:
-            await asyncio.to_thread(device.unjoin)
+            await self._scheduler.run(device.unjoin)
+            self._invalidate_topology()
             return True
         except Exception as e:
             logger.error("Failed to ungroup %s: %s", speaker_name, e)
             return False
     
-    async def party_mode(self, speaker_name: str) -> bool:
+    async def party_mode(self, speaker_name: str, rollback: bool = False) -> dict[str, Any]:
         """Group all speakers together with the given speaker as coordinator.
         
+        Joins are issued concurrently and the result is verified with a
+        single topology read.
+        
         Args:
             speaker_name: Name of the coordinator speaker.
+            rollback: Restore the previous grouping if verification fails.
             
         Returns:
-            True if successful.
+            Dict with success flag and per-speaker outcomes.
         """
         device = self._get_speaker(speaker_name)
         if not device:
-            return False
+            return {"success": False, "error": "Speaker not found", "speakers": {}}
         
-        try:
-            await asyncio.to_thread(device.partymode)
-            return True
-        except Exception as e:
-            logger.error("Failed to activate party mode on %s: %s", speaker_name, e)
-            return False
+        return await self._apply_topology(
+            device,
+            lambda topology: {name: speaker_name for name in topology},
+            rollback=rollback,
+        )
     
-    async def ungroup_all(self, speaker_name: str) -> bool:
+    async def ungroup_all(self, speaker_name: str, rollback: bool = False) -> dict[str, Any]:
         """Ungroup all speakers.
         
+        Unjoins are issued concurrently and the result is verified with a
+        single topology read.
+        
         Args:
-            speaker_name: Any speaker name (used to get zone list).
+            speaker_name: Any speaker name (used to read the topology).
+            rollback: Restore the previous grouping if verification fails.
             
         Returns:
-            True if successful.
+            Dict with success flag and per-speaker outcomes.
         """
         device = self._get_speaker(speaker_name)
         if not device:
-            return False
+            return {"success": False, "error": "Speaker not found", "speakers": {}}
+        
+        return await self._apply_topology(
+            device,
+            lambda topology: {name: name for name in topology},
+            rollback=rollback,
+        )
+    
+    # ========================================
+    # Group Orchestration
+    # ========================================
+    
+    def _read_topology_sync(self, device: SoCo) -> tuple[dict[str, str], dict[str, SoCo]]:
+        """Read the group topology with a single ZoneGroupTopology call.
+        
+        Args:
+            device: Any speaker in the household.
+            
+        Returns:
+            Tuple of (visible speaker name -> coordinator name,
+            visible speaker name -> SoCo instance).
+        """
+        device.zone_group_state.clear_cache()
+        topology: dict[str, str] = {}
+        zones: dict[str, SoCo] = {}
+        for group in device.all_groups:
+            coordinator_name = group.coordinator.player_name
+            for member in group.members:
+                # Skip bonded subs/surrounds, they follow their primary
+                if member.is_visible:
+                    topology[member.player_name] = coordinator_name
+                    zones[member.player_name] = member
+        return topology, zones
+    
+    async def _run_group_operations(
+        self, operations: dict[str, Callable[[], None]]
+    ) -> dict[str, dict[str, Any]]:
+        """Run blocking join/unjoin calls concurrently with bounded parallelism.
+        
+        Args:
+            operations: Mapping of speaker name to the SoCo call to make.
+            
+        Returns:
+            Mapping of speaker name to its outcome.
+        """
+        semaphore = asyncio.Semaphore(max(1, self._settings.group_operation_concurrency))
+        
+        async def _run(name: str, operation: Callable[[], None]) -> tuple[str, dict[str, Any]]:
+            async with semaphore:
+                started = time.monotonic()
+                outcome: dict[str, Any]
+                try:
+                    await self._scheduler.run(operation)
+                    outcome = {"status": "ok"}
+                except requests.exceptions.Timeout as e:
+                    logger.warning("Group operation timed out for %s: %s", name, e)
+                    outcome = {"status": "timeout", "error": str(e)}
+                except Exception as e:
+                    logger.warning("Group operation failed for %s: %s", name, e)
+                    outcome = {"status": "failed", "error": str(e)}
+                outcome["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+                return name, outcome
+        
+        results = await asyncio.gather(*(_run(n, op) for n, op in operations.items()))
+        return dict(results)
+    
+    async def _converge_topology(
+        self,
+        current: dict[str, str],
+        target: dict[str, str],
+        zones: dict[str, SoCo],
+    ) -> dict[str, dict[str, Any]]:
+        """Issue the join/unjoin calls needed to move from one topology to another.
+        
+        Speakers that must become coordinators are made standalone first,
+        then every other speaker is joined or unjoined concurrently.
+        
+        Args:
+            current: Current speaker -> coordinator mapping.
+            target: Desired speaker -> coordinator mapping.
+            zones: Speaker name -> SoCo instance.
+            
+        Returns:
+            Mapping of speaker name to its outcome.
+        """
+        timeout = self._settings.group_operation_timeout_seconds
+        outcomes: dict[str, dict[str, Any]] = {
+            name: {"status": "unchanged"}
+            for name, coordinator in target.items()
+            if current.get(name) == coordinator
+        }
+        pending = {
+            name: coordinator
+            for name, coordinator in target.items()
+            if name not in outcomes and name in zones
+        }
+        for name in target:
+            if name not in zones:
+                outcomes[name] = {"status": "failed", "error": "Speaker not in topology"}
+        
+        # Phase 1: new coordinators leave their current group
+        leaders = {
+            name: (lambda d=zones[name]: d.unjoin(timeout=timeout))
+            for name, coordinator in pending.items()
+            if name == coordinator
+            and any(c == name and n != name for n, c in pending.items())
+        }
+        if leaders:
+            outcomes.update(await self._run_group_operations(leaders))
+        
+        # Phase 2: everyone else joins or unjoins concurrently
+        operations: dict[str, Callable[[], None]] = {}
+        for name, coordinator in pending.items():
+            if name in leaders:
+                continue
+            if coordinator == name:
+                operations[name] = lambda d=zones[name]: d.unjoin(timeout=timeout)
+            elif coordinator in zones:
+                operations[name] = lambda d=zones[name], c=zones[coordinator]: d.join(c, timeout=timeout)
+            else:
+                outcomes[name] = {"status": "failed", "error": f"Coordinator '{coordinator}' not found"}
+        if operations:
+            outcomes.update(await self._run_group_operations(operations))
+        
+        return outcomes
+    
+    async def _apply_topology(
+        self,
+        device: SoCo,
+        build_target: Callable[[dict[str, str]], dict[str, str]],
+        rollback: bool = False,
+    ) -> dict[str, Any]:
+        """Move the household to a new group topology and verify the result.
         
+        Args:
+            device: Any speaker in the household (used for topology reads).
+            build_target: Builds the desired speaker -> coordinator mapping
+                from the current one.
+            rollback: Restore the previous topology if verification fails.
+            
+        Returns:
+            Dict with success flag, per-speaker outcomes, any speakers that
+            did not reach their target and whether a rollback was performed.
+        """
+        started = time.monotonic()
         try:
-            def _ungroup_all():
-                for zone in device.all_zones:
-                    if zone.is_visible and not zone.is_coordinator:
-                        try:
-                            zone.unjoin()
-                        except Exception:
-                            pass
-            await asyncio.to_thread(_ungroup_all)
-            return True
+            before, zones = await self._scheduler.run(self._read_topology_sync, device)
+            target = build_target(before)
+            outcomes = await self._converge_topology(before, target, zones)
+            after, _ = await self._scheduler.run(self._read_topology_sync, device)
         except Exception as e:
-            logger.error("Failed to ungroup all: %s", e)
-            return False
+            logger.error("Group change failed: %s", e)
+            return {"success": False, "error": str(e), "speakers": {}}
+        finally:
+            self._invalidate_topology()
+        
+        mismatched = sorted(name for name, c in target.items() if after.get(name) != c)
+        result: dict[str, Any] = {
+            "success": not mismatched,
+            "speakers": outcomes,
+            "mismatched": mismatched,
+            "rolled_back": False,
+        }
+        
+        if mismatched and rollback:
+            logger.warning("Group change incomplete (%s), rolling back", ", ".join(mismatched))
+            try:
+                await self._converge_topology(after, before, zones)
+                restored, _ = await self._scheduler.run(self._read_topology_sync, device)
+                result["rolled_back"] = all(restored.get(n) == c for n, c in before.items())
+            except Exception as e:
+                logger.error("Group rollback failed: %s", e)
+            finally:
+                self._invalidate_topology()
+        
+        result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return result
+    
+    def _handoff_sync(self, device: SoCo, new_coordinator: SoCo, is_coordinator: bool) -> str:
+        """Remove the source speaker from its group, handing over coordination.
+        
+        Returns:
+            'delegate' if coordination was delegated in one call, else 'unjoin'.
+        """
+        timeout = self._settings.group_operation_timeout_seconds
+        if is_coordinator:
+            try:
+                device.avTransport.DelegateGroupCoordinationTo(
+                    [
+                        ("InstanceID", 0),
+                        ("NewCoordinator", new_coordinator.uid),
+                        ("RejoinGroup", 0),
+                    ],
+                    timeout=timeout,
+                )
+                device.zone_group_state.clear_cache()
+                return "delegate"
+            except SoCoException as e:
+                # Older firmware - leaving the group still hands it over
+                logger.info("Coordination delegation failed (%s), unjoining instead", e)
+        device.unjoin(timeout=timeout)
+        return "unjoin"
+    
+    async def transfer(self, source: str, targets: list[str]) -> dict[str, Any]:
+        """Transfer playback from one speaker to one or more others.
+        
+        The topology is read once, all targets join the source's group
+        concurrently, and the source then hands the group over. When the
+        source is the coordinator, coordination is delegated to the first
+        target so playback continues without a gap.
+        
+        Args:
+            source: Name of the speaker that is currently playing.
+            targets: Names of the speakers that should take over playback.
+            
+        Returns:
+            Dict with success flag, per-speaker outcomes and step timings.
+        """
+        started = time.monotonic()
+        steps: list[dict[str, Any]] = []
+        targets = [t for t in dict.fromkeys(targets) if t != source]
+        
+        def _step(name: str, step_started: float, **extra: Any) -> None:
+            steps.append({
+                "step": name,
+                "elapsed_ms": round((time.monotonic() - step_started) * 1000, 1),
+                **extra,
+            })
+        
+        def _result(success: bool, **extra: Any) -> dict[str, Any]:
+            return {
+                "success": success,
+                "source": source,
+                "targets": targets,
+                "steps": steps,
+                "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+                **extra,
+            }
+        
+        device = self._get_speaker(source)
+        if not device:
+            return _result(False, error="Speaker not found")
+        if not targets:
+            return _result(False, error="No target speakers")
+        
+        timeout = self._settings.group_operation_timeout_seconds
+        try:
+            # Step 1: resolve the topology once
+            step_started = time.monotonic()
+            topology, zones = await self._scheduler.run(self._read_topology_sync, device)
+            _step("resolve", step_started)
+            
+            coordinator = topology.get(source)
+            if coordinator is None:
+                return _result(False, error=f"Speaker '{source}' not in topology")
+            missing = [t for t in targets if t not in zones]
+            if missing:
+                return _result(False, error=f"Speakers not found: {', '.join(missing)}")
+            
+            # Step 2: join all targets to the playing group concurrently
+            step_started = time.monotonic()
+            joins = {
+                t: (lambda d=zones[t], c=zones[coordinator]: d.join(c, timeout=timeout))
+                for t in targets
+                if topology.get(t) != coordinator
+            }
+            outcomes = {t: {"status": "unchanged"} for t in targets if t not in joins}
+            outcomes.update(await self._run_group_operations(joins))
+            _step("join", step_started, speakers=len(joins))
+            
+            joined = [t for t in targets if outcomes[t]["status"] in ("ok", "unchanged")]
+            if not joined:
+                return _result(False, error="No target joined the group", speakers=outcomes)
+            
+            # Step 3: hand the group over and drop the source
+            step_started = time.monotonic()
+            new_coordinator = joined[0] if source == coordinator else coordinator
+            method = await self._scheduler.run(
+                self._handoff_sync, device, zones[new_coordinator], source == coordinator
+            )
+            _step("handoff", step_started, method=method)
+            
+            # The new coordinator carries on in the source's transport state
+            cached_state = self._get_cached_transport_state(zones[coordinator])
+            if cached_state:
+                self._remember_transport_state(zones[new_coordinator], cached_state)
+            
+            return _result(True, coordinator=new_coordinator, method=method, speakers=outcomes)
+            
+        except Exception as e:
+            logger.error("Failed to transfer playback from %s: %s", source, e)
+            return _result(False, error=str(e))
+        finally:
+            self._invalidate_topology()
     
     async def set_group_volume(self, speaker_name: str, volume: int) -> bool:
         """Set volume for all speakers in a group.
@@ -1017,7 +1876,8 @@ class SoCoService:
             return False
         
         try:
-            await asyncio.to_thread(setattr, device, "group_volume", volume)
+            await self._scheduler.run(setattr, device, "group_volume", volume)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to set group volume on %s: %s", speaker_name, e)
@@ -1042,7 +1902,7 @@ class SoCoService:
             def _get_shuffle():
                 playback_device = self._get_playback_device(device)
                 return playback_device.shuffle
-            shuffle = await asyncio.to_thread(_get_shuffle)
+            shuffle = await self._scheduler.run(_get_shuffle)
             return shuffle
         except Exception as e:
             logger.error("Failed to get shuffle for %s: %s", speaker_name, e)
@@ -1068,7 +1928,7 @@ class SoCoService:
             def _set_shuffle():
                 playback_device = self._get_playback_device(device)
                 playback_device.shuffle = enabled
-            await asyncio.to_thread(_set_shuffle)
+            await self._scheduler.run(_set_shuffle)
             return True
         except Exception as e:
             logger.error("Failed to set shuffle for %s: %s", speaker_name, e)
@@ -1101,7 +1961,7 @@ class SoCoService:
                 elif repeat == "ONE":
                     return "one"
                 return "off"
-            return await asyncio.to_thread(_get_repeat)
+            return await self._scheduler.run(_get_repeat)
         except Exception as e:
             logger.error("Failed to get repeat for %s: %s", speaker_name, e)
             return None
@@ -1135,7 +1995,7 @@ class SoCoService:
                     playback_device.repeat = "ONE"
                 else:
                     playback_device.repeat = False
-            await asyncio.to_thread(_set_repeat)
+            await self._scheduler.run(_set_repeat)
             return True
         except Exception as e:
             logger.error("Failed to set repeat for %s: %s", speaker_name, e)
@@ -1160,7 +2020,7 @@ class SoCoService:
             def _get_crossfade():
                 playback_device = self._get_playback_device(device)
                 return playback_device.cross_fade
-            crossfade = await asyncio.to_thread(_get_crossfade)
+            crossfade = await self._scheduler.run(_get_crossfade)
             return crossfade
         except Exception as e:
             logger.error("Failed to get crossfade for %s: %s", speaker_name, e)
@@ -1186,7 +2046,7 @@ class SoCoService:
             def _set_crossfade():
                 playback_device = self._get_playback_device(device)
                 playback_device.cross_fade = enabled
-            await asyncio.to_thread(_set_crossfade)
+            await self._scheduler.run(_set_crossfade)
             return True
         except Exception as e:
             logger.error("Failed to set crossfade for %s: %s", speaker_name, e)
@@ -1211,7 +2071,7 @@ class SoCoService:
             def _get_sleep_timer():
                 playback_device = self._get_playback_device(device)
                 return playback_device.get_sleep_timer()
-            timer = await asyncio.to_thread(_get_sleep_timer)
+            timer = await self._scheduler.run(_get_sleep_timer)
             return timer or 0
         except Exception as e:
             logger.error("Failed to get sleep timer for %s: %s", speaker_name, e)
@@ -1237,7 +2097,7 @@ class SoCoService:
             def _set_sleep_timer():
                 playback_device = self._get_playback_device(device)
                 playback_device.set_sleep_timer(seconds)
-            await asyncio.to_thread(_set_sleep_timer)
+            await self._scheduler.run(_set_sleep_timer)
             return True
         except Exception as e:
             logger.error("Failed to set sleep timer for %s: %s", speaker_name, e)
@@ -1263,7 +2123,8 @@ class SoCoService:
             def _seek():
                 playback_device = self._get_playback_device(device)
                 playback_device.seek(position)
-            await asyncio.to_thread(_seek)
+            await self._scheduler.run(_seek)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to seek on %s: %s", speaker_name, e)
@@ -1292,7 +2153,7 @@ class SoCoService:
             def _get_queue_length():
                 playback_device = self._get_playback_device(device)
                 return playback_device.queue_size
-            length = await asyncio.to_thread(_get_queue_length)
+            length = await self._scheduler.run(_get_queue_length)
             return length or 0
         except Exception as e:
             logger.error("Failed to get queue length for %s: %s", speaker_name, e)
@@ -1318,7 +2179,7 @@ class SoCoService:
                 playback_device = self._get_playback_device(device)
                 track_info = playback_device.get_current_track_info()
                 return int(track_info.get("playlist_position", 0))
-            position = await asyncio.to_thread(_get_queue_position)
+            position = await self._scheduler.run(_get_queue_position)
             return position
         except Exception as e:
             logger.error("Failed to get queue position for %s: %s", speaker_name, e)
@@ -1344,7 +2205,8 @@ class SoCoService:
             def _play_from_queue():
                 playback_device = self._get_playback_device(device)
                 playback_device.play_from_queue(position)
-            await asyncio.to_thread(_play_from_queue)
+            await self._scheduler.run(_play_from_queue)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to play from queue on %s: %s", speaker_name, e)
@@ -1369,7 +2231,8 @@ class SoCoService:
             def _clear_queue():
                 playback_device = self._get_playback_device(device)
                 playback_device.clear_queue()
-            await asyncio.to_thread(_clear_queue)
+            await self._scheduler.run(_clear_queue)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to clear queue on %s: %s", speaker_name, e)
@@ -1395,7 +2258,8 @@ class SoCoService:
             def _remove_from_queue():
                 playback_device = self._get_playback_device(device)
                 playback_device.remove_from_queue(position)
-            await asyncio.to_thread(_remove_from_queue)
+            await self._scheduler.run(_remove_from_queue)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to remove from queue on %s: %s", speaker_name, e)
@@ -1421,7 +2285,7 @@ class SoCoService:
             def _add_uri_to_queue():
                 playback_device = self._get_playback_device(device)
                 playback_device.add_uri_to_queue(uri)
-            await asyncio.to_thread(_add_uri_to_queue)
+            await self._scheduler.run(_add_uri_to_queue)
             return True
         except Exception as e:
             logger.error("Failed to add to queue on %s: %s", speaker_name, e)
@@ -1452,7 +2316,7 @@ class SoCoService:
                         return playback_device.add_to_queue(fav)
                 logger.error("Favorite '%s' not found", favorite_name)
                 return None
-            result = await asyncio.to_thread(_add_favorite_to_queue)
+            result = await self._scheduler.run(_add_favorite_to_queue)
             return result
         except Exception as e:
             logger.error("Failed to add favorite to queue on %s: %s", speaker_name, e)
@@ -1483,7 +2347,7 @@ class SoCoService:
                         return playback_device.add_to_queue(pl)
                 logger.error("Playlist '%s' not found", playlist_name)
                 return None
-            result = await asyncio.to_thread(_add_playlist_to_queue)
+            result = await self._scheduler.run(_add_playlist_to_queue)
             return result
         except Exception as e:
             logger.error("Failed to add playlist to queue on %s: %s", speaker_name, e)
@@ -1528,7 +2392,8 @@ class SoCoService:
                             return False
                 logger.error("Radio station '%s' not found in favorites", station_name)
                 return False
-            result = await asyncio.to_thread(_play_radio_station)
+            result = await self._scheduler.run(_play_radio_station)
+            self._touch(speaker_name)
             return result
         except Exception as e:
             logger.error("Failed to play radio station on %s: %s", speaker_name, e)
@@ -1548,12 +2413,12 @@ class SoCoService:
             device = self._get_speaker(speaker_name)
         if not device:
             # Try any speaker
-            device = await asyncio.to_thread(self._get_any_coordinator)
+            device = await self._scheduler.run(self._get_any_coordinator)
             if not device:
                 return []
         
         try:
-            playlists = await asyncio.to_thread(device.get_sonos_playlists)
+            playlists = await self._scheduler.run(device.get_sonos_playlists)
             return [ListItem(number=i + 1, name=p.title) for i, p in enumerate(playlists)]
         except Exception as e:
             logger.error("Failed to get playlists: %s", e)
@@ -1573,19 +2438,19 @@ class SoCoService:
         if speaker_name:
             device = self._get_speaker(speaker_name)
         if not device:
-            device = await asyncio.to_thread(self._get_any_coordinator)
+            device = await self._scheduler.run(self._get_any_coordinator)
             if not device:
                 return []
         
         try:
-            playlists = await asyncio.to_thread(device.get_sonos_playlists)
+            playlists = await self._scheduler.run(device.get_sonos_playlists)
             for pl in playlists:
                 if pl.title.lower() == playlist_name.lower():
                     # Get the playlist tracks using browse
                     def get_tracks():
                         return device.music_library.browse(pl)
                     
-                    items = await asyncio.to_thread(get_tracks)
+                    items = await self._scheduler.run(get_tracks)
                     return [ListItem(number=i + 1, name=item.title) for i, item in enumerate(items)]
             logger.error("Playlist '%s' not found", playlist_name)
             return []
@@ -1606,12 +2471,12 @@ class SoCoService:
         if speaker_name:
             device = self._get_speaker(speaker_name)
         if not device:
-            device = await asyncio.to_thread(self._get_any_coordinator)
+            device = await self._scheduler.run(self._get_any_coordinator)
             if not device:
                 return []
         
         try:
-            stations = await asyncio.to_thread(device.get_favorite_radio_stations)
+            stations = await self._scheduler.run(device.get_favorite_radio_stations)
             return [ListItem(number=i + 1, name=s.title) for i, s in enumerate(stations)]
         except Exception as e:
             logger.error("Failed to get radio stations: %s", e)
@@ -1635,7 +2500,8 @@ class SoCoService:
             # play_uri must be called on the group coordinator
             coordinator = device.group.coordinator
             logger.debug("Playing URI on %s (coordinator: %s)", speaker_name, coordinator.player_name)
-            await asyncio.to_thread(coordinator.play_uri, uri)
+            await self._scheduler.run(coordinator.play_uri, uri)
+            self._touch(speaker_name)
             return True
         except Exception as e:
             logger.error("Failed to play URI on %s: %s", speaker_name, e)
@@ -1648,13 +2514,19 @@ class SoCoService:
     async def get_library_artists(
         self,
         search: str | None = None,
-        max_items: int = 100
+        max_items: int = 100,
+        start: int = 0,
+        priority: WorkPriority = WorkPriority.INTERACTIVE,
+        speaker: SoCo | None = None,
     ) -> ArtistBrowseResult:
         """Get artists from local music library.
         
         Args:
             search: Optional search term to filter artists.
             max_items: Maximum number of items to return.
+            start: Index of the first item to return (for paging).
+            priority: Scheduling class for the browse.
+            speaker: Speaker to browse on (default: any speaker).
             
         Returns:
             Browse result with artists.
@@ -1667,7 +2539,7 @@ class SoCoService:
             # Get any speaker for library access
             if not self._speakers_cache:
                 raise ValueError("No speakers available")
-            device = next(iter(self._speakers_cache.values()), None)
+            device = speaker or next(iter(self._speakers_cache.values()), None)
             if not device:
                 raise ValueError("No speakers available")
             library = device.music_library
@@ -1675,6 +2547,7 @@ class SoCoService:
             # Get artists
             result = library.get_album_artists(
                 search_term=search if search else '',
+                start=start,
                 max_items=max_items
             )
             
@@ -1701,13 +2574,16 @@ class SoCoService:
                 number_returned=result.number_returned
             )
         
-        return await asyncio.to_thread(_browse)
+        return await self._scheduler.run(_browse, priority=priority)
     
     async def get_library_albums(
         self,
         artist_id: str | None = None,
         search: str | None = None,
-        max_items: int = 100
+        max_items: int = 100,
+        start: int = 0,
+        priority: WorkPriority = WorkPriority.INTERACTIVE,
+        speaker: SoCo | None = None,
     ) -> AlbumBrowseResult:
         """Get albums from local music library.
         
@@ -1715,6 +2591,9 @@ class SoCoService:
             artist_id: Optional artist ID to filter by.
             search: Optional search term to filter albums.
             max_items: Maximum number of items to return.
+            start: Index of the first item to return (for paging).
+            priority: Scheduling class for the browse.
+            speaker: Speaker to browse on (default: any speaker).
             
         Returns:
             Browse result with albums.
@@ -1726,7 +2605,7 @@ class SoCoService:
         def _browse():
             if not self._speakers_cache:
                 raise ValueError("No speakers available")
-            device = next(iter(self._speakers_cache.values()), None)
+            device = speaker or next(iter(self._speakers_cache.values()), None)
             if not device:
                 raise ValueError("No speakers available")
             library = device.music_library
@@ -1737,11 +2616,13 @@ class SoCoService:
                 # For now, just browse all albums
                 result = library.get_albums(
                     search_term=search if search else '',
+                    start=start,
                     max_items=max_items
                 )
             else:
                 result = library.get_albums(
                     search_term=search if search else '',
+                    start=start,
                     max_items=max_items
                 )
             
@@ -1770,13 +2651,16 @@ class SoCoService:
                 number_returned=result.number_returned
             )
         
-        return await asyncio.to_thread(_browse)
+        return await self._scheduler.run(_browse, priority=priority)
     
     async def get_library_tracks(
         self,
         album_id: str | None = None,
         search: str | None = None,
-        max_items: int = 100
+        max_items: int = 100,
+        start: int = 0,
+        priority: WorkPriority = WorkPriority.INTERACTIVE,
+        speaker: SoCo | None = None,
     ) -> TrackBrowseResult:
         """Get tracks from local music library.
         
@@ -1784,6 +2668,9 @@ class SoCoService:
             album_id: Optional album ID to browse.
             search: Optional search term to filter tracks.
             max_items: Maximum number of items to return.
+            start: Index of the first item to return (for paging).
+            priority: Scheduling class for the browse.
+            speaker: Speaker to browse on (default: any speaker).
             
         Returns:
             Browse result with tracks.
@@ -1795,13 +2682,14 @@ class SoCoService:
         def _browse():
             if not self._speakers_cache:
                 raise ValueError("No speakers available")
-            device = next(iter(self._speakers_cache.values()), None)
+            device = speaker or next(iter(self._speakers_cache.values()), None)
             if not device:
                 raise ValueError("No speakers available")
             library = device.music_library
             
             result = library.get_tracks(
                 search_term=search if search else '',
+                start=start,
                 max_items=max_items
             )
             
@@ -1831,16 +2719,22 @@ class SoCoService:
                 number_returned=result.number_returned
             )
         
-        return await asyncio.to_thread(_browse)
+        return await self._scheduler.run(_browse, priority=priority)
     
     async def get_library_genres(
         self,
-        max_items: int = 100
+        max_items: int = 100,
+        start: int = 0,
+        priority: WorkPriority = WorkPriority.INTERACTIVE,
+        speaker: SoCo | None = None,
     ) -> GenreBrowseResult:
         """Get genres from local music library.
         
         Args:
             max_items: Maximum number of items to return.
+            start: Index of the first item to return (for paging).
+            priority: Scheduling class for the browse.
+            speaker: Speaker to browse on (default: any speaker).
             
         Returns:
             Browse result with genres.
@@ -1852,12 +2746,12 @@ class SoCoService:
         def _browse():
             if not self._speakers_cache:
                 raise ValueError("No speakers available")
-            device = next(iter(self._speakers_cache.values()), None)
+            device = speaker or next(iter(self._speakers_cache.values()), None)
             if not device:
                 raise ValueError("No speakers available")
             library = device.music_library
             
-            result = library.get_genres(max_items=max_items)
+            result = library.get_genres(start=start, max_items=max_items)
             
             # Convert iterator to list to avoid StopIteration in async context
             items_list = list(result)
@@ -1882,7 +2776,7 @@ class SoCoService:
                 number_returned=result.number_returned
             )
         
-        return await asyncio.to_thread(_browse)
+        return await self._scheduler.run(_browse, priority=priority)
     
     # =========================================================================
     # LIBRARY CACHE MANAGEMENT
@@ -1891,7 +2785,11 @@ class SoCoService:
     async def start_library_cache_scheduler(self):
         """Start the background task that refreshes library cache on schedule.
         
-        Call this from the application lifespan startup.
+        Call this from the background startup work; it returns once the
+        initial refresh is done.
+        
+        Raises:
+            Exception: The initial refresh failed (the schedule still starts).
         """
         if self._settings.library_cache_refresh_hours <= 0:
             logger.info("Library cache scheduler disabled (refresh_hours = 0)")
@@ -1899,7 +2797,15 @@ class SoCoService:
         
         # Initial cache load
         logger.info("Building initial library cache...")
-        await self.refresh_library_cache()
+        refresh_error: Exception | None = None
+        try:
+            await self.refresh_library_cache()
+        except Exception as e:
+            refresh_error = e
+        
+        # Refresh as soon as Sonos reports the library changed
+        if self._settings.library_watch_updates:
+            await self._subscribe_content_directory()
         
         # Start background scheduler
         self._library_cache_task = asyncio.create_task(
@@ -1909,6 +2815,8 @@ class SoCoService:
             "Library cache scheduler started (refreshes at %02d:00 daily)",
             self._settings.library_cache_refresh_hour
         )
+        if refresh_error is not None:
+            raise refresh_error
     
     async def stop_library_cache_scheduler(self):
         """Stop the library cache scheduler."""
@@ -1920,6 +2828,21 @@ class SoCoService:
                 pass
             self._library_cache_task = None
             logger.info("Library cache scheduler stopped")
+        
+        if self._library_update_task:
+            self._library_update_task.cancel()
+            try:
+                await self._library_update_task
+            except asyncio.CancelledError:
+                pass
+            self._library_update_task = None
+        
+        if self._content_subscription:
+            subscription, self._content_subscription = self._content_subscription, None
+            try:
+                await self._scheduler.run(subscription.unsubscribe, priority=WorkPriority.BACKGROUND)
+            except Exception as e:
+                logger.debug("Failed to unsubscribe from library updates: %s", e)
     
     async def _library_cache_scheduler_loop(self):
         """Background loop that refreshes library cache at scheduled time."""
@@ -1962,44 +2885,242 @@ class SoCoService:
                 # Wait a bit before retrying
                 await asyncio.sleep(3600)  # 1 hour
     
-    async def refresh_library_cache(self) -> dict:
-        """Refresh the library cache by fetching all items from Sonos.
+    async def _subscribe_content_directory(self) -> None:
+        """Subscribe to ContentDirectory events of the library speaker.
+        
+        The events carry the container update IDs, which change when the
+        music share is re-indexed; they schedule an incremental refresh.
+        """
+        if not self._speakers_cache:
+            return
+        device = next(iter(self._speakers_cache.values()))
+        loop = asyncio.get_running_loop()
+        
+        def _on_event(event) -> None:
+            # Runs on SoCo's event listener thread
+            loop.call_soon_threadsafe(self._on_content_directory_event, dict(event.variables))
+        
+        def _subscribe():
+            subscription = device.contentDirectory.subscribe(auto_renew=True)
+            subscription.callback = _on_event
+            # The initial event may have arrived before the callback was set
+            while not subscription.events.empty():
+                _on_event(subscription.events.get_nowait())
+            return subscription
+        
+        try:
+            self._content_subscription = await self._scheduler.run(
+                _subscribe, priority=WorkPriority.BACKGROUND
+            )
+            logger.info("Watching %s for library updates", device.ip_address)
+        except Exception as e:
+            logger.warning("Failed to subscribe to library updates: %s", e)
+    
+    def _on_content_directory_event(self, variables: dict[str, Any]) -> None:
+        """Record update IDs from a ContentDirectory event and schedule a refresh."""
+        if 'container_update_i_ds' in variables:
+            self._container_update_ids.update(
+                parse_container_update_ids(variables['container_update_i_ds'])
+            )
+        if 'share_index_in_progress' in variables:
+            self._share_index_in_progress = str(variables['share_index_in_progress']) in ('1', 'True', 'true')
+        
+        # Wait for a re-index to finish rather than crawl a half-built library
+        if self._share_index_in_progress or not self._changed_library_containers():
+            return
+        if self._library_update_task and not self._library_update_task.done():
+            return
+        self._library_update_task = asyncio.create_task(self._refresh_after_update())
+    
+    def _changed_library_containers(self) -> list[str]:
+        """Get library containers whose update ID differs from the indexed one."""
+        indexed = self._library_index.get_meta('container_update_ids') or {}
+        return [
+            container
+            for container, update_id in self._container_update_ids.items()
+            if library_categories_for_container(container) and indexed.get(container) != update_id
+        ]
+    
+    async def _refresh_after_update(self) -> None:
+        """Refresh the library once update events have settled."""
+        try:
+            await asyncio.sleep(self._settings.library_update_debounce_seconds)
+            logger.info(
+                "Library changed (%s), refreshing...", ", ".join(self._changed_library_containers())
+            )
+            await self.refresh_library_cache()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Library refresh after update failed: %s", e)
+    
+    async def _get_system_update_id(self) -> str | None:
+        """Read the ContentDirectory SystemUpdateID of the library speaker."""
+        def _read():
+            device = next(iter(self._speakers_cache.values()), None)
+            if not device:
+                return None
+            return device.contentDirectory.GetSystemUpdateID()['Id']
+        
+        try:
+            return await self._scheduler.run(_read, priority=WorkPriority.BACKGROUND)
+        except Exception as e:
+            logger.warning("Failed to read SystemUpdateID: %s", e)
+            return None
+    
+    def _changed_library_categories(self, system_update_id: str | None) -> list[str]:
+        """Work out which categories need crawling since the last refresh.
+        
+        Categories never indexed are always crawled. An unchanged
+        SystemUpdateID means nothing else changed; otherwise the container
+        update IDs from events narrow the crawl to the changed categories,
+        and without them every category is crawled.
+        """
+        indexed = self._library_index.get_crawl_stats()
+        changed = {category for category in LIBRARY_CATEGORIES if category not in indexed}
+        
+        if system_update_id is None or system_update_id != self._library_index.get_meta('system_update_id'):
+            if self._container_update_ids and self._library_index.get_meta('container_update_ids') is not None:
+                for container in self._changed_library_containers():
+                    changed.update(library_categories_for_container(container))
+            else:
+                changed.update(LIBRARY_CATEGORIES)
+        
+        return [category for category in LIBRARY_CATEGORIES if category in changed]
+    
+    async def _write_library_index(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a library index write on a worker thread.
+        
+        Writes (finishing a large category rewrites its full-text rows) would
+        otherwise stall the event loop; the lock keeps them one at a time on
+        the index's write connection.
+        """
+        async with self._library_write_lock:
+            return await asyncio.to_thread(func, *args)
+    
+    async def _record_refresh(
+        self,
+        system_update_id: str | None,
+        container_update_ids: dict[str, str],
+        categories: list[str],
+    ) -> None:
+        """Store the refresh time and the update IDs the index now reflects.
+        
+        Both are written in one transaction so they survive a restart together.
+        
+        Args:
+            system_update_id: SystemUpdateID read before the crawl.
+            container_update_ids: Container update IDs known before the crawl.
+            categories: Categories that are up to date with those IDs.
+        """
+        indexed = self._library_index.get_meta('container_update_ids') or {}
+        for container, update_id in container_update_ids.items():
+            container_categories = library_categories_for_container(container)
+            if container_categories and set(container_categories) <= set(categories):
+                indexed[container] = update_id
+        
+        self._library_cache_time = datetime.now(timezone.utc)
+        meta = {
+            'container_update_ids': indexed,
+            'refreshed_at': self._library_cache_time.isoformat(),
+        }
+        if system_update_id is not None:
+            meta['system_update_id'] = system_update_id
+        await self._write_library_index(self._library_index.update_meta, meta)
+    
+    def _load_library_cache_time(self) -> datetime | None:
+        """Get the time of the last refresh stored with the library index."""
+        refreshed_at = self._library_index.get_meta('refreshed_at')
+        if refreshed_at is None:
+            # Indexed before refresh times were stored: use the latest crawl
+            crawled = [stats['crawled_at'] for stats in self._library_index.get_crawl_stats().values()]
+            refreshed_at = max(crawled, default=None)
+        return datetime.fromisoformat(refreshed_at) if refreshed_at else None
+    
+    async def refresh_library_cache(self, force: bool = False) -> dict:
+        """Refresh the library index from Sonos.
+        
+        Only categories whose ContentDirectory update IDs changed since the
+        last refresh are re-crawled; if nothing changed the refresh is skipped.
+        
+        Args:
+            force: Re-crawl every category regardless of update IDs.
         
         Returns:
-            Dict with counts of cached items.
+            Dict with counts of indexed items, the elapsed time, whether the
+            refresh was skipped and the crawl statistics (pages, throughput)
+            of each re-crawled category.
         """
         async with self._library_cache_lock:
-            logger.info("Refreshing library cache...")
-            start_time = datetime.now()
+            start_time = time.monotonic()
             
             try:
-                # Fetch all categories (using larger limits for caching)
-                artists_result = await self.get_library_artists(max_items=1000)
-                albums_result = await self.get_library_albums(max_items=2000)
-                # Tracks can be very large, limit for memory
-                tracks_result = await self.get_library_tracks(max_items=500)
-                genres_result = await self.get_library_genres(max_items=500)
+                if not self._speakers_cache:
+                    await self.discover_speakers()
                 
-                # Store in cache as dicts for JSON serialization
-                self._library_cache = {
-                    'artists': [a.model_dump() for a in artists_result.items],
-                    'albums': [a.model_dump() for a in albums_result.items],
-                    'tracks': [t.model_dump() for t in tracks_result.items],
-                    'genres': [g.model_dump() for g in genres_result.items]
+                # Read the IDs before crawling so changes during the crawl trigger another refresh
+                system_update_id = await self._get_system_update_id()
+                container_update_ids = dict(self._container_update_ids)
+                categories = (
+                    list(LIBRARY_CATEGORIES) if force
+                    else self._changed_library_categories(system_update_id)
+                )
+                
+                if not categories:
+                    logger.info("Library unchanged (SystemUpdateID %s), skipping refresh", system_update_id)
+                    await self._record_refresh(system_update_id, container_update_ids, list(LIBRARY_CATEGORIES))
+                    return {
+                        **{category: self._library_index.count(category) for category in LIBRARY_CATEGORIES},
+                        'elapsed_seconds': time.monotonic() - start_time,
+                        'skipped': True,
+                        'crawls': {},
+                    }
+                
+                logger.info("Refreshing library cache (%s)...", ", ".join(categories))
+                fetchers = {
+                    'artists': self.get_library_artists,
+                    'albums': self.get_library_albums,
+                    'tracks': self.get_library_tracks,
+                    'genres': self.get_library_genres,
                 }
-                self._library_cache_time = datetime.now(timezone.utc)
+                # One pool slot per concurrent browse, spread over the speakers
+                library_speakers = await self._get_library_speakers()
+                if not library_speakers:
+                    raise ValueError("No speakers available")
+                concurrency = max(1, self._settings.library_crawl_concurrency)
+                speakers: asyncio.Queue = asyncio.Queue()
+                for slot in range(concurrency):
+                    speakers.put_nowait(library_speakers[slot % len(library_speakers)])
+                
+                tasks = [
+                    asyncio.create_task(self._crawl_library_category(category, fetchers[category], speakers))
+                    for category in categories
+                ]
+                try:
+                    crawls = dict(zip(categories, await asyncio.gather(*tasks)))
+                except BaseException:
+                    # Abandon the other categories (their partial crawls are discarded)
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                await self._record_refresh(system_update_id, container_update_ids, categories)
                 
-                elapsed = (datetime.now() - start_time).total_seconds()
+                elapsed = time.monotonic() - start_time
                 result = {
-                    'artists': len(self._library_cache['artists']),
-                    'albums': len(self._library_cache['albums']),
-                    'tracks': len(self._library_cache['tracks']),
-                    'genres': len(self._library_cache['genres']),
-                    'elapsed_seconds': elapsed
+                    **{category: self._library_index.count(category) for category in LIBRARY_CATEGORIES},
+                    'elapsed_seconds': elapsed,
+                    'skipped': False,
+                    'concurrency': concurrency,
+                    'speakers': [speaker.ip_address for speaker in library_speakers],
+                    'crawls': crawls,
                 }
                 logger.info(
-                    "Library cache refreshed: %d artists, %d albums, %d tracks, %d genres (%.1fs)",
-                    result['artists'], result['albums'], result['tracks'], result['genres'], elapsed
+                    "Library cache refreshed: %d artists, %d albums, %d tracks, %d genres "
+                    "(%.1fs, %.0f items/s, %d concurrent browses on %d speakers)",
+                    result['artists'], result['albums'], result['tracks'], result['genres'], elapsed,
+                    sum(crawl['item_count'] for crawl in crawls.values()) / elapsed if elapsed > 0 else 0,
+                    concurrency, len(library_speakers),
                 )
                 return result
                 
@@ -2007,21 +3128,276 @@ class SoCoService:
                 logger.error("Failed to refresh library cache: %s", e)
                 raise
     
-    def get_library_cache(self) -> dict:
-        """Get the current library cache.
+    async def _get_library_speakers(self) -> list[SoCo]:
+        """Get the speakers to spread library browses across.
+        
+        Group coordinators are preferred (one per room or group); if the
+        group topology can't be read, any discovered speakers are used.
+        """
+        limit = max(1, self._settings.library_crawl_concurrency)
+        
+        def _coordinators():
+            device = next(iter(self._speakers_cache.values()), None)
+            if not device:
+                return []
+            coordinators = [group.coordinator for group in device.all_groups if group.coordinator]
+            return sorted(coordinators, key=lambda coordinator: coordinator.ip_address)
+        
+        try:
+            speakers = await self._scheduler.run(_coordinators, priority=WorkPriority.BACKGROUND)
+        except Exception as e:
+            logger.debug("Failed to get group coordinators for the library crawl: %s", e)
+            speakers = []
+        if not speakers:
+            speakers = list(self._speakers_cache.values())
+        return speakers[:limit]
+    
+    async def _crawl_library_category(
+        self,
+        category: str,
+        fetch: Callable[..., Any],
+        speakers: asyncio.Queue,
+    ) -> dict[str, Any]:
+        """Crawl a library category into the library index.
+        
+        After the first page reports the size of the category, the following
+        pages are fetched concurrently, each on a speaker taken from the
+        shared pool (which bounds the concurrency of the whole refresh).
+        Pages are written to the index in library order as they complete
+        (on a worker thread, so large writes don't stall requests), and at most library_crawl_concurrency pages are held per category,
+        so memory use doesn't grow with the size of the library. Every
+        browse yields to interactive commands first so the crawl never
+        delays user taps.
+        
+        Args:
+            category: Library category.
+            fetch: The get_library_* browse method of the category.
+            speakers: Pool of speakers to browse on, one per concurrent browse.
+            
+        Returns:
+            Crawl statistics for the category.
+        """
+        page_size = self._settings.library_page_size
+        window = max(1, self._settings.library_crawl_concurrency)
+        generation = await self._write_library_index(self._library_index.start_category, category)
+        start_time = time.monotonic()
+        pages = 0
+        total_matches = 0
+        
+        async def _browse(start: int, max_items: int):
+            await self._scheduler.checkpoint()
+            speaker = await speakers.get()
+            try:
+                return await fetch(
+                    start=start,
+                    max_items=max_items,
+                    priority=WorkPriority.BACKGROUND,
+                    speaker=speaker,
+                )
+            finally:
+                speakers.put_nowait(speaker)
+        
+        async def _fetch_range(start: int, end: int) -> tuple[list[Any], int]:
+            # Speakers may return fewer items than asked; page on from what came back
+            items = []
+            browses = 0
+            while start + len(items) < end:
+                result = await _browse(start + len(items), end - start - len(items))
+                browses += 1
+                if result.number_returned == 0 or not result.items:
+                    break
+                items.extend(result.items)
+            return items, browses
+        
+        pending: deque[tuple[int, asyncio.Task]] = deque()
+        try:
+            first = await _browse(0, page_size)
+            pages = 1
+            total_matches = first.total_matches
+            await self._write_library_index(
+                self._library_index.add_items,
+                category, generation, 0, [item.model_dump() for item in first.items],
+            )
+            next_start = len(first.items) if first.number_returned else total_matches
+            
+            while pending or next_start < total_matches:
+                while next_start < total_matches and len(pending) < window:
+                    end = min(next_start + page_size, total_matches)
+                    pending.append((next_start, asyncio.create_task(_fetch_range(next_start, end))))
+                    next_start = end
+                start, task = pending.popleft()
+                items, browses = await task
+                pages += browses
+                await self._write_library_index(
+                    self._library_index.add_items,
+                    category, generation, start, [item.model_dump() for item in items],
+                )
+        except BaseException:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+            await self._write_library_index(self._library_index.discard_generation, category, generation)
+            raise
+        
+        stats = await self._write_library_index(
+            self._library_index.finish_category,
+            category, generation, total_matches, pages, time.monotonic() - start_time,
+        )
+        logger.info(
+            "Indexed %d %s in %d pages (%.1fs, %.0f items/s)",
+            stats['item_count'], category, pages, stats['elapsed_seconds'], stats['items_per_second'],
+        )
+        return stats
+    
+    async def search_library(
+        self,
+        query: str,
+        category: str | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> LibrarySearchResult:
+        """Search the library.
+        
+        Served from the library index when the searched categories are
+        indexed (no speaker round trip). Before the first crawl, or with the
+        library cache disabled, the search runs on a speaker instead.
+        
+        Args:
+            query: Search text; each word matches the start of a word.
+            category: Category to search, or None for all of them.
+            offset: Number of results to skip (for paging).
+            limit: Maximum number of results.
+        
+        Returns:
+            Search result, best match first.
+        """
+        categories = [category] if category else list(LIBRARY_CATEGORIES)
+        indexed = self._library_index.get_crawl_stats()
+        if not all(c in indexed for c in categories):
+            return await self._search_library_on_speaker(query, categories, offset, limit)
+        
+        items, total = self._library_index.search(query, categories, offset, limit)
+        return LibrarySearchResult(
+            items=[LibrarySearchItem(**item) for item in items],
+            total_matches=total,
+            number_returned=len(items),
+            offset=offset,
+            is_indexed=True,
+        )
+    
+    async def _search_library_on_speaker(
+        self,
+        query: str,
+        categories: list[str],
+        offset: int,
+        limit: int,
+    ) -> LibrarySearchResult:
+        """Search the library with ContentDirectory searches on a speaker.
+        
+        Results are grouped by category (in LIBRARY_CATEGORIES order) rather
+        than ranked. Genres can't be searched on the speaker, so their titles
+        are matched here.
+        """
+        searches = {
+            'artists': self.get_library_artists,
+            'albums': self.get_library_albums,
+            'tracks': self.get_library_tracks,
+        }
+        single = len(categories) == 1
+        items: list[LibrarySearchItem] = []
+        total = 0
+        for category in categories:
+            if category == 'genres':
+                terms = query.lower().split()
+                genres = await self.get_library_genres(max_items=1000)
+                found = [g for g in genres.items if all(t in g.title.lower() for t in terms)]
+                matches = found[offset:offset + limit] if single else found
+                count = len(found)
+            else:
+                # One category pages on the speaker; several are merged and paged here
+                result = await searches[category](
+                    search=query,
+                    start=offset if single else 0,
+                    max_items=limit if single else offset + limit,
+                )
+                matches = result.items
+                count = result.total_matches
+            total += count
+            items.extend(LibrarySearchItem(category=category, **item.model_dump()) for item in matches)
+        
+        if not single:
+            items = items[offset:offset + limit]
+        return LibrarySearchResult(
+            items=items,
+            total_matches=total,
+            number_returned=len(items),
+            offset=offset,
+            is_indexed=False,
+        )
+    
+    def get_indexed_library(
+        self,
+        category: str,
+        start: int = 0,
+        max_items: int = 100,
+    ) -> ArtistBrowseResult | AlbumBrowseResult | TrackBrowseResult | GenreBrowseResult | None:
+        """Browse a category from the library index (no speaker round trip).
+        
+        Args:
+            category: Library category.
+            start: Index of the first item to return (for paging).
+            max_items: Maximum number of items to return.
+        
+        Returns:
+            Browse result in library order, or None if the category hasn't
+            been indexed yet.
+        """
+        stats = self._library_index.get_crawl_stats().get(category)
+        if stats is None:
+            return None
+        items = self._library_index.get_items(category, start, max_items)
+        return LIBRARY_BROWSE_RESULTS[category](
+            items=items,
+            total_matches=stats['item_count'],
+            number_returned=len(items),
+        )
+    
+    def get_library_cache(self, offset: int = 0, limit: int = 1000) -> dict:
+        """Get one page of each category of the library cache.
+        
+        The index can hold far more items than fit in a response, so each
+        category is paged; item_counts tells clients how many there are.
+        
+        Args:
+            offset: Number of items to skip in each category.
+            limit: Maximum number of items per category.
         
         Returns:
             Dict with cached items and metadata.
         """
         return {
-            'artists': self._library_cache.get('artists', []),
-            'albums': self._library_cache.get('albums', []),
-            'tracks': self._library_cache.get('tracks', []),
-            'genres': self._library_cache.get('genres', []),
+            **{
+                category: self._library_index.get_items(category, offset, limit)
+                for category in LIBRARY_CATEGORIES
+            },
+            'item_counts': {
+                category: self._library_index.count(category) for category in LIBRARY_CATEGORIES
+            },
+            'offset': offset,
+            'limit': limit,
             'cached_at': self._library_cache_time.isoformat() if self._library_cache_time else None,
             'is_cached': self._library_cache_time is not None
         }
     
+    def get_scheduler_stats(self) -> dict[str, Any]:
+        """Get queue statistics for the SoCo work scheduler."""
+        return self._scheduler.get_stats()
+    
+    def close(self) -> None:
+        """Stop the SoCo worker threads and close the library index."""
+        self._scheduler.shutdown()
+        self._library_index.close()
+    
     def get_library_cache_status(self) -> dict:
         """Get the status of the library cache.
         
@@ -2040,9 +3416,7 @@ class SoCoService:
             'refresh_interval_hours': self._settings.library_cache_refresh_hours,
             'refresh_hour': self._settings.library_cache_refresh_hour,
             'item_counts': {
-                'artists': len(self._library_cache.get('artists', [])),
-                'albums': len(self._library_cache.get('albums', [])),
-                'tracks': len(self._library_cache.get('tracks', [])),
-                'genres': len(self._library_cache.get('genres', []))
-            }
+                category: self._library_index.count(category) for category in LIBRARY_CATEGORIES
+            },
+            'crawls': self._library_index.get_crawl_stats(),
         }
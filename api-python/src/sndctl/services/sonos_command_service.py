@@ -2,22 +2,87 @@
 
 import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, Callable
 from urllib.parse import quote
 
-import httpx
-
 from ..config import Settings
 from ..models import Speaker, SocoCliResponse
 from .soco_cli_service import SocoCliService
 
 logger = logging.getLogger(__name__)
 
+# soco-cli actions that only read state, whatever their arguments
+QUERY_ACTIONS = frozenset({
+    "album_art",
+    "alarms",
+    "battery",
+    "buttons",
+    "get_channel", "channel",
+    "get_uri",
+    "groups",
+    "info",
+    "list_favs", "list_favorites", "list_favourites", "lf",
+    "list_playlists", "playlists", "lp",
+    "list_queue", "lq", "q",
+    "playback", "state", "status",
+    "queue_length", "ql",
+    "queue_position", "qp",
+    "sysinfo",
+    "track",
+    "zone_groups",
+    "zones", "all_zones", "rooms", "visible_zones",
+})
+
+# soco-cli actions that read a setting when called without arguments and
+# change it when given one
+SETTING_ACTIONS = frozenset({
+    "balance",
+    "bass",
+    "cross_fade", "crossfade", "fade",
+    "dialog_mode", "dialogue_mode", "dialog", "dialogue",
+    "fixed_volume",
+    "group_mute",
+    "group_volume", "group_vol", "gv",
+    "loudness",
+    "mute",
+    "night_mode", "night",
+    "play_mode", "mode",
+    "repeat", "rpt",
+    "shuffle", "sh",
+    "sleep_timer", "sleep",
+    "status_light", "light",
+    "treble",
+    "volume", "vol", "v",
+})
+
+# Maximum number of cached reads before expired entries are pruned
+MAX_CACHED_READS = 256
+
+
+def is_read_only_action(action: str, args: tuple[str, ...]) -> bool:
+    """Check if a soco-cli command only reads state.
+    
+    Args:
+        action: Command action.
+        args: Command arguments.
+    """
+    action = action.lower()
+    return action in QUERY_ACTIONS or (action in SETTING_ACTIONS and not args)
+
 
 class SonosCommandService:
     """Service to execute commands via the soco-cli HTTP API.
     
-    Uses a semaphore to serialize requests - soco-cli cannot handle concurrent requests properly.
+    soco-cli cannot handle concurrent requests properly, so each soco-cli
+    worker process is given one request at a time. Commands are serialized per
+    speaker and routed to the speaker's home worker when it is free (or any
+    free worker otherwise), so a slow or offline speaker only holds up its own
+    commands rather than every room.
+    
+    Read-only commands are cached per (speaker, action, arguments) for a
+    short TTL, and identical reads in flight at the same time share one
+    request. Any other command on a speaker invalidates its cached reads.
     """
     
     def __init__(self, settings: Settings, soco_cli_service: SocoCliService):
@@ -29,20 +94,27 @@ class SonosCommandService:
         """
         self._settings = settings
         self._soco_cli_service = soco_cli_service
-        self._request_lock = asyncio.Lock()
-        self._client: httpx.AsyncClient | None = None
+        self._speaker_locks: dict[str, asyncio.Lock] = {}
+        
+        # Read cache: (speaker, action, args) -> (response, monotonic time), the
+        # reads in flight, and a per-speaker generation bumped by every write so
+        # a read that overlapped a write isn't cached
+        self._read_cache: dict[tuple[str, str, tuple[str, ...]], tuple[SocoCliResponse, float]] = {}
+        self._pending_reads: dict[tuple[str, str, tuple[str, ...]], asyncio.Future[SocoCliResponse]] = {}
+        self._write_generations: dict[str, int] = {}
+        self._write_listeners: list[Callable[[str], None]] = []
     
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create the HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=30.0)
-        return self._client
+    def add_write_listener(self, callback: Callable[[str], None]) -> None:
+        """Register a callback that is called with the speaker of every write command."""
+        self._write_listeners.append(callback)
     
-    async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+    def _get_speaker_lock(self, speaker: str) -> asyncio.Lock:
+        """Get the lock that serializes commands to a speaker."""
+        key = speaker.lower()
+        lock = self._speaker_locks.get(key)
+        if lock is None:
+            lock = self._speaker_locks[key] = asyncio.Lock()
+        return lock
     
     async def get_speakers(self) -> list[str]:
         """Get the list of speakers.
@@ -51,10 +123,10 @@ class SonosCommandService:
             List of speaker names.
         """
         await self._soco_cli_service.ensure_server_running()
-        async with self._request_lock:
+        async with self._soco_cli_service.checkout_worker() as base_url:
             try:
-                client = await self._get_client()
-                url = f"{self._soco_cli_service.server_url}/speakers"
+                client = self._soco_cli_service.client
+                url = f"{base_url}/speakers"
                 response = await client.get(url)
                 
                 if response.status_code != 200:
@@ -74,16 +146,28 @@ class SonosCommandService:
                 return []
     
     async def rediscover_speakers(self) -> list[str]:
-        """Trigger speaker rediscovery.
+        """Trigger speaker rediscovery on every soco-cli worker.
         
         Returns:
             List of discovered speaker names.
         """
         await self._soco_cli_service.ensure_server_running()
-        async with self._request_lock:
+        results = await asyncio.gather(*(
+            self._rediscover_worker(index)
+            for index in range(len(self._soco_cli_service.worker_urls))
+        ))
+        return max(results, key=len)
+    
+    async def _rediscover_worker(self, index: int) -> list[str]:
+        """Trigger speaker rediscovery on one soco-cli worker.
+        
+        Returns:
+            List of speaker names discovered by that worker.
+        """
+        async with self._soco_cli_service.checkout_worker(index, exclusive=True) as base_url:
             try:
-                client = await self._get_client()
-                url = f"{self._soco_cli_service.server_url}/rediscover"
+                client = self._soco_cli_service.client
+                url = f"{base_url}/rediscover"
                 response = await client.get(url)
                 
                 if response.status_code != 200:
@@ -107,6 +191,9 @@ class SonosCommandService:
     ) -> SocoCliResponse:
         """Execute a command on a speaker.
         
+        Read-only commands may be answered from the read cache, in which
+        case the response's ``cached`` flag is set.
+        
         Args:
             speaker: Speaker name.
             action: Command action.
@@ -115,11 +202,77 @@ class SonosCommandService:
         Returns:
             Response from soco-cli.
         """
+        if not is_read_only_action(action, args):
+            try:
+                return await self._send_command(speaker, action, *args)
+            finally:
+                self.invalidate_reads(speaker)
+                for callback in self._write_listeners:
+                    callback(speaker)
+        
+        key = (speaker.lower(), action.lower(), args)
+        cached = self._read_cache.get(key)
+        if cached and time.monotonic() - cached[1] < self._settings.soco_cli_read_cache_ttl_seconds:
+            return cached[0].model_copy(deep=True, update={"cached": True})
+        
+        pending = self._pending_reads.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._send_read(key, speaker, action, *args))
+            self._pending_reads[key] = pending
+        # Shielded so a cancelled caller doesn't cancel the read for the others
+        response = await asyncio.shield(pending)
+        return response.model_copy(deep=True)
+    
+    async def _send_read(
+        self, key: tuple[str, str, tuple[str, ...]], speaker: str, action: str, *args: str
+    ) -> SocoCliResponse:
+        """Send a read-only command and cache a successful response."""
+        generation = self._write_generations.get(key[0], 0)
+        try:
+            response = await self._send_command(speaker, action, *args)
+        finally:
+            self._pending_reads.pop(key, None)
+        
+        if (
+            response.exit_code == 0
+            and self._settings.soco_cli_read_cache_ttl_seconds > 0
+            and self._write_generations.get(key[0], 0) == generation
+        ):
+            now = time.monotonic()
+            if len(self._read_cache) >= MAX_CACHED_READS:
+                ttl = self._settings.soco_cli_read_cache_ttl_seconds
+                self._read_cache = {
+                    k: v for k, v in self._read_cache.items() if now - v[1] < ttl
+                }
+            self._read_cache[key] = (response, now)
+        return response
+    
+    def invalidate_reads(self, speaker: str | None = None) -> None:
+        """Drop cached reads for a speaker, or for every speaker.
+        
+        Args:
+            speaker: Speaker name, or None for all speakers.
+        """
+        if speaker is None:
+            names = {key[0] for key in self._read_cache} | {key[0] for key in self._pending_reads}
+            for name in names | set(self._write_generations):
+                self._write_generations[name] = self._write_generations.get(name, 0) + 1
+            self._read_cache.clear()
+            return
+        name = speaker.lower()
+        self._write_generations[name] = self._write_generations.get(name, 0) + 1
+        self._read_cache = {k: v for k, v in self._read_cache.items() if k[0] != name}
+    
+    async def _send_command(
+        self, speaker: str, action: str, *args: str
+    ) -> SocoCliResponse:
+        """Send a command to a speaker's soco-cli worker."""
         await self._soco_cli_service.ensure_server_running()
-        async with self._request_lock:
+        home = self._soco_cli_service.worker_index_for(speaker)
+        async with self._get_speaker_lock(speaker), self._soco_cli_service.checkout_worker(home) as base_url:
             try:
-                client = await self._get_client()
-                url = f"{self._soco_cli_service.server_url}/{quote(speaker)}/{quote(action)}"
+                client = self._soco_cli_service.client
+                url = f"{base_url}/{quote(speaker)}/{quote(action)}"
                 
                 if args:
                     encoded_args = "/".join(quote(arg) for arg in args)
@@ -0,0 +1,91 @@
+"""Progress of the background startup work.
+
+The application starts serving before speakers are discovered, soco-cli is
+started and the library is indexed. Those steps run as background phases;
+this tracker records their state and timings for the readiness endpoint and
+the startup log.
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProgress:
+    """Tracks the phases of background startup work."""
+    
+    def __init__(self, phases: list[str], required: list[str]):
+        """Initialize the tracker.
+        
+        Args:
+            phases: Phase names, in the order they are reported.
+            required: Phases that must finish before the app reports ready.
+        """
+        self._started_at = datetime.now(timezone.utc)
+        self._start = time.monotonic()
+        self._finished: float | None = None
+        self._required = list(required)
+        self._phases: dict[str, dict[str, Any]] = {
+            name: {"status": "pending", "elapsedSeconds": None, "error": None}
+            for name in phases
+        }
+        self._phase_starts: dict[str, float] = {}
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether every required phase has finished (successfully or not)."""
+        return all(self._phases[name]["status"] in ("done", "failed") for name in self._required)
+    
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[None]:
+        """Time a phase, recording a failure instead of raising it.
+        
+        A failed phase is logged and the remaining startup work carries on;
+        the service involved is retried on demand later.
+        """
+        phase = self._phases[name]
+        phase["status"] = "running"
+        self._phase_starts[name] = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            phase["status"] = "failed"
+            phase["error"] = str(e)
+            logger.error("Startup phase %s failed: %s", name, e)
+        else:
+            phase["status"] = "done"
+        finally:
+            phase["elapsedSeconds"] = round(time.monotonic() - self._phase_starts[name], 3)
+    
+    def finish(self) -> None:
+        """Mark background startup as complete and log the time breakdown."""
+        self._finished = time.monotonic()
+        logger.info(
+            "Startup complete in %.1fs (%s)",
+            self._finished - self._start,
+            ", ".join(
+                f"{name} {phase['elapsedSeconds']:.1f}s" if phase["elapsedSeconds"] is not None
+                else f"{name} {phase['status']}"
+                for name, phase in self._phases.items()
+            ),
+        )
+    
+    def get_status(self) -> dict[str, Any]:
+        """Get readiness and per-phase progress."""
+        end = self._finished if self._finished is not None else time.monotonic()
+        phases = {}
+        for name, phase in self._phases.items():
+            phases[name] = dict(phase)
+            if phase["status"] == "running":
+                phases[name]["elapsedSeconds"] = round(time.monotonic() - self._phase_starts[name], 3)
+        return {
+            "ready": self.is_ready,
+            "complete": self._finished is not None,
+            "startedAt": self._started_at.isoformat(),
+            "elapsedSeconds": round(end - self._start, 3),
+            "phases": phases,
+        }
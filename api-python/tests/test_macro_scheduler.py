@@ -0,0 +1,201 @@
+"""Tests for cron expressions and sunrise/sunset times of the macro scheduler."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from sndctl.services.macro_scheduler import CronExpression, solar_event_time
+
+
+# ========================================
+# CronExpression
+# ========================================
+
+def test_parses_wildcards_ranges_lists_and_steps():
+    cron = CronExpression("*/15 9-17 1,15 * *")
+
+    assert cron.minutes == [0, 15, 30, 45]
+    assert cron.hours == list(range(9, 18))
+    assert cron.days == [1, 15]
+    assert cron.months == list(range(1, 13))
+    assert cron.weekdays == set(range(7))
+
+
+def test_step_from_a_start_value_runs_to_the_end_of_the_range():
+    assert CronExpression("5/15 * * * *").minutes == [5, 20, 35, 50]
+    assert CronExpression("0 8-20/4 * * *").hours == [8, 12, 16, 20]
+
+
+def test_parses_month_and_weekday_names_case_insensitively():
+    cron = CronExpression("0 7 * Jan,JUL mon-fri")
+
+    assert cron.months == [1, 7]
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_weekday_7_is_sunday():
+    assert CronExpression("0 0 * * 7").weekdays == {0}
+    assert CronExpression("0 0 * * 5-7").weekdays == {5, 6, 0}
+
+
+@pytest.mark.parametrize("expression", [
+    "* * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "30-10 * * * *",
+    "* * * * funday",
+    "a * * * *",
+])
+def test_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_next_after_is_strictly_later_and_drops_seconds():
+    cron = CronExpression("0 7 * * *")
+
+    assert cron.next_after(datetime(2024, 1, 1, 6, 59, 30)) == datetime(2024, 1, 1, 7, 0)
+    assert cron.next_after(datetime(2024, 1, 1, 7, 0)) == datetime(2024, 1, 2, 7, 0)
+    assert cron.next_after(datetime(2024, 1, 1, 7, 0, 45)) == datetime(2024, 1, 2, 7, 0)
+
+
+def test_next_after_crosses_month_and_year_boundaries():
+    assert CronExpression("30 23 31 * *").next_after(datetime(2024, 4, 1)) == datetime(2024, 5, 31, 23, 30)
+    assert CronExpression("0 0 1 1 *").next_after(datetime(2024, 6, 1)) == datetime(2025, 1, 1, 0, 0)
+
+
+def test_day_of_month_or_day_of_week_when_both_are_restricted():
+    # 13 January 2024 is a Saturday, so Fridays match before it
+    cron = CronExpression("0 0 13 * fri")
+
+    first = cron.next_after(datetime(2024, 1, 1))
+    second = cron.next_after(first)
+    third = cron.next_after(second)
+
+    assert [first, second, third] == [
+        datetime(2024, 1, 5),
+        datetime(2024, 1, 12),
+        datetime(2024, 1, 13),
+    ]
+
+
+def test_only_the_restricted_day_field_applies():
+    # Friday 5 January 2024
+    assert CronExpression("0 0 * * fri").next_after(datetime(2024, 1, 1)) == datetime(2024, 1, 5)
+    assert CronExpression("0 0 13 * *").next_after(datetime(2024, 1, 1)) == datetime(2024, 1, 13)
+
+
+def test_stepped_wildcard_day_field_is_and_ed_with_the_other():
+    # "*/2" counts as unrestricted, so odd days that are also weekdays match;
+    # Wednesday 3 January 2024 is the first, and Saturday 13 and Sunday 7 are skipped
+    cron = CronExpression("0 7 */2 * 1-5")
+
+    fires = [cron.next_after(datetime(2024, 1, 1, 8, 0))]
+    for _ in range(5):
+        fires.append(cron.next_after(fires[-1]))
+
+    assert [fire.day for fire in fires] == [3, 5, 9, 11, 15, 17]
+    assert all(fire.weekday() < 5 and fire.day % 2 == 1 for fire in fires)
+
+
+@pytest.mark.parametrize("alias, expression", [
+    ("@yearly", "0 0 1 1 *"),
+    ("@annually", "0 0 1 1 *"),
+    ("@monthly", "0 0 1 * *"),
+    ("@weekly", "0 0 * * 0"),
+    ("@daily", "0 0 * * *"),
+    ("@midnight", "0 0 * * *"),
+    ("@hourly", "0 * * * *"),
+])
+def test_aliases_match_their_expansion(alias, expression):
+    after = datetime(2024, 1, 3, 10, 20)
+
+    assert CronExpression(alias).next_after(after) == CronExpression(expression).next_after(after)
+
+
+def test_aliases_are_case_insensitive():
+    assert CronExpression("@HOURLY").next_after(datetime(2024, 1, 1, 10, 20)) == datetime(2024, 1, 1, 11, 0)
+
+
+@pytest.mark.parametrize("expression", ["0 0 31 2 *", "0 0 30 2 *", "0 0 31 4,6,9,11 *"])
+def test_never_matching_expression_raises(expression):
+    cron = CronExpression(expression)
+
+    with pytest.raises(ValueError, match="never matches"):
+        cron.next_after(datetime(2024, 1, 1))
+
+
+def test_leap_day_is_found_years_ahead():
+    assert CronExpression("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+
+# ========================================
+# solar_event_time
+# ========================================
+
+def _assert_close(actual: datetime | None, expected: datetime, minutes: float = 2):
+    assert actual is not None
+    assert abs(actual - expected) <= timedelta(minutes=minutes)
+
+
+def test_sunrise_and_sunset_in_london_at_midsummer():
+    day = date(2024, 6, 21)
+
+    _assert_close(
+        solar_event_time(day, 51.5074, -0.1278, "sunrise"),
+        datetime(2024, 6, 21, 3, 43, tzinfo=timezone.utc),
+    )
+    _assert_close(
+        solar_event_time(day, 51.5074, -0.1278, "sunset"),
+        datetime(2024, 6, 21, 20, 21, tzinfo=timezone.utc),
+    )
+
+
+def test_sunrise_and_sunset_in_new_york_at_midwinter():
+    day = date(2024, 12, 21)
+
+    _assert_close(
+        solar_event_time(day, 40.7128, -74.0060, "sunrise"),
+        datetime(2024, 12, 21, 12, 17, tzinfo=timezone.utc),
+    )
+    _assert_close(
+        solar_event_time(day, 40.7128, -74.0060, "sunset"),
+        datetime(2024, 12, 21, 21, 32, tzinfo=timezone.utc),
+    )
+
+
+def test_southern_hemisphere_and_east_longitude():
+    # Sydney: 05:41 and 20:05 local time (UTC+11)
+    day = date(2024, 12, 21)
+
+    _assert_close(
+        solar_event_time(day, -33.8688, 151.2093, "sunrise"),
+        datetime(2024, 12, 20, 18, 41, tzinfo=timezone.utc),
+    )
+    _assert_close(
+        solar_event_time(day, -33.8688, 151.2093, "sunset"),
+        datetime(2024, 12, 21, 9, 6, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.parametrize("day", [date(2024, 6, 21), date(2024, 12, 21)])
+@pytest.mark.parametrize("event", ["sunrise", "sunset"])
+def test_polar_day_and_night_have_no_sunrise_or_sunset(day, event):
+    # Tromsø has midnight sun in June and polar night in December
+    assert solar_event_time(day, 69.6496, 18.9560, event) is None
+
+
+def test_returns_aware_utc_times():
+    sunrise = solar_event_time(date(2024, 3, 20), 0.0, 0.0, "sunrise")
+    sunset = solar_event_time(date(2024, 3, 20), 0.0, 0.0, "sunset")
+
+    assert sunrise is not None and sunset is not None
+    assert sunrise.tzinfo == timezone.utc
+    # About twelve hours of daylight at the equator on the equinox
+    _assert_close(sunrise, datetime(2024, 3, 20, 6, 4, tzinfo=timezone.utc), minutes=5)
+    assert timedelta(hours=12) <= sunset - sunrise <= timedelta(hours=12, minutes=15)
@@ -0,0 +1,68 @@
+"""Tests for static validation of macro definitions."""
+
+import pytest
+
+from sndctl.models import MacroParameter
+from sndctl.services.macro_validation import validate_definition
+
+
+def _codes(definition: str, parameters: list[MacroParameter] | None = None) -> list[str]:
+    return [d.code for d in validate_definition(definition, parameters or [])]
+
+
+def test_valid_macro_has_no_diagnostics():
+    assert _codes("Kitchen volume 20 : Kitchen play : wait 5m : Kitchen pause") == []
+
+
+@pytest.mark.parametrize("definition", [
+    "Kitchen play : wait 5 : loop",
+    "Kitchen play : wait 5 : loop 3",
+    "Kitchen play : wait 5 : loop_for 1h",
+    "Kitchen play : wait 5 : loop_until 22:00",
+    "Kitchen play : loop_to_start : Kitchen pause",
+])
+def test_loop_commands_are_known_speakerless_actions(definition):
+    assert _codes(definition) == []
+
+
+def test_loop_for_needs_a_valid_duration():
+    assert _codes("Kitchen play : loop_for") == ["missing_argument"]
+    assert _codes("Kitchen play : loop_for soon") == ["invalid_argument"]
+
+
+def test_speaker_without_action_is_an_error():
+    diagnostics = validate_definition("Kitchen play : Kitchen", [])
+
+    assert [(d.severity, d.code, d.command) for d in diagnostics] == [("error", "missing_action", 1)]
+
+
+def test_unknown_action_is_a_warning_with_a_suggestion():
+    diagnostics = validate_definition("Kitchen vlume 10", [])
+
+    assert [(d.severity, d.code) for d in diagnostics] == [("warning", "unknown_action")]
+    assert "volume" in diagnostics[0].message
+
+
+def test_unknown_speaker_is_a_warning():
+    diagnostics = validate_definition(
+        "Kitchn play",
+        [],
+        speakers=["Kitchen"],
+        resolve_speaker=lambda name: "Kitchen" if name.lower() == "kitchen" else None,
+    )
+
+    assert [(d.severity, d.code) for d in diagnostics] == [("warning", "unknown_speaker")]
+
+
+def test_placeholders_are_checked_against_declared_parameters():
+    parameters = [MacroParameter(position=1, name="speaker")]
+
+    assert _codes("%1 play", parameters) == []
+    assert _codes("%1 volume %2", parameters) == ["undeclared_parameter"]
+    assert _codes("Kitchen play", parameters) == ["unused_parameter"]
+    assert _codes("Kitchen volume %13") == ["parameter_out_of_range"]
+
+
+def test_parse_errors_and_empty_definitions():
+    assert _codes('Kitchen play_favorite "Radio') == ["parse_error"]
+    assert _codes(" : ") == ["empty_definition"]
@@ -205,6 +205,21 @@ class SonosApiClient:
         """Add a playlist to the queue."""
         return self._post(f"/api/sonos/speakers/{speaker}/queue/add-playlist/{playlist_name}")
 
+    # ========================================
+    # Music Library
+    # ========================================
+
+    def search_library(
+        self, query: str, category: str | None = None, limit: int = 20, offset: int = 0
+    ) -> dict[str, Any]:
+        """Search the local music library (the index, or a speaker until it is built)."""
+        params: dict[str, Any] = {"q": query, "limit": limit, "offset": offset}
+        if category:
+            params["category"] = category
+        response = self.client.get(self._url("/api/library/search"), params=params)
+        response.raise_for_status()
+        return response.json()
+
     # ========================================
     # Macros
     # ========================================
@@ -482,6 +482,35 @@ def register_tools(server: Server, client: SonosApiClient):
                 }
             ),
 
+            # ========================================
+            # Music Library
+            # ========================================
+            Tool(
+                name="search_library",
+                description="Search the local music library for artists, albums, tracks or genres (matches the start of each word, best match first)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Search text, e.g. 'abbey road' or 'beatles'"
+                        },
+                        "category": {
+                            "type": "string",
+                            "enum": ["artists", "albums", "tracks", "genres"],
+                            "description": "Optional category to search (default: all)"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum results to return (default: 20)",
+                            "minimum": 1,
+                            "maximum": 500
+                        }
+                    },
+                    "required": ["query"]
+                }
+            ),
+
             # ========================================
             # Macros
             # ========================================
@@ -661,6 +690,15 @@ def register_tools(server: Server, client: SonosApiClient):
                 result = client.add_playlist_to_queue(arguments["speaker"], arguments["playlist_name"])
                 return format_response(result)
 
+            # Music Library
+            elif name == "search_library":
+                result = client.search_library(
+                    arguments["query"],
+                    arguments.get("category"),
+                    arguments.get("limit", 20),
+                )
+                return format_response(result)
+
             # Macros
             elif name == "list_macros":
                 result = client.get_macros()
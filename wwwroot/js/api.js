@@ -313,6 +313,13 @@ class ApiClient {
         });
     }
 
+    async validateMacro(macro) {
+        return this.request('/api/macro/validate', {
+            method: 'POST',
+            body: JSON.stringify(macro)
+        });
+    }
+
     async deleteMacro(name) {
         return this.request(`/api/macro/${encodeURIComponent(name)}`, {
             method: 'DELETE'
@@ -1,7 +1,7 @@
 /**
  * Local Music Library UI Module
  * Handles browsing and searching the local music library
- * Uses server-side caching for fast browsing
+ * Browsing and search are served from the server's library index
  */
 
 const library = {
@@ -11,14 +11,13 @@ const library = {
     selectedArtist: null,
     selectedAlbum: null,
     
-    // Server cache (fetched from /api/library/cache)
+    // Items already loaded per category (fetched lazily from the browse endpoints)
     cache: {
         artists: null,
         albums: null,
         tracks: null,
         genres: null
     },
-    cacheLoaded: false,
 
     /**
      * Initialize the library module
@@ -61,35 +60,15 @@ const library = {
     },
 
     /**
-     * Load cache from server
-     * The server maintains a cache that refreshes on a schedule (default 3am daily)
+     * Forget the loaded categories so they are fetched again
      */
-    async loadServerCache() {
-        if (this.cacheLoaded) {
-            console.log('Server cache already loaded');
-            return;
-        }
-        
-        try {
-            console.log('Fetching library cache from server...');
-            const response = await fetch('/api/library/cache');
-            const data = await response.json();
-            
-            if (data.is_cached) {
-                this.cache = {
-                    artists: data.artists || [],
-                    albums: data.albums || [],
-                    tracks: data.tracks || [],
-                    genres: data.genres || []
-                };
-                this.cacheLoaded = true;
-                console.log(`Loaded server cache: ${this.cache.artists.length} artists, ${this.cache.albums.length} albums`);
-            } else {
-                console.log('Server cache not available yet');
-            }
-        } catch (e) {
-            console.error('Error loading server cache:', e);
-        }
+    clearCache() {
+        this.cache = {
+            artists: null,
+            albums: null,
+            tracks: null,
+            genres: null
+        };
     },
 
     /**
@@ -107,10 +86,13 @@ const library = {
             const result = await response.json();
             
             if (result.success) {
-                // Reload cache from server
-                this.cacheLoaded = false;
-                await this.loadServerCache();
-                this.showToast(`Library cache refreshed: ${result.artists} artists, ${result.albums} albums`, 'success');
+                // Reload the categories from the refreshed index
+                this.clearCache();
+                if (result.skipped) {
+                    this.showToast('Library is already up to date', 'success');
+                } else {
+                    this.showToast(`Library cache refreshed: ${result.artists} artists, ${result.albums} albums`, 'success');
+                }
                 this.loadCategory();
             } else {
                 this.showToast('Failed to refresh cache', 'error');
@@ -138,19 +120,13 @@ const library = {
     },
 
     /**
-     * Load items for current category (uses server cache if available)
+     * Load items for current category (reuses items already loaded)
      */
     async loadCategory() {
         const container = document.getElementById('library-items');
         if (!container) return;
 
-        // Try to load server cache first
-        if (!this.cacheLoaded) {
-            container.innerHTML = '<div class="loading-message"><div class="spinner"></div><p>Loading library...</p></div>';
-            await this.loadServerCache();
-        }
-
-        // Use cached data if available
+        // Use items loaded earlier if available
         const cached = this.cache[this.currentCategory];
         if (cached && cached.length > 0 && !this.searchTerm) {
             console.log(`Using cached ${this.currentCategory} (${cached.length} items)`);
@@ -158,7 +134,7 @@ const library = {
             return;
         }
 
-        // Fall back to direct API call if cache empty
+        // The browse endpoints read the server's library index once it is built
         container.innerHTML = '<div class="loading-message"><div class="spinner"></div><p>Loading...</p></div>';
 
         try {
@@ -178,6 +154,7 @@ const library = {
                     break;
             }
             
+            this.cache[this.currentCategory] = items;
             this.renderItems(this.currentCategory, items);
         } catch (error) {
             console.error('Error loading library:', error);
@@ -206,7 +183,7 @@ const library = {
     },
 
     /**
-     * Perform search (searches cached data first, then API)
+     * Perform search (server search index first, then cached data, then API)
      */
     async performSearch() {
         if (!this.searchTerm || this.searchTerm.length < 2) {
@@ -219,7 +196,14 @@ const library = {
 
         const searchLower = this.searchTerm.toLowerCase();
 
-        // Try to filter from cache first
+        // Search the server's library index (or a speaker, until it is indexed)
+        const found = await this.searchIndex(this.searchTerm, this.currentCategory);
+        if (found) {
+            this.renderItems(this.currentCategory, found);
+            return;
+        }
+
+        // Filter loaded items if the search failed
         const cached = this.cache[this.currentCategory];
         if (cached && cached.length > 0) {
             const filtered = cached.filter(item => 
@@ -259,11 +243,29 @@ const library = {
     },
 
     /**
-     * API: Get artists (fetches all for caching)
+     * API: Search the server's library index (the server searches on a
+     * speaker until the library has been indexed)
+     * Returns null if the search failed
+     */
+    async searchIndex(query, category, limit = 200) {
+        try {
+            const params = new URLSearchParams({ q: query, category, limit: String(limit) });
+            const response = await fetch(`/api/library/search?${params}`);
+            if (!response.ok) return null;
+            const data = await response.json();
+            return data.items || [];
+        } catch (e) {
+            console.error('Library index search failed:', e);
+            return null;
+        }
+    },
+
+    /**
+     * API: Get artists
      */
     async getArtists(search = '') {
         const params = new URLSearchParams({
-            max_items: '500' // Get all for caching
+            max_items: '500'
         });
         if (search) params.set('search', search);
 
@@ -273,11 +275,11 @@ const library = {
     },
 
     /**
-     * API: Get albums (fetches all for caching)
+     * API: Get albums
      */
     async getAlbums(search = '') {
         const params = new URLSearchParams({
-            max_items: '1000' // Get all for caching
+            max_items: '1000'
         });
         if (search) params.set('search', search);
 
@@ -287,7 +289,7 @@ const library = {
     },
 
     /**
-     * API: Get tracks (fetches more for caching)
+     * API: Get tracks
      */
     async getTracks(search = '') {
         const params = new URLSearchParams({
@@ -734,10 +734,23 @@ window.macros = {
             category: category || null,
             definition,
             isFavorite: this.editingMacro?.isFavorite || false,
+            schedules: this.editingMacro?.schedules || [],
             parameters: this.detectParameters(definition)
         };
 
         try {
+            // Check the definition before touching the stored macro
+            const validation = await api.validateMacro(macro);
+            const errors = validation.diagnostics.filter(d => d.severity === 'error');
+            if (errors.length > 0) {
+                showToast(errors.map(d => d.message).join('; '), 'error');
+                return;
+            }
+            const warnings = validation.diagnostics.filter(d => d.severity === 'warning');
+            if (warnings.length > 0) {
+                showToast(warnings.map(d => d.message).join('; '), 'warning');
+            }
+
             // Check if we're renaming an existing macro
             const isRenaming = this.originalMacroName && 
                               this.originalMacroName !== name;
@@ -1176,7 +1176,7 @@ window.voiceAssistant = {
                 // Music Library
                 case 'search_library':
                     const searchCategory = args.category || 'albums';
-                    endpoint = `/api/library/${searchCategory}?search=${encodeURIComponent(args.query)}&max_items=10`;
+                    endpoint = `/api/library/search?q=${encodeURIComponent(args.query)}&category=${searchCategory}&limit=10`;
                     break;
                 case 'browse_library_artists':
                     endpoint = `/api/library/artists?max_items=${args.max_items || 20}`;
@@ -1220,9 +1220,10 @@ window.voiceAssistant = {
      */
     async playLibraryItem(speaker, name, category = 'albums') {
         try {
-            // Search for the item in the library
+            // Search the library index (the server searches on a speaker
+            // until the library has been indexed)
             const searchResponse = await fetch(
-                `/api/library/${category}?search=${encodeURIComponent(name)}&max_items=5`
+                `/api/library/search?q=${encodeURIComponent(name)}&category=${category}&limit=5`
             );
             const searchResult = await searchResponse.json();
             